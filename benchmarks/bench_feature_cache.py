@@ -0,0 +1,90 @@
+"""Benchmark du cache encodeur: second décodage d'un même fichier avec d'autres paramètres.
+
+Décode une première fois avec le profil --first, sans cache puis avec un cache
+vide (surcoût de l'écriture des sorties de l'encodeur), puis une seconde fois
+avec --second (autre beam_size et températures), sans et avec le cache rempli.
+Chaque paire compare deux décodages des mêmes fenêtres: le cache ne change pas le
+découpage de whisper, "same_windows" le vérifie. Le benchmark échoue (code de
+sortie 1) si le taux de réussite du cache au second passage est sous
+--min-hit-rate.
+
+Usage:
+    python benchmarks/bench_feature_cache.py --model base --duration 120
+    python benchmarks/bench_feature_cache.py --model small --audio interview.wav --first accurate --second fast
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import whisper_transcribe as wt
+from fixtures import write_fixtures
+from run_benchmarks import StageMeter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache encodeur")
+    parser.add_argument("--model", default="base", choices=wt.MODEL_NAMES)
+    parser.add_argument("--audio", help="Fichier audio (défaut: signal proche de la parole généré)")
+    parser.add_argument("--duration", type=float, default=120.0, help="Durée du signal généré")
+    parser.add_argument("--first", default="accurate", choices=list(wt.DECODING_PROFILES),
+                        help="Profil du premier décodage")
+    parser.add_argument("--second", default="fast", choices=list(wt.DECODING_PROFILES),
+                        help="Profil du second décodage")
+    parser.add_argument("--min-hit-rate", type=float, default=0.3,
+                        help="Taux minimal d'entrées relues du cache au second passage (défaut: 0.3)")
+    parser.add_argument("--output", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    import whisper
+    with tempfile.TemporaryDirectory(prefix="whisper_features_") as directory:
+        path = args.audio or write_fixtures(os.path.join(directory, "audio"), duration=args.duration)["speech_like"]
+        audio = whisper.load_audio(path)
+        audio_seconds = len(audio) / wt.SAMPLE_RATE
+        fingerprint = wt.audio_fingerprint(audio)
+
+        backend = wt.BACKENDS[wt.OpenAIWhisperBackend.name]
+        model = wt.LoadedModel(backend, args.model, backend.load(args.model))
+        variant = backend.variant(args.model)
+        cache = wt.FeatureCache(os.path.join(directory, "features"), max_size_mb=4096)
+
+        # Le premier passage avec cache part d'un cache vide et le remplit, comme un premier job
+        passes = [
+            ("first_pass_uncached", args.first, None),
+            ("first_pass_cached", args.first, cache),
+            ("second_pass_uncached", args.second, None),
+            ("second_pass_cached", args.second, cache),
+        ]
+        records, seeks = [], []
+        for name, profile, feature_cache in passes:
+            options = wt.build_transcribe_options(profile=profile)
+            hits, misses = cache.hits, cache.misses
+            with StageMeter() as meter:
+                with wt.feature_cache_scope(feature_cache, fingerprint, variant):
+                    result = model.transcribe(audio, options)
+            seeks.append([segment["seek"] for segment in result["segments"]])
+            records.append(meter.record(stage=name, profile=profile, model=variant, audio_seconds=audio_seconds,
+                                        cache_hits=cache.hits - hits, cache_misses=cache.misses - misses))
+
+        cache_mb = sum(entry.stat().st_size for entry in os.scandir(cache.cache_dir)) / (1024 * 1024)
+
+    wall = [record["wall_s"] for record in records]
+    lookups = records[3]["cache_hits"] + records[3]["cache_misses"]
+    hit_rate = records[3]["cache_hits"] / lookups if lookups else 0.0
+    report = {"model": args.model, "cpus": wt.available_cpus(), "cache_mb": round(cache_mb, 1),
+              "first_pass_overhead": round(wall[1] / wall[0] - 1, 3) if wall[0] else None,
+              "speedup": round(wall[2] / wall[3], 2) if wall[3] else None,
+              "same_windows": {"first_pass": seeks[0] == seeks[1], "second_pass": seeks[2] == seeks[3]},
+              "hit_rate": round(hit_rate, 3), "min_hit_rate": args.min_hit_rate, "results": records}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0 if hit_rate >= args.min_hit_rate else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Benchmark mémoire des longs enregistrements: transcription complète contre lecture par morceaux.
+
+Génère des enregistrements synthétiques de plusieurs durées (écrits par blocs,
+sans jamais tenir le signal entier en mémoire) et mesure le pic de RSS de
+whisper_transcribe.py sur chacun. Avec --windowed, le pic doit rester à peu
+près constant quelle que soit la durée; --max-rss-mb fait échouer le benchmark
+(code de sortie 1) si un cas --windowed dépasse ce plafond.
+
+Usage: python benchmarks/bench_long_form.py --model tiny --minutes 10 60 180 --max-rss-mb 1500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from bench_startup import SCRIPT, measure
+from fixtures import speech_like
+
+SAMPLE_RATE = 16000
+
+
+def write_long_recording(path, minutes, seed=0):
+    """Écrit `minutes` minutes de signal proche de la parole, une minute à la fois"""
+    with sf.SoundFile(path, "w", SAMPLE_RATE, 1, "PCM_16") as f:
+        for minute in range(int(minutes)):
+            f.write(np.clip(speech_like(60.0, seed=seed + minute), -1, 1).astype(np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic mémoire des longs enregistrements")
+    parser.add_argument("--model", default="tiny", help="Modèle Whisper utilisé")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60],
+                        help="Durées des enregistrements synthétiques en minutes")
+    parser.add_argument("--skip-full", action="store_true",
+                        help="Ne mesurer que la lecture par morceaux")
+    parser.add_argument("--max-rss-mb", type=float,
+                        help="Plafond du pic de RSS en mode --windowed (échec au-delà)")
+    args = parser.parse_args()
+
+    results, failures = [], []
+    with tempfile.TemporaryDirectory(prefix="bench_long_") as directory:
+        for minutes in args.minutes:
+            path = os.path.join(directory, f"long-{minutes:g}min.wav")
+            write_long_recording(path, minutes)
+            base = [sys.executable, SCRIPT, path, "--model", args.model, "--decoding-profile", "fast",
+                    "--checkpoint-dir", ""]
+            modes = {"windowed": base + ["--windowed"]}
+            if not args.skip_full:
+                # La transcription complète n'est choisie d'office qu'en dessous de 30 minutes
+                modes["full"] = base + ["--vad"] if minutes * 60 >= 1800 else base
+            for mode, command in modes.items():
+                record = {"minutes": minutes, "mode": mode, **measure(command, 1)}
+                results.append(record)
+                if mode == "windowed" and args.max_rss_mb and record["peak_rss_mb"] > args.max_rss_mb:
+                    failures.append(record)
+            os.remove(path)
+
+    print(json.dumps({"results": results, "over_cap": failures}, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
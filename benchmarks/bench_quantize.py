@@ -0,0 +1,138 @@
+"""Benchmark de la quantification int8: float32 contre int8 sur un même jeu de fichiers.
+
+Pour chaque variante: temps de chargement (l'int8 est mesuré à la conversion puis
+à la relecture du fichier enregistré), pic de RSS, facteur temps réel et taux
+d'erreur sur les mots (WER). Le WER est calculé contre les transcriptions de
+référence `<fichier>.txt` si elles existent dans --audio-dir, sinon contre la
+transcription float32.
+
+Usage:
+    python benchmarks/bench_quantize.py --model base
+    python benchmarks/bench_quantize.py --model small --audio-dir corpus/ --output quant.json
+"""
+import argparse
+import gc
+import json
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import whisper_transcribe as wt
+from fixtures import write_fixtures
+from run_benchmarks import StageMeter
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".webm", ".ogg", ".m4a", ".flac")
+
+
+def normalize_words(text):
+    return re.findall(r"[\w']+", text.lower())
+
+
+def word_error_rate(reference, hypothesis):
+    """Distance d'édition sur les mots, rapportée au nombre de mots de la référence"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_audio_set(audio_dir):
+    """{nom: (chemin, texte de référence ou None)} des fichiers audio du dossier"""
+    audio_set = {}
+    for entry in sorted(os.listdir(audio_dir)):
+        stem, extension = os.path.splitext(entry)
+        if extension.lower() not in AUDIO_EXTENSIONS:
+            continue
+        reference_path = os.path.join(audio_dir, stem + ".txt")
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding="utf-8") as f:
+                reference = f.read()
+        audio_set[stem] = (os.path.join(audio_dir, entry), reference)
+    return audio_set
+
+
+def measure_variant(model_name, quantize, model_dir, decoded, options):
+    records, texts = [], {}
+    variant = wt.model_variant(model_name, quantize)
+    loads = ["convert", "cached"] if quantize else ["load"]
+    for load in loads:
+        gc.collect()
+        with StageMeter() as meter:
+            model = wt.load_model_weights(model_name, quantize, model_dir)
+        records.append(meter.record(stage="model_load", model=variant, load=load,
+                                    model_mb=round(wt.estimate_model_size(model) / (1024 * 1024), 1)))
+        if load != loads[-1]:
+            del model
+
+    for name, (audio, audio_seconds) in decoded.items():
+        with StageMeter() as meter:
+            result = model.transcribe(audio, fp16=False, verbose=None, **options)
+        texts[name] = result["text"]
+        records.append(meter.record(fixture=name, stage="transcribe", model=variant,
+                                    audio_seconds=audio_seconds))
+    del model
+    gc.collect()
+    return records, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark float32 contre int8")
+    parser.add_argument("--model", default="base", choices=wt.MODEL_NAMES)
+    parser.add_argument("--profile", default="fast", choices=list(wt.DECODING_PROFILES))
+    parser.add_argument("--audio-dir", help="Dossier de fichiers audio (avec références .txt facultatives); "
+                                            "par défaut les fichiers de test générés")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée des fichiers de test générés")
+    parser.add_argument("--model-dir", help="Dossier du modèle int8 (défaut: dossier temporaire, "
+                                            "pour mesurer la conversion)")
+    parser.add_argument("--output", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    options = wt.build_transcribe_options(profile=args.profile)
+    with tempfile.TemporaryDirectory(prefix="whisper_quant_") as directory:
+        if args.audio_dir:
+            audio_set = load_audio_set(args.audio_dir)
+        else:
+            fixtures = write_fixtures(directory, duration=args.duration)
+            audio_set = {name: (path, None) for name, path in fixtures.items() if name.startswith("speech_like")}
+
+        import whisper
+        decoded = {}
+        for name, (path, _) in audio_set.items():
+            audio = whisper.load_audio(path)
+            decoded[name] = (audio, len(audio) / wt.SAMPLE_RATE)
+
+        model_dir = args.model_dir or os.path.join(directory, "int8")
+        fp32_records, fp32_texts = measure_variant(args.model, False, model_dir, decoded, options)
+        int8_records, int8_texts = measure_variant(args.model, True, model_dir, decoded, options)
+
+    for records, texts in ((fp32_records, fp32_texts), (int8_records, int8_texts)):
+        for record in records:
+            name = record.get("fixture")
+            if name is None:
+                continue
+            reference = audio_set[name][1]
+            record["wer"] = round(word_error_rate(reference if reference is not None else fp32_texts[name],
+                                                  texts[name]), 4)
+            record["wer_reference"] = "transcript" if reference is not None else "fp32"
+
+    report = {"model": args.model, "profile": args.profile, "cpus": wt.available_cpus(),
+              "results": fp32_records + int8_records}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark du rééchantillonnage: repli soundfile/NumPy contre le pipe FFmpeg.
+
+Usage: python benchmarks/bench_resample.py --duration 120 --rate 44100
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import whisper_transcribe as wt
+
+
+def make_fixture(path, duration, rate):
+    """Écrit un WAV stéréo déterministe (deux sinusoïdes + bruit)"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(duration * rate)) / rate
+    left = 0.4 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(t.size)
+    right = 0.4 * np.sin(2 * np.pi * 7000 * t) + 0.05 * rng.standard_normal(t.size)
+    sf.write(path, np.stack([left, right], axis=1).astype(np.float32), rate, subtype="PCM_16")
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rééchantillonnage vers 16 kHz")
+    parser.add_argument("--duration", type=float, default=60.0, help="Durée du signal de test en secondes")
+    parser.add_argument("--rate", type=int, default=44100, help="Fréquence d'échantillonnage d'origine")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de répétitions (meilleur temps retenu)")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_resample_")
+    source = os.path.join(tmp_dir, "source.wav")
+    output = os.path.join(tmp_dir, "output.wav")
+    make_fixture(source, args.duration, args.rate)
+
+    data, rate = sf.read(source, dtype="float32")
+    mono = data.mean(axis=1)
+
+    def numpy_in_memory():
+        resampler = wt.PolyphaseResampler(rate)
+        np.concatenate([resampler.process(mono), resampler.flush()])
+
+    results = {
+        "audio_seconds": args.duration,
+        "orig_rate": args.rate,
+        "numpy_blocks_file": timed(lambda: wt.convert_with_soundfile(source, output), args.repeat),
+        "numpy_in_memory": timed(numpy_in_memory, args.repeat),
+    }
+    # find_spec sur un sous-module importe le paquet parent: vérifier scipy d'abord
+    if importlib.util.find_spec("scipy") is not None and importlib.util.find_spec("scipy.signal") is not None:
+        results["scipy_resample_poly"] = timed(lambda: wt.resample_audio(mono, rate), args.repeat)
+    else:
+        results["scipy_resample_poly"] = None
+    try:
+        results["ffmpeg_pipe"] = timed(lambda: wt.decode_audio(source), args.repeat)
+    except (OSError, ValueError, wt.subprocess.SubprocessError) as e:
+        results["ffmpeg_pipe"] = None
+        results["ffmpeg_error"] = str(e)
+
+    # Débit exprimé en secondes d'audio traitées par seconde de calcul
+    for key in ("numpy_blocks_file", "numpy_in_memory", "scipy_resample_poly", "ffmpeg_pipe"):
+        if results.get(key):
+            results[key + "_x_realtime"] = args.duration / results[key]
+
+    for path in (source, output):
+        if os.path.exists(path):
+            os.remove(path)
+    os.rmdir(tmp_dir)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
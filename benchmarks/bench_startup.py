@@ -0,0 +1,69 @@
+"""Benchmark du démarrage à froid: rejet rapide d'un fichier invalide contre transcription complète.
+
+Chaque cas lance un nouveau processus Python et mesure son temps total et son
+pic de mémoire (ru_maxrss de ce seul processus, via os.wait4).
+
+Usage: python benchmarks/bench_startup.py --model tiny --repeat 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPT = os.path.join(ROOT, "whisper_transcribe.py")
+
+
+def measure(command, repeat):
+    """Meilleur temps et pic RSS (Mo) sur `repeat` lancements de `command`"""
+    best_wall, peak_rss, code = float("inf"), 0.0, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        best_wall = min(best_wall, time.perf_counter() - start)
+        # ru_maxrss est en kilo-octets sous Linux
+        peak_rss = max(peak_rss, usage.ru_maxrss / 1024)
+        code = process.returncode
+    return {"wall_s": round(best_wall, 3), "peak_rss_mb": round(peak_rss, 1), "exit_code": code}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage de whisper_transcribe.py")
+    parser.add_argument("--model", default="tiny", help="Modèle utilisé pour le chemin complet")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de lancements par cas")
+    parser.add_argument("--skip-full", action="store_true", help="Ne pas mesurer la transcription complète")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as directory:
+        empty = os.path.join(directory, "empty.wav")
+        open(empty, "wb").close()
+        clip = os.path.join(directory, "clip.wav")
+        t = np.arange(3 * 16000) / 16000
+        sf.write(clip, (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), 16000, subtype="PCM_16")
+
+        python = sys.executable
+        cases = {
+            "interpreter": [python, "-c", "pass"],
+            "reject_missing_file": [python, SCRIPT, os.path.join(directory, "absent.wav")],
+            "reject_empty_file": [python, SCRIPT, empty],
+            "import_whisper": [python, "-c", "import whisper"],
+        }
+        if not args.skip_full:
+            cases["full_transcription"] = [python, SCRIPT, clip, "--model", args.model,
+                                           "--decoding-profile", "fast"]
+
+        results = {name: measure(command, args.repeat) for name, command in cases.items()}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
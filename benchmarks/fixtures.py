@@ -0,0 +1,90 @@
+"""Génération déterministe des fichiers audio de test des benchmarks.
+
+Aucun accès réseau ni synthèse vocale: les signaux « parole » sont des
+impulsions glottales filtrées par des formants qui changent à chaque syllabe.
+"""
+import os
+import subprocess
+
+import numpy as np
+import soundfile as sf
+
+SAMPLE_RATE = 16000
+
+
+def tone(duration, rate=SAMPLE_RATE, freq=440.0):
+    t = np.arange(int(duration * rate)) / rate
+    return 0.5 * np.sin(2 * np.pi * freq * t)
+
+
+def noise(duration, rate=SAMPLE_RATE, level=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    return level * rng.standard_normal(int(duration * rate))
+
+
+def silence(duration, rate=SAMPLE_RATE):
+    return np.zeros(int(duration * rate))
+
+
+def speech_like(duration, rate=SAMPLE_RATE, seed=0, pause_ratio=0.3):
+    """Signal voisé imitant la parole: syllabes de 150-350 ms entrecoupées de pauses"""
+    rng = np.random.default_rng(seed)
+    out = np.zeros(int(duration * rate))
+    position = 0
+    while position < len(out):
+        if rng.random() < pause_ratio:
+            position += int(rng.uniform(0.2, 0.8) * rate)
+            continue
+        length = min(int(rng.uniform(0.15, 0.35) * rate), len(out) - position)
+        t = np.arange(length) / rate
+        pitch = rng.uniform(100, 220)
+        # Impulsions glottales approximées par une somme d'harmoniques décroissantes
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 12))
+        # Deux formants: modulation d'amplitude des harmoniques proches
+        formants = rng.uniform([300, 900], [900, 2500])
+        shaped = voiced * (1 + 0.5 * np.sin(2 * np.pi * formants[0] * t)) \
+            + 0.3 * np.sin(2 * np.pi * formants[1] * t)
+        envelope = np.sin(np.pi * np.arange(length) / max(length - 1, 1)) ** 2
+        out[position:position + length] = 0.15 * shaped * envelope
+        position += length
+    return out
+
+
+def write_fixtures(directory, duration=30.0):
+    """Écrit les fichiers de test et retourne {nom: chemin}"""
+    os.makedirs(directory, exist_ok=True)
+    fixtures = {}
+
+    def add(name, data, rate=SAMPLE_RATE, channels=1):
+        path = os.path.join(directory, name + ".wav")
+        if channels > 1:
+            data = np.stack([data] * channels, axis=1)
+        sf.write(path, np.clip(data, -1, 1).astype(np.float32), rate, subtype="PCM_16")
+        fixtures[name] = path
+
+    add("tone", tone(duration))
+    add("noise", noise(duration))
+    add("silence", silence(duration))
+    add("speech_like", speech_like(duration))
+    add("speech_like_44k_stereo", speech_like(duration, rate=44100, seed=1), rate=44100, channels=2)
+    add("speech_like_22k", speech_like(duration, rate=22050, seed=2), rate=22050)
+
+    # PCM brut sans en-tête RIFF, comme certains envois du navigateur
+    raw_path = os.path.join(directory, "headerless.wav")
+    pcm = (np.clip(speech_like(duration, seed=3), -1, 1) * 32767).astype("<i2")
+    pcm.tofile(raw_path)
+    fixtures["headerless"] = raw_path
+
+    # Formats compressés, seulement si FFmpeg est disponible
+    for extension in ("mp3", "webm"):
+        path = os.path.join(directory, "speech_like." + extension)
+        try:
+            result = subprocess.run(
+                ["ffmpeg", "-y", "-v", "error", "-i", fixtures["speech_like"], path],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120
+            )
+            if result.returncode == 0:
+                fixtures["speech_like_" + extension] = path
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return fixtures
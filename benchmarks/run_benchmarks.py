@@ -0,0 +1,230 @@
+"""Benchmarks des étapes du pipeline de transcription.
+
+Mesure, pour chaque fichier de test, le temps, le facteur temps réel (RTF),
+le pic de mémoire et l'utilisation CPU de chaque étape: probe, décodage,
+chargement du modèle, transcription et génération SRT, pour chaque moteur
+d'inférence demandé.
+
+Usage:
+    python benchmarks/run_benchmarks.py --models tiny base --profiles fast accurate --output bench.json
+    python benchmarks/run_benchmarks.py --models tiny --compare bench.json --tolerance 0.15
+    python benchmarks/run_benchmarks.py --models base --backends openai-whisper faster-whisper
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import whisper_transcribe as wt
+from fixtures import write_fixtures
+
+
+def current_rss():
+    """RSS courant du processus en octets (Linux), None si indisponible"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def cpu_seconds():
+    """Temps CPU utilisateur + système du processus et de ses enfants (FFmpeg)"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+class StageMeter:
+    """Mesure une étape: temps écoulé, CPU et pic de RSS échantillonné toutes les 10 ms"""
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_rss = 0
+        self._running = False
+
+    def _sample(self):
+        while self._running:
+            rss = current_rss()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss, rss)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak_rss = current_rss() or 0
+        self._running = True
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self.cpu_start = cpu_seconds()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = cpu_seconds() - self.cpu_start
+        self._running = False
+        self._thread.join()
+        return False
+
+    def record(self, **fields):
+        audio_seconds = fields.get("audio_seconds")
+        return {
+            **fields,
+            "wall_s": round(self.wall, 4),
+            "rtf": round(self.wall / audio_seconds, 4) if audio_seconds else None,
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+            "cpu_util": round(self.cpu / self.wall, 2) if self.wall > 0 else None,
+        }
+
+
+def audio_stages(name, path):
+    """Étapes sans modèle: probe, décodage et SRT. Retourne (mesures, signal décodé)"""
+    records = []
+    info = wt.probe_audio(path)
+    audio_seconds = info["duration"] if info else None
+
+    with StageMeter() as meter:
+        wt.check_audio_file(path)
+    records.append(meter.record(fixture=name, stage="probe", audio_seconds=audio_seconds))
+    wt.raw_pcm_to_use = wt.temp_wav_to_use = None
+
+    with StageMeter() as meter:
+        audio = wt.prepare_audio(path)
+    wt.cleanup_temp_files(path)
+    if isinstance(audio, wt.np.ndarray):
+        audio_seconds = len(audio) / wt.SAMPLE_RATE
+    records.append(meter.record(fixture=name, stage="decode", audio_seconds=audio_seconds))
+    return records, audio, audio_seconds
+
+
+def srt_stage(name, segments, audio_seconds, **fields):
+    with StageMeter() as meter:
+        wt.generate_srt(segments)
+    return meter.record(fixture=name, stage="srt", audio_seconds=audio_seconds, **fields)
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="whisper_bench_") as directory:
+        fixtures = write_fixtures(directory, duration=args.duration)
+        selected = {name: path for name, path in fixtures.items()
+                    if not args.fixtures or name in args.fixtures}
+
+        decoded = {}
+        for name, path in selected.items():
+            wt.log_message(f"[bench] Étapes audio: {name}")
+            records, audio, audio_seconds = audio_stages(name, path)
+            results.extend(records)
+            decoded[name] = (audio, audio_seconds)
+
+        for backend_name in args.backends:
+            backend = wt.BACKENDS[backend_name]
+            for model_name in args.models:
+                if not backend.available(model_name):
+                    wt.log_message(f"[bench] Moteur {backend_name} indisponible pour {model_name}, ignoré")
+                    continue
+                wt.log_message(f"[bench] Chargement du modèle {model_name} ({backend_name})")
+                with StageMeter() as meter:
+                    loaded_name, weights = wt.load_whisper_model(model_name, backend=backend)
+                model = wt.LoadedModel(backend, loaded_name, weights)
+                results.append(meter.record(stage="model_load", model=loaded_name, backend=backend_name))
+
+                for profile in args.profiles:
+                    options = wt.build_transcribe_options(profile=profile)
+                    for name, (audio, audio_seconds) in decoded.items():
+                        wt.log_message(f"[bench] Transcription {name} ({model_name}, {backend_name}, {profile})")
+                        with StageMeter() as meter:
+                            result = model.transcribe(audio, options)
+                        results.append(meter.record(
+                            fixture=name, stage="transcribe", model=loaded_name, backend=backend_name,
+                            profile=profile, audio_seconds=audio_seconds,
+                            fallbacks=wt.count_fallbacks(result, options)["extra_decodes"],
+                        ))
+                        results.append(srt_stage(name, result["segments"], audio_seconds,
+                                                 model=loaded_name, backend=backend_name, profile=profile))
+                del model, weights
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": wt.available_cpus(),
+            "fixture_seconds": args.duration,
+        },
+        "results": results,
+    }
+
+
+def result_key(record):
+    # Les rapports antérieurs aux moteurs multiples ne mesuraient qu'openai-whisper
+    backend = record.get("backend", wt.OpenAIWhisperBackend.name) if record.get("model") else None
+    return (record.get("fixture"), record["stage"], record.get("model"), backend, record.get("profile"))
+
+
+def compare(current, baseline, tolerance, min_seconds):
+    """Liste les étapes dont le temps a augmenté de plus de `tolerance` (fraction)"""
+    previous = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = previous.get(result_key(record))
+        if old is None or old["wall_s"] < min_seconds:
+            continue
+        change = (record["wall_s"] - old["wall_s"]) / old["wall_s"]
+        if change > tolerance:
+            regressions.append({
+                "fixture": record.get("fixture"),
+                "stage": record["stage"],
+                "model": record.get("model"),
+                "backend": record.get("backend"),
+                "profile": record.get("profile"),
+                "baseline_s": old["wall_s"],
+                "current_s": record["wall_s"],
+                "change": round(change, 3),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline de transcription Whisper")
+    parser.add_argument("--models", nargs="*", default=["tiny"], choices=wt.MODEL_NAMES,
+                        help="Modèles à mesurer (aucun: seulement les étapes audio)")
+    parser.add_argument("--backends", nargs="+", default=[wt.OpenAIWhisperBackend.name], choices=list(wt.BACKENDS),
+                        help="Moteurs d'inférence à mesurer (ignorés s'ils sont indisponibles)")
+    parser.add_argument("--profiles", nargs="+", default=["fast"], choices=list(wt.DECODING_PROFILES),
+                        help="Profils de décodage à mesurer")
+    parser.add_argument("--fixtures", nargs="*", help="Limiter aux fichiers de test nommés")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée des fichiers de test en secondes")
+    parser.add_argument("--output", help="Écrire le rapport JSON dans ce fichier")
+    parser.add_argument("--compare", metavar="BASELINE", help="Comparer à un rapport JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Hausse relative du temps considérée comme une régression (défaut: 0.10)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Ignorer les étapes de référence plus courtes que ce temps")
+    args = parser.parse_args()
+
+    report = run(args)
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.tolerance, args.min_seconds)
+        if report["regressions"]:
+            exit_code = 1
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -245,7 +245,7 @@ io.on('connection', (socket) => {
       console.log(`✅ Transcription réussie! Longueur du texte: ${result.text?.length || 0} caractères`);
       
       if (result.text) {
-        socket.emit('transcription', { text: result.text });
+        socket.emit('transcription', { text: result.text, ...(result.partial && { partial: true }) });
         console.log(`📤 Résultat envoyé au client: "${result.text.substring(0, 50)}${result.text.length > 50 ? '...' : ''}"`);
       } else {
         console.log(`⚠️ Aucun texte de transcription reçu`);
@@ -307,7 +307,7 @@ io.on('connection', (socket) => {
       console.log(`✅ Transcription réussie! Longueur du texte: ${result.text?.length || 0} caractères`);
       
       if (result.text) {
-        socket.emit('transcription', { text: result.text });
+        socket.emit('transcription', { text: result.text, ...(result.partial && { partial: true }) });
         console.log(`📤 Résultat envoyé au client: "${result.text.substring(0, 50)}${result.text.length > 50 ? '...' : ''}"`);
       } else {
         console.log(`⚠️ Aucun texte de transcription reçu`);
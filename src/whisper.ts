@@ -14,7 +14,7 @@ export async function transcribeAudio(
     audioPath: string, 
     generateSrt: boolean = false,
     model: 'tiny' | 'base' | 'small' | 'medium' | 'large' = 'base'
-): Promise<{ text: string; srt?: string }> {
+): Promise<{ text: string; srt?: string; partial?: boolean; stopReason?: string }> {
     // Vérifier si le fichier existe avant de lancer la transcription
     try {
         await fs.access(audioPath);
@@ -43,6 +43,16 @@ export async function transcribeAudio(
         // Ajouter le paramètre du modèle
         args.push('--model', model);
 
+        // Reprendre une transcription interrompue (timeout, crash) du même fichier,
+        // si les points de reprise sont activés (WHISPER_CHECKPOINT_DIR)
+        if (process.env.WHISPER_CHECKPOINT_DIR) {
+            args.push('--resume');
+        }
+
+        // Échéance coopérative côté Python, 30 secondes avant le timeout ci-dessous:
+        // le texte déjà décodé est rendu au lieu d'être perdu
+        args.push('--deadline', '270');
+
         console.log('Chemin du script Python:', pythonScript);
         console.log('Chemin du fichier audio:', audioPath);
         console.log(`Modèle Whisper utilisé: ${model}`);
@@ -66,6 +76,8 @@ export async function transcribeAudio(
         const pythonProcess = spawn('python', args);
         let transcriptionResult = '';
         let srtContent = '';
+        // Raison de l'arrêt anticipé (échéance, annulation) si le texte est partiel
+        let stopReason = '';
         let lastProgressTime = Date.now();
 
         console.log(`🚀 Processus Python démarré avec PID: ${pythonProcess.pid}`);
@@ -80,6 +92,12 @@ export async function transcribeAudio(
             console.log('Message Python stdout:', message);
             lastProgressTime = Date.now(); // Mettre à jour le temps de la dernière activité
             
+            const partialMatch = message.match(/RÉSULTAT_PARTIEL: (\S+)/);
+            if (partialMatch) {
+                stopReason = partialMatch[1];
+                console.warn(`⚠️ Transcription partielle (${stopReason})`);
+            }
+
             // Chercher le texte entre les balises spéciales
             const transcriptionMatch = message.match(/DÉBUT_TEXTE_TRANSCRIPTION\n([\s\S]*?)\nFIN_TEXTE_TRANSCRIPTION/);
             if (transcriptionMatch && transcriptionMatch[1]) {
@@ -106,17 +124,24 @@ export async function transcribeAudio(
             console.log('Message Python stderr:', message);
             lastProgressTime = Date.now(); // Mettre à jour le temps de la dernière activité
             
-            try {
-                const jsonData = JSON.parse(message);
-                if (jsonData.type === 'modelLoadingProgress') {
-                    // Émettre la progression via l'EventEmitter
-                    progressEmitter.emit('modelLoadingProgress', { progress: jsonData.progress });
-                }
-            } catch (e) {
-                // Message non-JSON
-                if (message.includes('Conversion') || message.includes('transcription')) {
-                    // C'est un message de progression normal
-                    console.log(`📋 Progression: ${message}`);
+            // Un même bloc peut contenir plusieurs événements JSON, un par ligne
+            for (const line of message.split('\n')) {
+                try {
+                    const jsonData = JSON.parse(line);
+                    if (jsonData.type === 'modelLoadingProgress') {
+                        // Émettre la progression via l'EventEmitter
+                        progressEmitter.emit('modelLoadingProgress', { progress: jsonData.progress });
+                    } else if (jsonData.type === 'transcriptionProgress') {
+                        progressEmitter.emit('transcriptionProgress', { progress: jsonData.progress });
+                    } else if (jsonData.type === 'stage') {
+                        progressEmitter.emit('stage', jsonData);
+                    }
+                } catch (e) {
+                    // Message non-JSON
+                    if (line.includes('Conversion') || line.includes('transcription')) {
+                        // C'est un message de progression normal
+                        console.log(`📋 Progression: ${line}`);
+                    }
                 }
             }
         });
@@ -137,7 +162,8 @@ export async function transcribeAudio(
                 console.log('Résultat final de la transcription:', transcriptionResult);
                 resolve({
                     text: transcriptionResult || '',
-                    ...(srtContent && { srt: srtContent })
+                    ...(srtContent && { srt: srtContent }),
+                    ...(stopReason && { partial: true, stopReason })
                 });
             } else {
                 reject(new Error(`Le processus Python s'est terminé avec le code ${code}`));
@@ -153,9 +179,15 @@ export async function transcribeAudio(
     });
 }
 
-export async function runWhisperLive(): Promise<void> {
+export async function runWhisperLive(
+    model: 'tiny' | 'base' | 'small' | 'medium' | 'large' = 'base'
+): Promise<void> {
   return new Promise((resolve, reject) => {
-    const python = spawn('python3', ['whisper.py', '--live']);
+    // Le PCM s16le 16 kHz mono est lu sur l'entrée standard du processus courant
+    const pythonScript = path.join(__dirname, '..', 'whisper_transcribe.py');
+    const python = spawn('python3', [pythonScript, '--live', '--model', model], {
+      stdio: ['inherit', 'pipe', 'pipe']
+    });
     python.stdout?.on('data', (data: Buffer) => process.stdout.write(data.toString('utf8')));
     python.stderr?.on('data', (err: Buffer) => console.error('[Whisper error]', err.toString('utf8')));
     python.on('close', () => resolve());
@@ -0,0 +1,270 @@
+"""Module whisper.transcribe factice pour les tests: même boucle de décodage que
+openai-whisper (seek en trames mel, fenêtres complétées à 30 s pour l'encodeur,
+relances en température et fenêtres sautées avec les comparaisons de whisper,
+prompt all_tokens[prompt_reset_since:], barre tqdm, get_tokenizer,
+clip_timestamps), avec un encodeur et un décodeur déterministes très légers, et
+whisper.decode pour les lots de fenêtres.
+
+Le décodage d'une fenêtre dépend de la sortie de l'encodeur sur son spectrogramme,
+normalisé sur le signal entier comme celui de whisper, et des derniers jetons du
+prompt: un mauvais prompt ou un mel calculé sur une partie du signal change les
+segments produits.
+"""
+import sys
+import types
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+HOP_LENGTH = 160
+N_FRAMES = 3000
+FRAMES_PER_SECOND = SAMPLE_RATE // HOP_LENGTH
+
+tqdm = types.ModuleType("tqdm")
+
+
+class _Bar:
+    def __init__(self, total=None, unit=None, disable=False):
+        self.total = total
+        self.n = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, n):
+        self.n += n
+
+
+tqdm.tqdm = _Bar
+
+
+class Tensor(np.ndarray):
+    """Tableau NumPy avec la petite partie de l'API torch.Tensor utilisée par le cache encodeur"""
+    device = "cpu"
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+    def to(self, device):
+        return self
+
+
+torch = types.ModuleType("torch")
+torch.Tensor = Tensor
+torch.from_numpy = lambda array: np.asarray(array).view(Tensor)
+torch.stack = lambda arrays: np.stack([np.asarray(array) for array in arrays]).view(Tensor)
+
+
+class Encoder:
+    """Encodeur factice: valeurs multiples de 1/64, exactes en float16; `calls` compte ses passages"""
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, mel):
+        return self.forward(mel)
+
+    def forward(self, mel):
+        self.calls += 1
+        return torch.from_numpy(np.round(np.tanh(np.asarray(mel) / 4) * 64).astype(np.float32) / 64)
+
+
+class Tokenizer:
+    eot = 50257
+    timestamp_begin = 50364
+
+    def encode(self, text):
+        return [1000 + ord(char) % 97 for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(32 + token % 95) for token in tokens)
+
+
+def get_tokenizer(multilingual=True, num_languages=99, language=None, task=None):
+    return Tokenizer()
+
+
+tokenizer = types.ModuleType("whisper.tokenizer")
+tokenizer.get_tokenizer = get_tokenizer
+
+
+def pad_or_trim(array, length=N_FRAMES * HOP_LENGTH, *, axis=-1):
+    array = np.asarray(array)
+    if array.shape[axis] > length:
+        return np.take(array, range(length), axis=axis)
+    widths = [(0, 0)] * array.ndim
+    widths[axis] = (0, length - array.shape[axis])
+    return np.pad(array, widths)
+
+
+def log_mel_spectrogram(audio, n_mels=80, padding=0, device=None):
+    """Énergie par trame, normalisée par le maximum du signal entier"""
+    audio = np.concatenate([np.asarray(audio, dtype=np.float32), np.zeros(padding, dtype=np.float32)])
+    frames = len(audio) // HOP_LENGTH
+    energy = np.square(audio[:frames * HOP_LENGTH]).reshape(frames, HOP_LENGTH).mean(axis=1)
+    return np.log10(energy + 1e-10) - np.log10(energy.max() + 1e-10)
+
+
+class FakeModel:
+    """Modèle au décodeur déterministe; `windows` compte les fenêtres décodées.
+
+    Au-delà de `max_segments` segments, une fenêtre s'arrête avant sa fin et la
+    suivante reprend au dernier horodatage, comme whisper.
+    """
+    is_multilingual = True
+    num_languages = 99
+    dims = types.SimpleNamespace(n_mels=80)
+    max_segments = 3
+
+    def __init__(self):
+        self.windows = 0
+        self.encoder = Encoder()
+
+    def transcribe(self, audio, **kwargs):
+        return transcribe(self, audio, **kwargs)
+
+    def decode(self, features, frames, prompt, seek, beam_size=None, temperature=0.0):
+        """Décode une fenêtre de `frames` trames utiles: segments (débuts et fins relatifs en
+        trames paires, jetons de texte), fenêtre décodée jusqu'au bout ou non, et mesures
+        de qualité de whisper (la relance à plus haute température améliore avg_logprob)"""
+        self.windows += 1
+        context = sum(prompt[-5:]) + (beam_size or 0)
+        variation = context + int(round(temperature * 10))
+        segments, position = [], 0
+        while len(segments) < self.max_segments:
+            signature = int(abs(features[position:position + 50].sum()) * 10) + variation + len(segments)
+            length = 2 * (150 + signature % 350)
+            if position + length > frames:
+                break
+            tokens = [signature % 5000, (seek + position) % 5000, len(prompt)]
+            segments.append((position, position + length, tokens))
+            position += length
+        level = int(abs(features[:frames].sum()))
+        grade = (seek // FRAMES_PER_SECOND + context + level) % 7
+        return types.SimpleNamespace(
+            segments=segments, complete=len(segments) < self.max_segments, consumed=position,
+            temperature=temperature, avg_logprob=-0.2 - 0.25 * grade + temperature,
+            no_speech_prob=-float(np.mean(features[:frames])),
+            compression_ratio=1.0 + ((variation + level) % 20) * 0.1)
+
+
+def DecodingOptions(task="transcribe", language=None, temperature=0.0, prompt=None, without_timestamps=False,
+                    fp16=True, beam_size=None, best_of=None):
+    return types.SimpleNamespace(task=task, language=language, temperature=temperature, prompt=prompt,
+                                 beam_size=beam_size, best_of=best_of)
+
+
+def decode(model, mel, options):
+    """whisper.decode: un lot de fenêtres de 30 s, à la seule température de `options`"""
+    prompt = Tokenizer().encode(" " + options.prompt.strip()) if options.prompt else []
+    results = []
+    for features in model.encoder(mel):
+        result = model.decode(features, N_FRAMES, prompt, 0,
+                              options.beam_size if options.temperature == 0 else options.best_of, options.temperature)
+        tokens = []
+        for start, stop, text_tokens in result.segments:
+            tokens += [Tokenizer.timestamp_begin + start // 2, *text_tokens, Tokenizer.timestamp_begin + stop // 2]
+        results.append(types.SimpleNamespace(
+            tokens=tokens, language=options.language or "fr", language_probs=None, temperature=result.temperature,
+            avg_logprob=result.avg_logprob, no_speech_prob=result.no_speech_prob,
+            compression_ratio=result.compression_ratio))
+    return results
+
+
+def transcribe(model, audio, verbose=None, temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0), compression_ratio_threshold=2.4,
+               logprob_threshold=-1.0, no_speech_threshold=0.6, initial_prompt=None, clip_timestamps="0",
+               condition_on_previous_text=True, language=None, word_timestamps=False, **decode_options):
+    mel = log_mel_spectrogram(audio, padding=N_FRAMES * HOP_LENGTH)
+    content_frames = len(audio) // HOP_LENGTH
+    if isinstance(clip_timestamps, str):
+        clip_timestamps = [float(ts) for ts in clip_timestamps.split(",") if ts]
+    seek_points = [round(ts * FRAMES_PER_SECOND) for ts in clip_timestamps] or [0]
+    if len(seek_points) % 2 == 1:
+        seek_points.append(content_frames)
+    seek, end = seek_points[0], seek_points[1]
+    temperatures = list(temperature) if isinstance(temperature, (list, tuple)) else [temperature]
+
+    tokenizer = get_tokenizer()
+    all_tokens, all_segments, prompt_reset_since = [], [], 0
+    if initial_prompt is not None:
+        all_tokens.extend(tokenizer.encode(" " + initial_prompt.strip()))
+
+    def decode_with_fallback(window, frames, prompt):
+        # Mêmes comparaisons que whisper.transcribe.decode_with_fallback
+        for t in temperatures:
+            # whisper réencode la fenêtre à chaque température
+            features = model.encoder(window)[0]
+            result = model.decode(features, frames, prompt, seek,
+                                  decode_options.get("beam_size") if t == 0 else decode_options.get("best_of"), t)
+            needs_fallback = False
+            if compression_ratio_threshold is not None and result.compression_ratio > compression_ratio_threshold:
+                needs_fallback = True
+            if logprob_threshold is not None and result.avg_logprob < logprob_threshold:
+                needs_fallback = True
+            if (no_speech_threshold is not None and result.no_speech_prob > no_speech_threshold
+                    and logprob_threshold is not None and result.avg_logprob < logprob_threshold):
+                needs_fallback = False  # silence
+            if not needs_fallback:
+                break
+        return result
+
+    with tqdm.tqdm(total=content_frames, unit="frames", disable=verbose is not False) as pbar:
+        while seek < end:
+            previous_seek = seek
+            frames = min(N_FRAMES, end - seek)
+            window = mel[seek:seek + frames]
+            window = np.pad(window, (0, N_FRAMES - frames))[None].view(Tensor)
+            result = decode_with_fallback(window, frames, all_tokens[prompt_reset_since:][-223:])
+
+            if no_speech_threshold is not None:
+                should_skip = result.no_speech_prob > no_speech_threshold
+                if logprob_threshold is not None and result.avg_logprob > logprob_threshold:
+                    should_skip = False
+                if should_skip:
+                    seek += frames
+                    pbar.update(min(content_frames, seek) - previous_seek)
+                    continue
+
+            current = [{"seek": seek, "start": (seek + start) / FRAMES_PER_SECOND,
+                        "end": (seek + stop) / FRAMES_PER_SECOND, "text": tokenizer.decode(tokens),
+                        "tokens": tokens, "temperature": result.temperature, "avg_logprob": result.avg_logprob,
+                        "compression_ratio": result.compression_ratio, "no_speech_prob": result.no_speech_prob}
+                       for start, stop, tokens in result.segments]
+            all_segments.extend({"id": index, **segment}
+                                for index, segment in enumerate(current, start=len(all_segments)))
+            all_tokens.extend(token for segment in current for token in segment["tokens"])
+            if not condition_on_previous_text or result.temperature > 0.5:
+                prompt_reset_since = len(all_tokens)
+            # Fenêtre décodée jusqu'au bout: whisper passe à la suivante
+            seek += frames if result.complete else max(result.consumed, 1)
+            pbar.update(min(content_frames, seek) - previous_seek)
+
+    return {"text": "".join(segment["text"] for segment in all_segments), "segments": all_segments,
+            "language": language or "fr"}
+
+
+def install(monkeypatch):
+    """Déclare ce module comme whisper.transcribe (et un paquet whisper minimal)"""
+    package = types.ModuleType("whisper")
+    package.transcribe = sys.modules[__name__]
+    package.tokenizer = tokenizer
+    package.log_mel_spectrogram = log_mel_spectrogram
+    package.pad_or_trim = pad_or_trim
+    package.decode = decode
+    package.DecodingOptions = DecodingOptions
+    package.__version__ = "20240930"
+    monkeypatch.setitem(sys.modules, "whisper", package)
+    monkeypatch.setitem(sys.modules, "whisper.tokenizer", tokenizer)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "whisper.transcribe", sys.modules[__name__])
+    # Les hooks (tqdm, get_tokenizer) remplacent des attributs du module: les restaurer
+    for name in ("tqdm", "get_tokenizer", "log_mel_spectrogram"):
+        monkeypatch.setattr(sys.modules[__name__], name, getattr(sys.modules[__name__], name))
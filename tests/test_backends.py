@@ -0,0 +1,55 @@
+"""Moteurs d'inférence: un chargement faster-whisper ne doit importer ni whisper ni torch."""
+import importlib.machinery
+import sys
+import types
+
+import pytest
+
+import whisper_transcribe as wt
+
+
+class FakeWhisperModel:
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.kwargs = kwargs
+
+
+def test_faster_whisper_load_does_not_import_openai_whisper(tmp_path, monkeypatch):
+    model_dir = tmp_path / "faster-whisper-base"
+    model_dir.mkdir()
+    (model_dir / "model.bin").write_bytes(b"\0" * 16)
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=FakeWhisperModel))
+    # Un import de whisper ou de torch lèverait ImportError
+    monkeypatch.setitem(sys.modules, "whisper", None)
+    monkeypatch.setitem(sys.modules, "torch", None)
+
+    backend = wt.FasterWhisperBackend()
+    loaded_name, model = wt.load_whisper_model("base", model_dir=str(tmp_path), backend=backend, threads=2)
+
+    assert loaded_name == "base"
+    assert model.path == str(model_dir)
+    assert model.kwargs["cpu_threads"] == 2
+
+
+def test_default_backend_is_openai_whisper_and_auto_announces_its_choice(tmp_path, monkeypatch):
+    (tmp_path / "faster-whisper-base").mkdir()
+    (tmp_path / "faster-whisper-base" / "model.bin").write_bytes(b"\0" * 16)
+    module = types.ModuleType("faster_whisper")
+    module.__spec__ = importlib.machinery.ModuleSpec("faster_whisper", None)
+    module.WhisperModel = FakeWhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(wt, "_announced_backends", set())
+    messages = []
+    monkeypatch.setattr(wt, "log_message", messages.append)
+
+    assert wt.ModelCache(model_dir=str(tmp_path)).backend_for("base").name == "openai-whisper"
+    assert wt.resolve_backend("auto", "base", str(tmp_path)).name == "faster-whisper"
+    wt.resolve_backend("auto", "base", str(tmp_path))
+    assert [m for m in messages if "auto" in m] == ["Moteur d'inférence 'auto' pour le modèle base: faster-whisper"]
+    # --quantize vise openai-whisper: auto ne bascule pas sur faster-whisper
+    assert wt.resolve_backend("auto", "base", str(tmp_path), quantize=True).name == "openai-whisper"
+
+
+def test_quantize_is_rejected_with_faster_whisper():
+    with pytest.raises(wt.TranscriptionError):
+        wt.resolve_backend("faster-whisper", "base", quantize=True)
@@ -0,0 +1,72 @@
+"""Décodage par lots: mêmes segments, relances et fenêtres sautées que fichier par fichier."""
+import numpy as np
+import pytest
+
+import fake_whisper
+import whisper_transcribe as wt
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake_whisper.install(monkeypatch)
+    model = fake_whisper.FakeModel()
+    # Un extrait de 30 s tient en une seule fenêtre, comme dans un lot
+    model.max_segments = 1000
+    return model
+
+
+@pytest.fixture
+def clips():
+    rng = np.random.default_rng(5)
+    clips = []
+    for level in (0.001, 0.01, 0.05, 0.1, 0.3, 0.6, 1.0, 0.02):
+        envelope = np.repeat(rng.uniform(0.05, 1.0, 30 * 4), wt.SAMPLE_RATE // 4)
+        clips.append((rng.standard_normal(30 * wt.SAMPLE_RATE) * envelope * level).astype(np.float32))
+    return clips
+
+
+def segments(result):
+    return [(round(s["start"], 2), round(s["end"], 2), s["text"]) for s in result["segments"]]
+
+
+def first_pass(model, clips, options):
+    """Mesures de qualité du premier décodage de chaque extrait"""
+    mel = np.stack([fake_whisper.log_mel_spectrogram(clip) for clip in clips]).view(fake_whisper.Tensor)
+    prompt = options["initial_prompt"]
+    return fake_whisper.decode(model, mel, fake_whisper.DecodingOptions(prompt=prompt, beam_size=options["beam_size"]))
+
+
+def check_matches_per_file(model, clips, options):
+    outputs = wt.decode_window_batch(model, clips, options)
+    retried = 0
+    for clip, output in zip(clips, outputs):
+        expected = model.transcribe(clip, **options)
+        if output is None:
+            # Relancé à plus haute température en mode fichier par fichier
+            retried += 1
+            continue
+        assert segments(output) == segments(expected)
+        assert all(segment["temperature"] == 0.0 for segment in expected["segments"])
+    return outputs, retried
+
+
+def test_batch_matches_per_file_with_default_thresholds(model, clips):
+    options = wt.build_transcribe_options()
+    outputs, retried = check_matches_per_file(model, clips, options)
+    assert 0 < retried < len(clips)
+
+
+def test_batch_uses_whisper_comparisons_at_the_thresholds(model, clips):
+    options = wt.build_transcribe_options()
+    options["compression_ratio_threshold"] = None
+    decoded = first_pass(model, clips, options)[0]
+    # Log-probabilité égale au seuil: ni relance, ni fenêtre gardée par la log-probabilité
+    options["logprob_threshold"] = decoded.avg_logprob
+    options["no_speech_threshold"] = decoded.no_speech_prob - 1e-3
+    outputs, _ = check_matches_per_file(model, clips, options)
+    assert outputs[0] == {"text": "", "segments": [], "language": "fr"}
+
+    # Probabilité de silence égale au seuil: la fenêtre est gardée
+    options["no_speech_threshold"] = decoded.no_speech_prob
+    outputs, _ = check_matches_per_file(model, clips, options)
+    assert outputs[0]["segments"]
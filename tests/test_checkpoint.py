@@ -0,0 +1,145 @@
+"""Points de reprise: une transcription interrompue puis reprise doit produire les
+mêmes segments qu'une transcription sans interruption."""
+import json
+
+import numpy as np
+import pytest
+
+import fake_whisper
+import whisper_transcribe as wt
+
+FIELDS = ("seek", "start", "end", "text", "tokens")
+
+
+class CancelAfter(wt.CancelToken):
+    """Demande l'arrêt après `windows` fenêtres décodées"""
+    def __init__(self, windows):
+        super().__init__()
+        self.remaining = windows
+
+    def stop_reason(self):
+        self.remaining -= 1
+        if self.remaining < 0:
+            self.cancel("deadline")
+        return super().stop_reason()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake_whisper.install(monkeypatch)
+    backend = wt.BACKENDS[wt.OpenAIWhisperBackend.name]
+    return wt.LoadedModel(backend, "base", fake_whisper.FakeModel())
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(1)
+    seconds = 240
+    envelope = np.repeat(rng.uniform(0.05, 1.0, seconds * 4), wt.SAMPLE_RATE // 4)
+    # Fin plus forte que le reste: le mel de la seule fin serait normalisé autrement
+    envelope[-30 * wt.SAMPLE_RATE:] *= 3
+    return (rng.standard_normal(seconds * wt.SAMPLE_RATE) * envelope * 0.1).astype(np.float32)
+
+
+def segments(result):
+    return [{key: segment[key] for key in FIELDS} for segment in result["segments"]]
+
+
+@pytest.mark.parametrize("windows", [1, 3, 6])
+@pytest.mark.parametrize("initial_prompt", [None, "Transcription en français."])
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch, model, samples, windows, initial_prompt):
+    options = {"language": "fr", "initial_prompt": initial_prompt}
+    reference = wt.transcribe_with_checkpoint(model, samples, options,
+                                              wt.TranscriptionCheckpoint(str(tmp_path / "a"), "job"))
+
+    checkpoint = wt.TranscriptionCheckpoint(str(tmp_path / "b"), "job")
+    monkeypatch.setattr(wt, "current_cancel", CancelAfter(windows))
+    with pytest.raises(wt.JobCancelled) as interrupted:
+        wt.transcribe_with_checkpoint(model, samples, options, checkpoint)
+    monkeypatch.setattr(wt, "current_cancel", None)
+    assert 0 < len(interrupted.value.segments) < len(reference["segments"])
+
+    state = checkpoint.load()
+    assert state["decoder"]["seek"] == round(state["position"] * wt.MEL_FRAMES_PER_SECOND)
+    resumed = wt.transcribe_with_checkpoint(model, samples, options, checkpoint, resume=True)
+
+    assert segments(resumed) == segments(reference)
+    assert resumed["text"] == reference["text"]
+    assert [segment["id"] for segment in resumed["segments"]] == list(range(len(reference["segments"])))
+
+
+def test_resume_decodes_only_the_remaining_windows(tmp_path, monkeypatch, model, samples):
+    checkpoint = wt.TranscriptionCheckpoint(str(tmp_path), "job")
+    monkeypatch.setattr(wt, "current_cancel", CancelAfter(4))
+    with pytest.raises(wt.JobCancelled):
+        wt.transcribe_with_checkpoint(model, samples, {"language": "fr"}, checkpoint)
+    monkeypatch.setattr(wt, "current_cancel", None)
+    wt.transcribe_with_checkpoint(model, samples, {"language": "fr"}, checkpoint, resume=True)
+    interrupted_and_resumed = model.model.windows
+
+    model.model.windows = 0
+    wt.transcribe_with_checkpoint(model, samples, {"language": "fr"},
+                                  wt.TranscriptionCheckpoint(str(tmp_path / "ref"), "job"))
+    # Aucune fenêtre décodée deux fois
+    assert interrupted_and_resumed == model.model.windows
+
+
+def test_checkpoint_without_decoder_state_falls_back_to_position(tmp_path):
+    state = {"position": 12.5, "segments": [{"text": " a", "tokens": [1, 2]}, {"text": " b", "tokens": [3]}]}
+    path = tmp_path / "job.json"
+    path.write_text(json.dumps(state))
+    assert wt.resume_state(wt.TranscriptionCheckpoint(str(tmp_path), "job").load(), {}) == \
+        {"seek": 1250, "prompt": [1, 2, 3]}
+    assert wt.resume_state(state, {"condition_on_previous_text": False})["prompt"] == []
+
+
+def interrupt(tmp_path, monkeypatch, model, samples, windows=4):
+    checkpoint = wt.TranscriptionCheckpoint(str(tmp_path), "job")
+    monkeypatch.setattr(wt, "current_cancel", CancelAfter(windows))
+    with pytest.raises(wt.JobCancelled):
+        wt.transcribe_with_checkpoint(model, samples, {"language": "fr"}, checkpoint)
+    monkeypatch.setattr(wt, "current_cancel", None)
+    return checkpoint
+
+
+def test_unknown_whisper_version_resumes_with_text_prompt(tmp_path, monkeypatch, model, samples):
+    checkpoint = interrupt(tmp_path, monkeypatch, model, samples)
+    assert checkpoint.load()["decoder"]["prompt"]
+    monkeypatch.setattr(fake_whisper.sys.modules["whisper"], "__version__", "1.1.10")
+    fake, prompts = model.model, []
+
+    def transcribe(audio, **kwargs):
+        prompts.append((kwargs["initial_prompt"], fake_whisper.get_tokenizer))
+        return fake_whisper.transcribe(fake, audio, **kwargs)
+    monkeypatch.setattr(fake, "transcribe", transcribe)
+    resumed = wt.transcribe_with_checkpoint(model, samples, {"language": "fr"}, checkpoint, resume=True)
+    # Prompt passé en texte, get_tokenizer de whisper laissé intact
+    [(prompt, tokenizer)] = prompts
+    assert prompt and prompt != wt.RESUME_PROMPT
+    assert tokenizer is fake_whisper.get_tokenizer
+    assert resumed["segments"]
+
+
+def test_resume_prompt_must_be_encoded_by_whisper(tmp_path, monkeypatch, model, samples):
+    checkpoint = interrupt(tmp_path, monkeypatch, model, samples)
+    assert checkpoint.load()["decoder"]["prompt"]
+    # whisper qui n'encoderait plus initial_prompt par le get_tokenizer de whisper.transcribe
+    fake = model.model
+    monkeypatch.setattr(fake, "transcribe", lambda audio, initial_prompt=None, **kwargs:
+                        fake_whisper.transcribe(fake, audio, **kwargs))
+    with pytest.raises(wt.TranscriptionError):
+        wt.transcribe_with_checkpoint(model, samples, {"language": "fr"}, checkpoint, resume=True)
+    assert not wt._resume_prompt_lock.locked()
+
+
+def test_checkpoints_of_interrupted_jobs_are_bounded(tmp_path):
+    for index in range(5):
+        stale = tmp_path / f"old{index}.json"
+        stale.write_text("x" * 400_000)
+        os_time = 1_000_000 + index
+        wt.os.utime(stale, (os_time, os_time))
+    checkpoint = wt.TranscriptionCheckpoint(str(tmp_path), "job", max_size_mb=1)
+    checkpoint.save([], 0.0)
+    remaining = sorted(path.name for path in tmp_path.iterdir())
+    # Les plus anciens sont supprimés, jamais le point de reprise en cours
+    assert remaining == ["job.json", "old3.json", "old4.json"]
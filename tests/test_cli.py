@@ -0,0 +1,32 @@
+"""Sortie de la ligne de commande lue par src/whisper.ts."""
+import pytest
+
+import whisper_transcribe as wt
+
+
+@pytest.fixture
+def run_main(monkeypatch, capsys, tmp_path):
+    def run(output):
+        monkeypatch.setattr(wt, "run_job", lambda *args, **kwargs: dict(output))
+        # main() installe un gestionnaire SIGTERM et un CancelToken global: les restaurer ensuite
+        monkeypatch.setattr(wt.signal, "signal", lambda *args: None)
+        monkeypatch.setattr(wt, "current_cancel", None)
+        monkeypatch.setattr("sys.argv", ["whisper_transcribe.py", str(tmp_path / "audio.wav"),
+                                         "--checkpoint-dir", ""])
+        code = wt.main()
+        return code, capsys.readouterr().out
+    return run
+
+
+def test_partial_result_is_flagged_on_stdout(run_main):
+    code, out = run_main({"text": "Bonjour", "language": "fr", "partial": True, "stop_reason": "deadline"})
+    assert code == 0
+    lines = out.splitlines()
+    assert lines.index("RÉSULTAT_PARTIEL: deadline") < lines.index("DÉBUT_TEXTE_TRANSCRIPTION")
+
+
+def test_complete_result_has_no_partial_marker(run_main):
+    code, out = run_main({"text": "Bonjour", "language": "fr"})
+    assert code == 0
+    assert "RÉSULTAT_PARTIEL" not in out
+    assert "DÉBUT_TEXTE_TRANSCRIPTION\nBonjour\nFIN_TEXTE_TRANSCRIPTION" in out
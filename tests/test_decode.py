@@ -0,0 +1,19 @@
+"""Repli sans FFmpeg: le fichier converti est relu avec soundfile."""
+import numpy as np
+import soundfile as sf
+
+import whisper_transcribe as wt
+
+
+def test_converted_audio_is_read_without_ffmpeg(tmp_path, monkeypatch):
+    def no_ffmpeg(*args, **kwargs):
+        raise AssertionError("FFmpeg ne doit pas être appelé")
+    monkeypatch.setattr(wt, "decode_audio", no_ffmpeg)
+    path = tmp_path / "converted.wav"
+    tone = np.sin(np.linspace(0, 2000 * np.pi, 44100)).astype(np.float32) * 0.5
+    sf.write(str(path), np.stack([tone, tone], axis=1), 44100, subtype="PCM_16")
+
+    samples = wt.read_converted_audio(str(path))
+    assert samples.dtype == np.float32
+    assert abs(len(samples) - wt.SAMPLE_RATE) <= 1
+    assert 0.4 < np.abs(samples).max() < 0.6
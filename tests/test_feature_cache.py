@@ -0,0 +1,66 @@
+"""Cache encodeur: relu au même seek de whisper, sans changer les fenêtres ni le texte décodés."""
+import numpy as np
+import pytest
+
+import fake_whisper
+import whisper_transcribe as wt
+
+FIELDS = ("seek", "start", "end", "text", "tokens")
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake_whisper.install(monkeypatch)
+    backend = wt.BACKENDS[wt.OpenAIWhisperBackend.name]
+    return wt.LoadedModel(backend, "base", fake_whisper.FakeModel())
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(2)
+    seconds = 150
+    envelope = np.repeat(rng.uniform(0.05, 1.0, seconds * 4), wt.SAMPLE_RATE // 4)
+    return (rng.standard_normal(seconds * wt.SAMPLE_RATE) * envelope * 0.1).astype(np.float32)
+
+
+def segments(result):
+    return [{key: segment[key] for key in FIELDS} for segment in result["segments"]]
+
+
+def transcribe(model, samples, options, cache=None):
+    calls = model.model.encoder.calls
+    with wt.feature_cache_scope(cache, wt.audio_fingerprint(samples), "base"):
+        result = model.transcribe(samples, options)
+    return segments(result), model.model.encoder.calls - calls
+
+
+def test_second_pass_reuses_encoder_outputs_without_changing_output(tmp_path, model, samples):
+    first, second = {"language": "fr", "beam_size": 5}, {"language": "fr", "beam_size": 1}
+    reference_first, reference_calls = transcribe(model, samples, first)
+    reference_second, uncached_calls = transcribe(model, samples, second)
+
+    cache = wt.FeatureCache(str(tmp_path))
+    # Premier passage: cache vide, mêmes fenêtres et même texte que sans cache
+    cached_first, first_calls = transcribe(model, samples, first, cache)
+    assert cached_first == reference_first
+    # Seules les relances en température d'une même fenêtre sont relues
+    assert first_calls == cache.misses > 0
+    assert cache.hits == reference_calls - first_calls > 0
+
+    misses, hits = cache.misses, cache.hits
+    cached_second, calls = transcribe(model, samples, second, cache)
+    assert cached_second == reference_second
+    assert cache.hits > hits
+    # Seules les fenêtres dont le seek a changé repassent dans l'encodeur
+    assert calls == cache.misses - misses < uncached_calls
+
+
+def test_windows_follow_whisper_seek(tmp_path, model, samples):
+    cache = wt.FeatureCache(str(tmp_path))
+    options = {"language": "fr"}
+    reference, _ = transcribe(model, samples, options)
+    cached, _ = transcribe(model, samples, options, cache)
+    assert [s["seek"] for s in cached] == [s["seek"] for s in reference]
+    # Un nouveau passage identique ne réencode aucune fenêtre
+    _, calls = transcribe(model, samples, options, cache)
+    assert calls == 0
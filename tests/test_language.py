@@ -0,0 +1,55 @@
+"""--language auto: détection unique par fichier et par modèle, modèle chargé seulement si nécessaire."""
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import whisper_transcribe as wt
+
+
+class StubModel:
+    def __init__(self, name, language):
+        self.name = name
+        self.language = language
+        self.calls = 0
+
+    def detect_language(self, samples):
+        self.calls += 1
+        return self.language, 0.9
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    monkeypatch.setattr(wt, "_detected_languages", OrderedDict())
+
+
+@pytest.fixture
+def audio():
+    return (np.random.default_rng(0).standard_normal(40 * wt.SAMPLE_RATE) * 0.2).astype(np.float32)
+
+
+def test_fixed_language_does_not_load_the_model(audio):
+    def get_model():
+        raise AssertionError("modèle chargé sans détection")
+    options = wt.resolve_language(get_model, audio, {"language": "fr"}, "large")
+    assert options["language"] == "fr"
+
+
+def test_detection_is_cached_per_model(tmp_path, audio):
+    cache = wt.ResultCache(str(tmp_path))
+    tiny, large = StubModel("tiny", "nl"), StubModel("large", "de")
+    fingerprint = wt.audio_fingerprint(audio)
+
+    for _ in range(2):
+        assert wt.resolve_language(lambda: tiny, audio, {"language": "auto"}, "tiny", fingerprint,
+                                   cache)["language"] == "nl"
+        assert wt.resolve_language(lambda: large, audio, {"language": "auto"}, "large", fingerprint,
+                                   cache)["language"] == "de"
+    assert (tiny.calls, large.calls) == (1, 1)
+
+    # Processus neuf: relu du cache disque, toujours par modèle, sans charger de modèle
+    wt._detected_languages.clear()
+    def get_model():
+        raise AssertionError("détection relancée malgré le cache disque")
+    assert wt.resolve_language(get_model, audio, {"language": "auto"}, "large", fingerprint,
+                               cache)["language"] == "de"
@@ -0,0 +1,53 @@
+"""Progression et diffusion des segments quand la boucle de whisper.transcribe change."""
+import numpy as np
+import pytest
+
+import fake_whisper
+import whisper_transcribe as wt
+
+
+class Collector(wt.SegmentStreamer):
+    """SegmentStreamer qui note le nombre de segments connus à chaque transmission"""
+    def __init__(self):
+        super().__init__(emit=False)
+        self.sizes = []
+
+    def push(self, segments, position=None):
+        self.sizes.append(len(segments))
+        super().push(segments, position)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake_whisper.install(monkeypatch)
+    backend = wt.BACKENDS[wt.OpenAIWhisperBackend.name]
+    return wt.LoadedModel(backend, "base", fake_whisper.FakeModel())
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(3)
+    return (rng.standard_normal(120 * wt.SAMPLE_RATE) * 0.1).astype(np.float32)
+
+
+def test_segments_stream_while_decoding(tmp_path, model, samples):
+    collector = Collector()
+    result = wt.transcribe_with_checkpoint(model, samples, {"language": "fr"},
+                                           wt.TranscriptionCheckpoint(str(tmp_path), "job"), streamer=collector)
+    assert len([size for size in collector.sizes if 0 < size < len(result["segments"])]) > 1
+    assert collector.emitted == len(result["segments"])
+
+
+def test_missing_loop_locals_warn_once_and_fall_back_to_final_result(tmp_path, monkeypatch, model, samples):
+    monkeypatch.setattr(wt, "_find_caller_local", lambda name, max_depth=8: None)
+    monkeypatch.setattr(wt, "_missing_loop_locals", set())
+    messages = []
+    monkeypatch.setattr(wt, "log_message", messages.append)
+    collector = Collector()
+    result = wt.transcribe_with_checkpoint(model, samples, {"language": "fr"},
+                                           wt.TranscriptionCheckpoint(str(tmp_path), "job"), streamer=collector)
+    warnings = [message for message in messages if message.startswith("ATTENTION")]
+    assert len(warnings) == 1 and "all_segments" in warnings[0]
+    # Rien pendant le décodage, tous les segments à la fin
+    assert collector.sizes == [len(result["segments"])]
+    assert collector.emitted == len(result["segments"]) > 0
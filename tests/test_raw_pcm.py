@@ -0,0 +1,52 @@
+"""Lecture des WAV sans en-tête: le memmap doit rendre exactement les échantillons
+de l'ancienne réparation (en-tête RIFF ajouté puis décodage du WAV)."""
+import numpy as np
+import pytest
+import soundfile as sf
+
+import whisper_transcribe as wt
+
+
+def write_raw(path, samples, trailing=b""):
+    with open(path, "wb") as f:
+        f.write(samples.astype("<i2").tobytes() + trailing)
+
+
+def decode_repaired(path):
+    repaired = wt.repair_wav_file(str(path))
+    samples, sample_rate = sf.read(repaired, dtype="float32")
+    assert sample_rate == wt.SAMPLE_RATE
+    return samples
+
+
+@pytest.fixture
+def pcm():
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-32768, 32768, size=wt.SAMPLE_RATE * 3, dtype=np.int64)
+    # Valeurs extrêmes et zéro, là où une conversion approximative se trahit
+    samples[:3] = [-32768, 0, 32767]
+    return samples
+
+
+def test_memmap_matches_repaired_wav(tmp_path, pcm):
+    path = tmp_path / "upload.wav"
+    write_raw(path, pcm)
+    samples = wt.load_raw_pcm(str(path))
+    assert samples.dtype == np.float32
+    np.testing.assert_array_equal(samples, decode_repaired(path))
+
+
+def test_odd_trailing_byte_is_ignored(tmp_path, pcm):
+    path = tmp_path / "upload.wav"
+    write_raw(path, pcm, trailing=b"\x7f")
+    samples = wt.load_raw_pcm(str(path))
+    assert len(samples) == len(pcm)
+    np.testing.assert_array_equal(samples, pcm.astype(np.float32) / 32768.0)
+    np.testing.assert_array_equal(samples, decode_repaired(path)[:len(pcm)])
+
+
+def test_empty_file_is_rejected(tmp_path):
+    path = tmp_path / "empty.wav"
+    path.write_bytes(b"\x00")
+    with pytest.raises(ValueError):
+        wt.load_raw_pcm(str(path))
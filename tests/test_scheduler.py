@@ -0,0 +1,86 @@
+import threading
+import time
+
+import whisper_transcribe as wt
+
+
+def run(scheduler, job_id):
+    assert scheduler.submit({"id": job_id, "audio": "a.wav"})["type"] == "queued"
+    entry = scheduler.next_job(timeout=0)
+    return scheduler.finish(entry, {"type": "result", "id": job_id})
+
+
+def test_early_cancel_rejects_job_once():
+    scheduler = wt.JobScheduler()
+    assert scheduler.cancel("1") is None
+    assert scheduler.submit({"id": "1", "audio": "a.wav"})["cancelled"] is True
+    # L'annulation est consommée: le même id peut être soumis à nouveau
+    assert scheduler.submit({"id": "1", "audio": "a.wav"})["type"] == "queued"
+
+
+def test_cancel_of_finished_job_does_not_block_id_reuse():
+    scheduler = wt.JobScheduler()
+    run(scheduler, "1")
+    scheduler.cancel("1")
+    assert not scheduler.cancelled
+    assert run(scheduler, "1")["type"] == "result"
+
+
+def test_early_cancel_expires(monkeypatch):
+    scheduler = wt.JobScheduler()
+    now = [1000.0]
+    monkeypatch.setattr(wt.time, "monotonic", lambda: now[0])
+    scheduler.cancel("1")
+    now[0] += wt.EARLY_CANCEL_SECONDS + 1
+    assert scheduler.submit({"id": "1", "audio": "a.wav"})["type"] == "queued"
+    assert not scheduler.cancelled
+
+
+def test_early_cancels_are_bounded():
+    scheduler = wt.JobScheduler()
+    for index in range(wt.EARLY_CANCEL_MAX * 3):
+        scheduler.cancel(f"inconnu-{index}")
+    assert len(scheduler.cancelled) == wt.EARLY_CANCEL_MAX
+    # Les plus anciennes sont oubliées en premier
+    assert f"inconnu-{wt.EARLY_CANCEL_MAX * 3 - 1}" in scheduler.cancelled
+    assert "inconnu-0" not in scheduler.cancelled
+
+
+def test_submit_does_not_wait_for_audio_probe():
+    release = threading.Event()
+    probed = threading.Event()
+
+    def probe(job):
+        release.wait(5)
+        probed.set()
+        return 10.0
+    scheduler = wt.JobScheduler(probe=probe)
+    started = time.monotonic()
+    assert scheduler.submit({"id": "long", "audio_file": "a.wav"})["type"] == "queued"
+    # Annulations et nouvelles requêtes passent pendant ffprobe
+    assert scheduler.cancel("long")["cancelled"] is True
+    assert scheduler.submit({"id": "court", "audio_file": "b.wav"})["type"] == "queued"
+    assert time.monotonic() - started < 1
+    release.set()
+    assert probed.wait(5)
+    scheduler.close()
+
+
+def test_probed_duration_reorders_queue():
+    durations = {"a.wav": 600.0, "b.wav": 5.0}
+    scheduler = wt.JobScheduler(probe=lambda job: durations[job["audio_file"]])
+    scheduler.submit({"id": "long", "audio_file": "a.wav"})
+    scheduler.submit({"id": "court", "audio_file": "b.wav"})
+    deadline = time.monotonic() + 5
+    while any(entry["audio_seconds"] is None for *_, entry in scheduler.pending) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert scheduler.next_job(timeout=0)["id"] == "court"
+
+
+def test_cancel_between_pop_and_start_is_not_lost():
+    scheduler = wt.JobScheduler()
+    scheduler.submit({"id": "1", "audio": "a.wav"})
+    entry = scheduler.next_job(timeout=0)
+    # Le job est sorti de la file mais son exécuteur ne l'a pas encore démarré
+    scheduler.cancel("1")
+    assert entry["cancel"].stop_reason() == "cancelled"
@@ -0,0 +1,23 @@
+"""VAD Silero: le modèle n'est chargé qu'une fois par processus."""
+import sys
+import types
+
+import numpy as np
+
+import fake_whisper
+import whisper_transcribe as wt
+
+
+def test_silero_model_is_loaded_once(monkeypatch):
+    loads = []
+    module = types.ModuleType("silero_vad")
+    module.load_silero_vad = lambda: loads.append(1) or object()
+    module.get_speech_timestamps = lambda audio, model, sampling_rate: [{"start": 0, "end": len(audio)}]
+    monkeypatch.setitem(sys.modules, "silero_vad", module)
+    monkeypatch.setitem(sys.modules, "torch", fake_whisper.torch)
+    monkeypatch.setattr(wt, "_silero_model", None)
+
+    audio = np.zeros(wt.SAMPLE_RATE, dtype=np.float32)
+    for _ in range(3):
+        assert wt.silero_vad_regions(audio) == [(0, wt.SAMPLE_RATE)]
+    assert loads == [1]
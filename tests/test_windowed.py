@@ -0,0 +1,62 @@
+"""Transcription par morceaux (--windowed): la mémoire résidente ne doit pas croître
+avec la durée de l'enregistrement."""
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import whisper_transcribe as wt
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Exécuté dans un processus neuf: ru_maxrss y mesure le pic de ce seul décodage
+CHILD = """
+import json, resource, sys
+sys.path.insert(0, sys.argv[1])
+import numpy as np
+import whisper_transcribe as wt
+
+class StubModel:
+    def transcribe(self, audio, options, verbose=None, progress=False, streamer=None, resume=None):
+        # Un segment toutes les 7 s, comme un décodeur qui suit le signal
+        bounds = np.arange(0.0, len(audio) / wt.SAMPLE_RATE, 7.0)
+        segments = [{"seek": int(start * 100), "start": float(start), "end": float(min(start + 7.0, len(audio) / wt.SAMPLE_RATE)),
+                     "text": f" {float(np.abs(audio).mean()):.3f}", "tokens": []} for start in bounds]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": "fr"}
+
+result = wt.transcribe_windowed(StubModel(), sys.argv[2], {"language": "fr"}, raw_pcm=True, window_seconds=60)
+print(json.dumps({"peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "segments": len(result["segments"]), "end": result["segments"][-1]["end"]}))
+"""
+
+MINUTES = 30
+RSS_GROWTH_CAP_MB = 40
+
+
+def write_raw_pcm(path, minutes):
+    """PCM s16le 16 kHz écrit une minute à la fois"""
+    rng = np.random.default_rng(0)
+    with open(path, "wb") as f:
+        for _ in range(minutes):
+            f.write((rng.standard_normal(60 * wt.SAMPLE_RATE) * 3000).astype("<i2").tobytes())
+
+
+def run_child(path):
+    output = subprocess.run([sys.executable, "-c", CHILD, ROOT, path], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def test_windowed_peak_rss_does_not_grow_with_duration(tmp_path):
+    short, long = str(tmp_path / "short.raw"), str(tmp_path / "long.raw")
+    write_raw_pcm(short, 1)
+    write_raw_pcm(long, MINUTES)
+
+    baseline, measured = run_child(short), run_child(long)
+
+    assert measured["end"] == MINUTES * 60
+    # Le signal entier en float32 occuperait ~115 Mo: seule une fenêtre et son report sont en mémoire
+    full_signal_mb = MINUTES * 60 * wt.SAMPLE_RATE * 4 / (1024 * 1024)
+    assert RSS_GROWTH_CAP_MB < full_signal_mb / 2
+    assert measured["peak_rss_mb"] - baseline["peak_rss_mb"] < RSS_GROWTH_CAP_MB, (baseline, measured)
@@ -1,84 +1,682 @@
 import sys
 import json
-import whisper
 import argparse
 import os
-from datetime import timedelta
+import io
 import wave
 import numpy as np
 import soundfile as sf
 import subprocess
 import tempfile
 import codecs
-import tqdm
 import time
 import threading
 import traceback
+import gc
+import cProfile
+import contextlib
+import importlib
+import importlib.util
+import types
+import hashlib
+import math
+import multiprocessing
+import shutil
+import signal
+import struct
+import heapq
+from collections import OrderedDict, deque
+
+# whisper (et donc torch) et tqdm ne sont importés qu'au chargement du modèle:
+# les fichiers invalides sont rejetés sans payer ce coût de démarrage.
 
 # Configurer l'encodage de sortie
 sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
 sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
 
+# Fréquence d'échantillonnage attendue par Whisper
+SAMPLE_RATE = 16000
+
+# Timeout (secondes) du décodage FFmpeg en mémoire
+FFMPEG_TIMEOUT = 120
+
+# Amplitude en dessous de laquelle un signal est considéré comme silencieux
+SILENCE_THRESHOLD = 0.01
+
+# Avec --vad, les zones parlées ne sont extraites que si elles couvrent moins
+# de cette fraction du signal (sinon le fichier complet est transcrit)
+VAD_MIN_GAIN = 0.9
+
+# Durée minimale (secondes) pour découper un fichier avec --parallel
+PARALLEL_MIN_DURATION = 120
+
+# Recouvrement (secondes) entre deux morceaux coupés hors d'un silence
+CHUNK_OVERLAP = 1.0
+
+# Mode --live: durée du tampon circulaire, fenêtre maximale redécodée sans
+# accord, intervalle entre deux décodages et longueur du prompt (caractères)
+LIVE_BUFFER_SECONDS = 60
+LIVE_MAX_WINDOW = 15
+LIVE_STEP = 1.0
+LIVE_PROMPT_CHARS = 200
+
+# Extensions décodées directement par FFmpeg, sans vérification de l'en-tête RIFF
+COMPRESSED_EXTENSIONS = ('.mp3', '.webm', '.ogg', '.oga', '.opus', '.m4a', '.mp4', '.aac', '.flac')
+
+# Mode --batch: fichiers retenus dans un dossier, fenêtres regroupées dans un
+# même passage de l'encodeur et nombre de threads de décodage audio
+BATCH_EXTENSIONS = ('.wav', '.raw', '.pcm') + COMPRESSED_EXTENSIONS
+BATCH_SIZE = 8
+BATCH_PREFETCH = 4
+
+# Durée (secondes) d'une fenêtre d'entrée de l'encodeur Whisper et trames mel par seconde
+WINDOW_SECONDS = 30
+MEL_FRAMES_PER_SECOND = 100
+
+# Transcription par morceaux lus en flux (mémoire bornée): durée d'un morceau et
+# durée à partir de laquelle ce mode est choisi automatiquement (secondes)
+WINDOWED_CHUNK_SECONDS = 300
+WINDOWED_MIN_DURATION = 1800
+
+# Points de reprise: intervalle minimal (secondes) entre deux écritures,
+# longueur (caractères) du texte déjà transcrit repris comme prompt entre deux
+# morceaux de --windowed, nombre de jetons de prompt du décodeur enregistrés
+# (il n'en lit pas plus: n_text_ctx // 2 - 1) et taille maximale (Mo) du dossier
+# des points de reprise laissés par les jobs interrompus
+CHECKPOINT_INTERVAL = 10
+CHECKPOINT_PROMPT_CHARS = 400
+CHECKPOINT_PROMPT_TOKENS = 223
+CHECKPOINT_MAX_MB = 256
+
+# Prompt factice passé à whisper lors d'une reprise: son encodage rend les jetons
+# de prompt enregistrés dans le point de reprise (voir resume_prompt_tokens), avec
+# les versions d'openai-whisper qui encodent initial_prompt par le get_tokenizer
+# de whisper.transcribe (les autres reçoivent le texte décodé de ces jetons)
+RESUME_PROMPT = "<whisper-transcribe:resume>"
+RESUME_PROMPT_MIN_WHISPER = 20230314
+
+# --language auto: langue retenue quand la détection est incertaine (probabilité
+# sous le seuil), durée maximale parcourue pour trouver la première prise de
+# parole (secondes) et nombre de détections gardées en mémoire
+DEFAULT_FALLBACK_LANGUAGE = "fr"
+LANGUAGE_CONFIDENCE_THRESHOLD = 0.5
+LANGUAGE_SCAN_SECONDS = 600
+LANGUAGE_MEMO_SIZE = 256
+
+# Planificateur du mode --serve: jobs en attente au-delà desquels une requête est
+# refusée, priorités par défaut (plus petit = plus tôt), facteur temps réel supposé
+# avant le premier job terminé, durée supposée d'un audio illisible (secondes),
+# nombre de jobs terminés gardés pour les métriques, et durée (secondes) et nombre
+# maximal des annulations reçues avant leur job
+SERVE_MAX_QUEUE = 32
+JOB_PRIORITY_LIVE = 0
+JOB_PRIORITY_DEFAULT = 1
+DEFAULT_RTF_ESTIMATE = 0.5
+UNKNOWN_AUDIO_SECONDS = 300
+JOB_METRICS_HISTORY = 100
+EARLY_CANCEL_SECONDS = 30
+EARLY_CANCEL_MAX = 256
+
 # Variable globale pour stocker le chemin du fichier WAV temporaire à utiliser
 temp_wav_to_use = None
 
+# Chemin d'un fichier sans en-tête RIFF à lire comme du PCM brut s16le 16 kHz mono
+raw_pcm_to_use = None
+
+# Identifiant du job en cours en mode --serve (None en mode ligne de commande)
+current_job_id = None
+
+# Demande d'arrêt du job en cours (CancelToken), None hors d'un job
+current_cancel = None
+
+# Positionné par SIGTERM: le worker s'arrête après le job en cours
+_shutdown_requested = threading.Event()
+
+# Protège current_job_id/current_cancel, lus par le thread de lecture du mode --serve
+_job_lock = threading.Lock()
+
+# (file, numéro d'emplacement) dans un processus d'exécution du mode --serve:
+# les événements passent par le processus principal au lieu de stdout
+_event_sink = None
+
+# Modèle Silero VAD chargé (voir silero_vad_regions) et verrou de son utilisation
+_silero_model = None
+_silero_lock = threading.Lock()
+
+# Variables de la boucle de whisper.transcribe déjà signalées introuvables
+_missing_loop_locals = set()
+
+# Sérialise les reprises: resume_prompt_tokens remplace get_tokenizer dans whisper.transcribe
+_resume_prompt_lock = threading.Lock()
+
+# Cache encodeur actif pour le job du thread courant (voir feature_cache_scope)
+_feature_scope = threading.local()
+
+# Langues détectées par empreinte audio (LRU): une seule détection par fichier
+_detected_languages = OrderedDict()
+
+# Verrou pour ne pas entrelacer les lignes JSON écrites sur stdout
+_stdout_lock = threading.Lock()
+
 def log_message(message):
     """Fonction pour envoyer des messages de log au serveur"""
     print(message, file=sys.stderr)
     sys.stderr.flush()
 
+def emit_event(event):
+    """Écrit un événement JSON sur une ligne de stdout (mode --serve)"""
+    if _event_sink is not None:
+        events, index = _event_sink
+        events.put(("event", index, json.loads(json.dumps(event, default=_json_default))))
+        return
+    with _stdout_lock:
+        sys.stdout.write(json.dumps(event, ensure_ascii=False, default=_json_default) + "\n")
+        sys.stdout.flush()
+
 def send_progress(progress):
     """Envoie la progression du chargement du modèle"""
-    print(json.dumps({"type": "modelLoadingProgress", "progress": progress}), file=sys.stderr)
+    emit_progress_event({"type": "modelLoadingProgress", "progress": progress})
+
+def emit_progress_event(event):
+    """Envoie un événement JSON de suivi: sur stderr en ligne de commande,
+    sur stdout avec l'identifiant du job en mode --serve"""
+    if current_job_id is not None:
+        emit_event({**event, "id": current_job_id})
+        return
+    print(json.dumps(event, ensure_ascii=False), file=sys.stderr)
     sys.stderr.flush()
 
+class Stage:
+    """Mesure une étape du pipeline et émet un événement JSON au début et à la fin.
+
+    Les champs complémentaires (octets traités, secondes d'audio...) peuvent être
+    ajoutés pendant l'étape via `stage.fields`.
+    """
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = fields
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        emit_progress_event({"type": "stage", "stage": self.name, "event": "start",
+                             "timestamp": self.start, **self.fields})
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.time()
+        emit_progress_event({"type": "stage", "stage": self.name, "event": "end",
+                             "status": "ok" if exc_type is None else "error",
+                             "start": self.start, "end": end, "duration": end - self.start,
+                             **self.fields})
+        return False
+
+def _progress_tqdm_class(callback):
+    """Sous-classe de tqdm qui transmet chaque avancement à `callback(fait, total)`,
+    y compris quand la barre est désactivée"""
+    import tqdm
+
+    class ProgressTqdm(tqdm.tqdm):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.done = 0
+
+        def update(self, n=1):
+            self.done += n
+            if self.total:
+                callback(self.done, self.total)
+            return super().update(n)
+    return ProgressTqdm
+
+@contextlib.contextmanager
+def track_tqdm(module, callback):
+    """Remplace temporairement la barre tqdm utilisée par un module de whisper"""
+    original = module.tqdm
+    progress_class = _progress_tqdm_class(callback)
+    if isinstance(original, types.ModuleType):
+        module.tqdm = types.SimpleNamespace(tqdm=progress_class)  # `import tqdm`
+    else:
+        module.tqdm = progress_class  # `from tqdm import tqdm`
+    try:
+        yield
+    finally:
+        module.tqdm = original
+
 class ModelLoadingObserver:
-    """Classe pour surveiller le chargement du modèle et envoyer des mises à jour de progression"""
-    def __init__(self, estimated_load_time=30):
-        self.estimated_load_time = estimated_load_time  # temps estimé en secondes
-        self.start_time = None
-        self.is_loading = False
-        self.thread = None
-        
-    def start(self):
-        self.start_time = time.time()
-        self.is_loading = True
-        self.thread = threading.Thread(target=self._update_progress)
-        self.thread.daemon = True
-        self.thread.start()
-    
-    def stop(self):
-        self.is_loading = False
-        if self.thread:
-            self.thread.join(timeout=1)
-            
-    def _update_progress(self):
-        # Envoyer la progression initiale
-        send_progress(0.01)
-        
-        while self.is_loading:
-            elapsed = time.time() - self.start_time
-            # Calculer la progression de façon non-linéaire pour simuler le chargement
-            # Plus rapide au début, plus lent à la fin
-            progress = min(0.95, elapsed / self.estimated_load_time)
+    """Suit le chargement réel du modèle: progression du téléchargement éventuel
+    (jusqu'à 90 %), puis 100 % une fois les poids chargés.
+
+    Le téléchargement n'est suivi que pour openai-whisper (`track_downloads`): les
+    autres moteurs n'importent ni whisper ni torch.
+    """
+    def __init__(self, track_downloads=True):
+        self.last_progress = 0.0
+        self.track_downloads = track_downloads
+        self._stack = None
+
+    def __enter__(self):
+        send_progress(0.0)
+        self._stack = contextlib.ExitStack()
+        if self.track_downloads:
+            import whisper
+            self._stack.enter_context(track_tqdm(whisper, self._on_download))
+        return self
+
+    def _on_download(self, done, total):
+        progress = round(0.9 * min(done / total, 1.0), 2)
+        if progress > self.last_progress:
+            self.last_progress = progress
             send_progress(progress)
-            time.sleep(1)  # Mettre à jour chaque seconde
-        
-        # Progression finale
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
         send_progress(1.0)
+        return False
+
+def emit_job_event(event):
+    """Écrit un événement de sortie sur stdout, avec l'identifiant du job en mode --serve"""
+    if current_job_id is not None:
+        event = {**event, "id": current_job_id}
+    emit_event(event)
+
+def _find_caller_local(name, max_depth=8):
+    """Cherche une variable locale `name` dans les appelants (la boucle de whisper.transcribe)"""
+    frame = sys._getframe(1)
+    for _ in range(max_depth):
+        if frame is None:
+            return None
+        if name in frame.f_locals:
+            return frame.f_locals[name]
+        frame = frame.f_back
+    return None
+
+def _whisper_loop_local(name):
+    """Variable locale `name` de la boucle de whisper.transcribe, vue depuis la barre tqdm.
+
+    Si elle est introuvable (whisper modifié), un avertissement est écrit une seule
+    fois: les segments ne sont alors transmis qu'à la fin du décodage (résultat
+    final) et les points de reprise n'enregistrent pas l'état du décodeur.
+    """
+    value = _find_caller_local(name)
+    if value is None and name not in _missing_loop_locals:
+        _missing_loop_locals.add(name)
+        log_message(f"ATTENTION: variable '{name}' introuvable dans la boucle de whisper.transcribe: "
+                    f"segments transmis en fin de décodage, points de reprise sans état du décodeur")
+    return value
+
+class SegmentStreamer:
+    """Émet chaque segment terminé sur une ligne JSON dès que le décodeur le produit.
+
+    `push` reçoit la liste complète des segments connus et ne traite que les
+    nouveaux. `to_original` permet de replacer les horodatages (VAD). Les
+    segments sont aussi transmis à chaque SegmentWriter de `writers`; emit=False
+    n'écrit que dans ceux-ci. Les appelants poussent toujours le résultat final:
+    si la boucle de whisper n'expose plus ses segments (voir _whisper_loop_local),
+    ils sont tous transmis à la fin du décodage.
+    """
+    FIELDS = ("id", "start", "end", "text", "avg_logprob", "no_speech_prob", "words")
+
+    def __init__(self, emit=True, writers=()):
+        self.emitted = 0
+        self.to_original = None
+        self.emit = emit
+        self.writers = list(writers)
+
+    def push(self, segments, position=None):
+        for segment in segments[self.emitted:]:
+            record = {key: segment[key] for key in self.FIELDS if key in segment}
+            if self.to_original is not None:
+                record["words"] = [dict(word) for word in record.get("words") or []]
+                remap_segment(record, self.to_original)
+            if self.emit:
+                emit_job_event({"type": "segment", **record})
+            for writer in self.writers:
+                writer.write_segment(record)
+        self.emitted = max(self.emitted, len(segments))
+
+@contextlib.contextmanager
+def transcription_progress(streamer=None, report=True, start=0):
+    """Émet la progression réelle du décodage (position de la fenêtre / trames totales),
+    sauf si report=False.
+
+    Avec un SegmentStreamer, les segments ajoutés par whisper depuis la fenêtre
+    précédente sont émis à chaque avancement. Une demande d'arrêt du job est
+    vérifiée après chaque fenêtre (JobCancelled). `start` est la trame où le
+    décodage a commencé (reprise).
+    """
+    def on_update(done, total):
+        # La barre tqdm de whisper avance du seek initial au seek courant, en trames mel
+        seek = start + done
+        state = getattr(_feature_scope, "state", None)
+        if state is not None:
+            state["seek"] = int(seek)  # Fenêtre suivante pour le cache de l'encodeur
+        if report:
+            emit_progress_event({"type": "transcriptionProgress", "progress": round(min(seek / total, 1.0), 4),
+                                 "frames": int(seek), "total_frames": int(total)})
+        segments = None
+        if streamer is not None or current_cancel is not None:
+            segments = _whisper_loop_local("all_segments")
+        if streamer is not None and segments is not None:
+            record_state = getattr(streamer, "record_decoder_state", None)
+            if record_state is not None:
+                tokens = _whisper_loop_local("all_tokens")
+                reset_since = _whisper_loop_local("prompt_reset_since")
+                if tokens is not None and reset_since is not None:
+                    record_state(int(seek), tokens[reset_since:])
+            streamer.push(segments, seek / MEL_FRAMES_PER_SECOND)
+        # Point d'arrêt coopératif entre deux fenêtres: l'exception traverse model.transcribe
+        check_cancelled(segments)
+    with track_tqdm(importlib.import_module("whisper.transcribe"), on_update):
+        yield
+
+class _ResumePromptTokenizer:
+    """Tokenizer de whisper.transcribe dont l'encodage de RESUME_PROMPT rend des jetons donnés"""
+    def __init__(self, tokenizer, tokens, used):
+        self._tokenizer = tokenizer
+        self._tokens = list(tokens)
+        self._used = used
+
+    def encode(self, text, **kwargs):
+        if text.strip() == RESUME_PROMPT:
+            self._used.append(True)
+            return list(self._tokens)
+        return self._tokenizer.encode(text, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
+@contextlib.contextmanager
+def resume_prompt_tokens(tokens):
+    """Dans ce bloc, whisper.transcribe lit `tokens` comme jetons du prompt initial RESUME_PROMPT.
+
+    Une reprise redonne ainsi au décodeur exactement le prompt qu'il avait au point
+    de reprise, au lieu d'un texte retokenisé. Le remplacement vaut pour tout le
+    processus: les reprises sont sérialisées par _resume_prompt_lock, et un
+    RESUME_PROMPT jamais encodé (whisper modifié) lève TranscriptionError.
+    """
+    module = importlib.import_module("whisper.transcribe")
+    used = []
+    with _resume_prompt_lock:
+        original = module.get_tokenizer
+        module.get_tokenizer = lambda *args, **kwargs: _ResumePromptTokenizer(original(*args, **kwargs),
+                                                                              tokens, used)
+        try:
+            yield
+        finally:
+            module.get_tokenizer = original
+    if not used:
+        raise TranscriptionError("Reprise impossible: whisper n'a pas encodé le prompt de reprise")
+
+def resume_prompt_supported() -> bool:
+    """openai-whisper installé encode-t-il initial_prompt comme l'attend resume_prompt_tokens"""
+    version = str(getattr(importlib.import_module("whisper"), "__version__", ""))
+    return version.isdigit() and int(version) >= RESUME_PROMPT_MIN_WHISPER
+
+def resume_prompt_text(model, tokens) -> str:
+    """Texte des jetons de prompt d'une reprise (sans les jetons spéciaux ni horodatages)"""
+    tokenizer = importlib.import_module("whisper.transcribe").get_tokenizer(model.is_multilingual)
+    return tokenizer.decode([token for token in tokens if token < tokenizer.eot]).strip()
+
+def format_timestamp(seconds: float, decimal_marker=",") -> str:
+    """Convertit les secondes en horodatage SRT (HH:MM:SS,mmm), ou WebVTT avec decimal_marker='.'"""
+    milliseconds = max(int(round(seconds * 1000)), 0)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_marker}{milliseconds:03d}"
+
+class SegmentWriter:
+    """Écrit les segments d'une transcription dans un format de sortie, au fil de leur arrivée.
+
+    `write_segment` reçoit chaque segment validé (horodatages sur la chronologie
+    d'origine), `finish` le résultat complet ({"text", "language"}) à la fin.
+    """
+    extension = None
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def write_segment(self, segment):
+        self.count += 1
+        self._write(segment)
+        self.stream.flush()
+
+    def _write(self, segment):
+        raise NotImplementedError
+
+    def finish(self, result):
+        self.stream.flush()
+
+class SrtWriter(SegmentWriter):
+    extension = "srt"
+
+    def _write(self, segment):
+        self.stream.write(f"{self.count}\n{format_timestamp(segment['start'])} --> "
+                          f"{format_timestamp(segment['end'])}\n{segment['text'].strip()}\n\n")
+
+class VttWriter(SegmentWriter):
+    extension = "vtt"
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        stream.write("WEBVTT\n\n")
+
+    def _write(self, segment):
+        self.stream.write(f"{format_timestamp(segment['start'], '.')} --> "
+                          f"{format_timestamp(segment['end'], '.')}\n{segment['text'].strip()}\n\n")
+
+class TsvWriter(SegmentWriter):
+    """Une ligne par segment: début et fin en millisecondes entières, texte"""
+    extension = "tsv"
 
-def format_timestamp(seconds: float) -> str:
-    """Convertit les secondes en format SRT (HH:MM:SS,mmm)"""
-    return str(timedelta(seconds=seconds)).replace('.', ',')[:11]
+    def __init__(self, stream):
+        super().__init__(stream)
+        stream.write("start\tend\ttext\n")
+
+    def _write(self, segment):
+        text = " ".join(segment["text"].split())
+        self.stream.write(f"{int(round(segment['start'] * 1000))}\t{int(round(segment['end'] * 1000))}\t{text}\n")
+
+class JsonWriter(SegmentWriter):
+    """Document {"segments": [...], "text", "language"} écrit segment par segment"""
+    extension = "json"
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        stream.write('{"segments": [')
+
+    def _write(self, segment):
+        self.stream.write(("" if self.count == 1 else ",\n")
+                          + json.dumps(segment, ensure_ascii=False, default=_json_default))
+
+    def finish(self, result):
+        self.stream.write(f'], "text": {json.dumps(result.get("text", ""), ensure_ascii=False)}, '
+                          f'"language": {json.dumps(result.get("language"))}}}\n')
+        super().finish(result)
+
+class WordsJsonWriter(SegmentWriter):
+    """Tableau JSON des mots horodatés [{"word", "start", "end", "probability", "segment"}]"""
+    extension = "words.json"
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.words = 0
+        stream.write("[")
+
+    def _write(self, segment):
+        for word in segment.get("words") or []:
+            record = {"word": word["word"], "start": word["start"], "end": word["end"],
+                      "probability": word.get("probability"), "segment": segment.get("id")}
+            self.stream.write(("" if self.words == 0 else ",\n") + json.dumps(record, ensure_ascii=False,
+                                                                              default=_json_default))
+            self.words += 1
+
+    def finish(self, result):
+        self.stream.write("]\n")
+        super().finish(result)
+
+# Formats de sortie de --output-format
+OUTPUT_WRITERS = {"srt": SrtWriter, "vtt": VttWriter, "json": JsonWriter, "tsv": TsvWriter,
+                  "words": WordsJsonWriter}
+
+class OutputFiles:
+    """Fichiers de sortie d'un job, un par format, remplis pendant le décodage.
+
+    Chaque fichier est écrit sous un nom temporaire `.part` puis renommé par
+    `finish`; `close` supprime ceux d'un job qui n'a pas abouti. Avec
+    output_dir="-", l'unique format demandé est écrit sur stdout.
+    """
+    def __init__(self, formats, output_dir, stem):
+        unknown = [name for name in formats if name not in OUTPUT_WRITERS]
+        if unknown:
+            raise TranscriptionError(f"Format de sortie inconnu: {', '.join(unknown)}")
+        if output_dir == "-" and len(formats) > 1:
+            raise TranscriptionError("Un seul format de sortie peut être écrit sur stdout")
+        self.writers, self.paths, self._files = [], [], []
+        try:
+            for name in dict.fromkeys(formats):
+                writer_class = OUTPUT_WRITERS[name]
+                if output_dir == "-":
+                    self.writers.append(writer_class(sys.stdout))
+                    continue
+                os.makedirs(output_dir, exist_ok=True)
+                path = os.path.join(output_dir, f"{stem}.{writer_class.extension}")
+                stream = open(path + ".part", "w", encoding="utf-8")
+                self._files.append((stream, path))
+                self.writers.append(writer_class(stream))
+        except OSError as e:
+            self.close()
+            raise TranscriptionError(f"Impossible de créer les fichiers de sortie: {e}")
+
+    def finish(self, result):
+        for writer in self.writers:
+            writer.finish(result)
+        for stream, path in self._files:
+            stream.close()
+            os.replace(path + ".part", path)
+            self.paths.append(path)
+            log_message(f"Fichier de sortie écrit: {path}")
+        self._files = []
+
+    def close(self):
+        for stream, path in self._files:
+            stream.close()
+            try:
+                os.remove(path + ".part")
+            except FileNotFoundError:
+                pass
+        self._files = []
 
 def generate_srt(segments):
     """Génère un fichier sous-titres SRT à partir des segments de transcription"""
-    srt_content = ""
-    for i, segment in enumerate(segments):
-        srt_content += f"{i+1}\n"
-        srt_content += f"{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n"
-        srt_content += f"{segment['text'].strip()}\n\n"
-    return srt_content
+    buffer = io.StringIO()
+    writer = SrtWriter(buffer)
+    for segment in segments:
+        writer.write_segment(segment)
+    return buffer.getvalue()
+
+class PolyphaseResampler:
+    """Rééchantillonneur polyphase (filtre FIR sinc fenêtré Kaiser) traitant le signal par blocs.
+
+    Équivalent à scipy.signal.resample_poly, mais utilisable en flux: seuls les
+    échantillons encore nécessaires au filtre sont gardés en mémoire.
+    """
+    def __init__(self, orig_sr, target_sr=SAMPLE_RATE, half_width=10, beta=5.0):
+        g = math.gcd(int(orig_sr), int(target_sr))
+        self.up = int(target_sr) // g
+        self.down = int(orig_sr) // g
+        max_rate = max(self.up, self.down)
+        self.half_len = half_width * max_rate
+
+        # Filtre passe-bas anti-repliement, coupure à la plus basse des deux fréquences de Nyquist
+        n = np.arange(-self.half_len, self.half_len + 1)
+        cutoff = 1.0 / max_rate
+        h = np.sinc(cutoff * n) * np.kaiser(len(n), beta)
+        h = h / h.sum() * self.up
+
+        # Découpage en phases: filters[p, j] = h[p + j * up]
+        self.taps = -(-len(h) // self.up)
+        h = np.concatenate([h, np.zeros(self.taps * self.up - len(h))])
+        self.filters = np.ascontiguousarray(h.reshape(self.taps, self.up).T, dtype=np.float32)
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0  # indice absolu du premier échantillon du buffer
+        self.n_in = 0
+        self.next_out = 0
+
+    def _compute(self, end, chunk=16384):
+        outputs = []
+        offsets = np.arange(self.taps)
+        for start in range(self.next_out, end, chunk):
+            m = np.arange(start, min(start + chunk, end))
+            t = m * self.down + self.half_len
+            idx = (t // self.up)[:, None] - offsets[None, :] - self.buffer_start
+            valid = (idx >= 0) & (idx < len(self.buffer))
+            x = np.where(valid, self.buffer[np.clip(idx, 0, max(len(self.buffer) - 1, 0))], 0.0)
+            outputs.append(np.einsum('ij,ij->i', x, self.filters[t % self.up]).astype(np.float32))
+        self.next_out = max(self.next_out, end)
+
+        # Oublier les échantillons qui ne servent plus au filtre
+        keep_from = (self.next_out * self.down + self.half_len) // self.up - (self.taps - 1)
+        drop = min(max(keep_from - self.buffer_start, 0), len(self.buffer))
+        if drop:
+            self.buffer = self.buffer[drop:]
+            self.buffer_start += drop
+        return np.concatenate(outputs) if outputs else np.zeros(0, dtype=np.float32)
+
+    def process(self, block):
+        """Ajoute un bloc d'échantillons mono et retourne les sorties déjà calculables"""
+        block = np.asarray(block, dtype=np.float32)
+        self.buffer = np.concatenate([self.buffer, block])
+        self.n_in += len(block)
+        end = (self.n_in * self.up - 1 - self.half_len) // self.down + 1
+        return self._compute(max(end, self.next_out))
+
+    def flush(self):
+        """Termine le flux et retourne les derniers échantillons"""
+        return self._compute(-(-self.n_in * self.up // self.down))
+
+def resample_audio(data, orig_sr, target_sr=SAMPLE_RATE):
+    """Rééchantillonne un signal mono en mémoire (scipy si disponible, sinon NumPy)"""
+    if orig_sr == target_sr:
+        return np.asarray(data, dtype=np.float32)
+    try:
+        from scipy.signal import resample_poly
+        g = math.gcd(int(orig_sr), int(target_sr))
+        return resample_poly(data, int(target_sr) // g, int(orig_sr) // g).astype(np.float32)
+    except ImportError:
+        resampler = PolyphaseResampler(orig_sr, target_sr)
+        return np.concatenate([resampler.process(data), resampler.flush()])
+
+def convert_with_soundfile(input_path, output_path, blocksize=65536):
+    """Convertit un fichier en WAV 16 kHz mono avec soundfile, par blocs"""
+    log_message(f"Lecture du fichier avec soundfile...")
+    info = sf.info(input_path)
+    log_message(f"Fichier lu avec succès. Canaux: {info.channels}, Sample rate: {info.samplerate}")
+
+    resampler = None
+    if info.samplerate != SAMPLE_RATE:
+        log_message(f"Rééchantillonnage de {info.samplerate}Hz à {SAMPLE_RATE}Hz")
+        resampler = PolyphaseResampler(info.samplerate)
+
+    log_message(f"Écriture du fichier WAV avec soundfile...")
+    with sf.SoundFile(output_path, 'w', samplerate=SAMPLE_RATE, channels=1, subtype='PCM_16') as out:
+        for block in sf.blocks(input_path, blocksize=blocksize, dtype='float32', always_2d=True):
+            # Convertir en mono si stéréo
+            mono = block.mean(axis=1)
+            out.write(resampler.process(mono) if resampler else mono)
+        if resampler:
+            out.write(resampler.flush())
+    log_message(f"Fichier WAV écrit avec succès")
+
+    # Vérifier que le fichier WAV existe et n'est pas vide
+    wav_size = os.path.getsize(output_path)
+    log_message(f"Taille du fichier WAV généré: {wav_size} octets")
+    if wav_size <= 44:
+        log_message(f"ERREUR: Le fichier WAV généré est vide!")
+        raise ValueError("Le fichier WAV généré est vide")
+    return output_path
 
 def convert_mp3_to_wav(mp3_path):
     """Convertit un fichier MP3 en WAV pour traitement"""
@@ -165,32 +763,7 @@ def convert_mp3_to_wav(mp3_path):
                 # Méthode 3: Fallback sur soundfile
                 log_message(f"Tentative de conversion avec soundfile...")
                 try:
-                    data, samplerate = sf.read(mp3_path)
-                    log_message(f"Fichier MP3 lu avec succès. Forme: {data.shape}, Sample rate: {samplerate}")
-                    
-                    # Convertir en mono si stéréo
-                    if len(data.shape) > 1:
-                        log_message(f"Conversion stéréo vers mono...")
-                        data = data.mean(axis=1)
-                    
-                    # Rééchantillonner à 16kHz si nécessaire
-                    if samplerate != 16000:
-                        log_message(f"Rééchantillonnage de {samplerate}Hz à 16000Hz")
-                        # Solution simple de rééchantillonnage
-                        data = data[::int(samplerate/16000)]
-                    
-                    log_message(f"Écriture du fichier WAV avec soundfile...")
-                    sf.write(temp_wav_path, data, 16000)
-                    log_message(f"Fichier WAV écrit avec succès")
-                    
-                    # Vérifier que le fichier WAV existe et n'est pas vide
-                    wav_size = os.path.getsize(temp_wav_path)
-                    log_message(f"Taille du fichier WAV généré: {wav_size} octets")
-                    if wav_size == 0:
-                        log_message(f"ERREUR: Le fichier WAV généré est vide!")
-                        raise ValueError("Le fichier WAV généré est vide")
-                    
-                    return temp_wav_path
+                    return convert_with_soundfile(mp3_path, temp_wav_path)
                 
                 except Exception as sf_error:
                     log_message(f"Échec de toutes les méthodes de conversion.")
@@ -200,105 +773,181 @@ def convert_mp3_to_wav(mp3_path):
             log_message(f"Erreur avec FFmpeg: {e}. Tentative avec soundfile...")
             
             # Alternative avec soundfile
-            log_message(f"Lecture du fichier MP3 avec soundfile...")
-            data, samplerate = sf.read(mp3_path)
-            log_message(f"Fichier MP3 lu avec succès. Forme: {data.shape}, Sample rate: {samplerate}")
-            
-            # Convertir en mono si stéréo
-            if len(data.shape) > 1:
-                log_message(f"Conversion stéréo vers mono...")
-                data = data.mean(axis=1)
-            
-            # Rééchantillonner à 16kHz si nécessaire
-            if samplerate != 16000:
-                log_message(f"Rééchantillonnage de {samplerate}Hz à 16000Hz")
-                # Solution simple de rééchantillonnage
-                data = data[::int(samplerate/16000)]
-            
-            log_message(f"Écriture du fichier WAV avec soundfile...")
-            sf.write(temp_wav_path, data, 16000)
-            log_message(f"Fichier WAV écrit avec succès")
-            
-            # Vérifier que le fichier WAV existe et n'est pas vide
-            wav_size = os.path.getsize(temp_wav_path)
-            log_message(f"Taille du fichier WAV généré: {wav_size} octets")
-            if wav_size == 0:
-                log_message(f"ERREUR: Le fichier WAV généré est vide!")
-                raise ValueError("Le fichier WAV généré est vide")
-                
-            return temp_wav_path
+            return convert_with_soundfile(mp3_path, temp_wav_path)
             
     except Exception as e:
         log_message(f"Erreur lors de la conversion MP3 vers WAV: {e}")
         traceback.print_exc(file=sys.stderr)
         raise
 
-def check_audio_file(file_path: str) -> bool:
+def convert_with_pydub(file_path):
+    """Convertit un fichier audio en WAV 16 kHz mono avec pydub (solution de secours)"""
+    temp_wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    temp_wav_path = temp_wav.name
+    temp_wav.close()
+    log_message(f"Fichier temporaire WAV créé: {temp_wav_path}")
+    try:
+        from pydub import AudioSegment
+        log_message(f"Tentative de conversion avec pydub...")
+        audio = AudioSegment.from_file(file_path)
+        audio = audio.set_frame_rate(16000).set_channels(1)
+        audio.export(temp_wav_path, format="wav")
+        log_message(f"Conversion avec pydub réussie: {temp_wav_path}")
+        return temp_wav_path
+    except Exception:
+        os.remove(temp_wav_path)
+        raise
+
+def decode_audio(file_path, timeout=FFMPEG_TIMEOUT):
+    """Décode un fichier audio en mémoire via un pipe FFmpeg.
+
+    Retourne un tableau NumPy float32 mono à 16 kHz, directement utilisable par
+    model.transcribe (aucun fichier temporaire n'est écrit).
+    """
+    ffmpeg_cmd = [
+        'ffmpeg', '-nostdin', '-threads', '0', '-i', file_path,
+        '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-acodec', 'pcm_s16le', '-'
+    ]
+    log_message(f"Commande FFmpeg: {' '.join(ffmpeg_cmd)}")
+    result = subprocess.run(
+        ffmpeg_cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout
+    )
+    if result.returncode != 0:
+        log_message(f"Erreur FFmpeg: {result.stderr.decode('utf-8', errors='replace')}")
+        raise subprocess.SubprocessError(f"FFmpeg a échoué avec le code {result.returncode}")
+
+    audio = np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+    if audio.size == 0:
+        raise ValueError("FFmpeg n'a produit aucun échantillon audio")
+    log_message(f"Décodage FFmpeg réussi: {audio.size} échantillons ({audio.size / SAMPLE_RATE:.1f} s)")
+    return audio
+
+def probe_audio(file_path: str):
+    """Lit les métadonnées audio (taux, canaux, frames, durée) sans décoder le signal.
+
+    Essaie successivement soundfile, wave puis ffprobe. Retourne None si aucune
+    méthode ne reconnaît le fichier.
+    """
+    try:
+        info = sf.info(file_path)
+        return {
+            "samplerate": info.samplerate,
+            "channels": info.channels,
+            "frames": info.frames,
+            "duration": info.frames / info.samplerate if info.samplerate else 0.0,
+        }
+    except Exception as sf_error:
+        log_message(f"Erreur lors de la lecture avec soundfile: {sf_error}")
+
+    try:
+        # Fallback sur wave pour les fichiers WAV
+        with wave.open(file_path, 'rb') as wav_file:
+            params = wav_file.getparams()
+            return {
+                "samplerate": params.framerate,
+                "channels": params.nchannels,
+                "frames": params.nframes,
+                "duration": params.nframes / params.framerate if params.framerate else 0.0,
+            }
+    except Exception as wave_error:
+        log_message(f"Erreur lors de la lecture avec wave: {wave_error}")
+
+    try:
+        # Dernier recours: ffprobe, qui ne lit que l'en-tête du conteneur
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'stream=sample_rate,channels,duration', '-of', 'json', file_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=30,
+            text=True
+        )
+        if result.returncode != 0:
+            raise subprocess.SubprocessError(result.stderr.strip())
+        streams = json.loads(result.stdout).get("streams", [])
+        if not streams:
+            raise ValueError("aucun flux audio")
+        stream = streams[0]
+        samplerate = int(stream.get("sample_rate", 0))
+        duration = float(stream.get("duration", 0.0))
+        return {
+            "samplerate": samplerate,
+            "channels": int(stream.get("channels", 0)),
+            "frames": int(round(duration * samplerate)),
+            "duration": duration,
+        }
+    except Exception as ffprobe_error:
+        log_message(f"Erreur lors de la lecture avec ffprobe: {ffprobe_error}")
+    return None
+
+def scan_max_amplitude(file_path: str, threshold=SILENCE_THRESHOLD, blocksize=65536):
+    """Parcourt le signal par blocs et retourne l'amplitude maximale rencontrée.
+
+    S'arrête dès qu'un bloc dépasse le seuil de silence: la mémoire utilisée est
+    bornée par la taille d'un bloc. Retourne None si le fichier n'est pas lisible.
+    """
+    max_amplitude = 0.0
+    try:
+        for block in sf.blocks(file_path, blocksize=blocksize, dtype='float32'):
+            if block.size:
+                max_amplitude = max(max_amplitude, float(np.max(np.abs(block))))
+            if max_amplitude >= threshold:
+                break
+    except Exception as sf_error:
+        log_message(f"Impossible d'analyser le silence avec soundfile: {sf_error}")
+        return None
+    return max_amplitude
+
+def build_wav_header(data_size, sample_rate=SAMPLE_RATE, channels=1, bits_per_sample=16) -> bytes:
+    """Construit un en-tête WAV PCM standard de 44 octets"""
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    return (
+        b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b'data' + struct.pack('<I', data_size)
+    )
+
+def load_raw_pcm(file_path):
+    """Lit un fichier PCM s16le 16 kHz mono sans en-tête via un memmap.
+
+    Le fichier n'est ni copié ni chargé d'un bloc: seule la conversion en
+    float32 attendue par Whisper alloue de la mémoire. Un éventuel octet
+    final impair est ignoré, comme le ferait FFmpeg.
+    """
+    n_samples = os.path.getsize(file_path) // 2
+    if n_samples == 0:
+        raise ValueError("Le fichier ne contient aucun échantillon PCM")
+    pcm = np.memmap(file_path, dtype='<i2', mode='r', shape=(n_samples,))
+    try:
+        return pcm.astype(np.float32) / 32768.0
+    finally:
+        del pcm
+
+def repair_wav_file(file_path):
+    """Écrit une copie WAV du fichier brut: en-tête de 44 octets puis copie en flux"""
+    repaired_path = file_path + '.repaired.wav'
+    data_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as src, open(repaired_path, 'wb') as dst:
+        dst.write(build_wav_header(data_size))
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    log_message(f"Fichier réparé créé: {repaired_path}")
+    return repaired_path
+
+def check_audio_file(file_path: str, check_silence=False) -> bool:
     """Vérifie si le fichier audio est valide et contient des données"""
     try:
-        global temp_wav_to_use  # Déplacer la déclaration global en haut de la fonction
+        global raw_pcm_to_use  # Déplacer la déclaration global en haut de la fonction
         log_message(f"Vérification du fichier audio: {file_path}")
         
-        # Vérifier si le fichier est au format MP3 ou WEBM
-        if file_path.lower().endswith('.mp3'):
-            log_message(f"Fichier MP3 détecté, conversion requise")
-            return True  # Nous le convertirons plus tard
-        elif file_path.lower().endswith('.webm'):
-            log_message(f"Fichier WEBM détecté, conversion directe avec FFmpeg")
-            
-            # Pour les fichiers WEBM, nous utiliserons directement FFmpeg pour la conversion
-            # sans essayer de réparer l'en-tête RIFF
-            try:
-                temp_wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                temp_wav_path = temp_wav.name
-                temp_wav.close()
-                
-                log_message(f"Fichier temporaire WAV créé pour la conversion WEBM: {temp_wav_path}")
-                
-                # Utiliser FFmpeg pour convertir directement le WEBM en WAV
-                try:
-                    ffmpeg_cmd = ['ffmpeg', '-i', file_path, '-ar', '16000', '-ac', '1', '-c:a', 'pcm_s16le', '-y', temp_wav_path]
-                    log_message(f"Commande FFmpeg pour conversion WEBM: {' '.join(ffmpeg_cmd)}")
-                    
-                    result = subprocess.run(
-                        ffmpeg_cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        timeout=30,
-                        text=True
-                    )
-                    
-                    if result.returncode != 0:
-                        log_message(f"Erreur FFmpeg: {result.stderr}")
-                        # Si FFmpeg échoue, nous essayons avec pydub
-                        raise subprocess.SubprocessError(f"FFmpeg a échoué avec le code {result.returncode}")
-                    
-                    log_message(f"Conversion WEBM vers WAV réussie: {temp_wav_path}")
-                    
-                    # Mettre à jour le chemin du fichier à utiliser
-                    temp_wav_to_use = temp_wav_path
-                    return True
-                    
-                except (subprocess.SubprocessError, subprocess.TimeoutExpired) as e:
-                    log_message(f"Erreur lors de la conversion WEBM vers WAV: {e}")
-                    try:
-                        # Essayer avec pydub si disponible
-                        from pydub import AudioSegment
-                        log_message(f"Tentative de conversion avec pydub...")
-                        audio = AudioSegment.from_file(file_path)
-                        audio = audio.set_frame_rate(16000).set_channels(1)
-                        audio.export(temp_wav_path, format="wav")
-                        log_message(f"Conversion avec pydub réussie: {temp_wav_path}")
-                        
-                        # Mettre à jour le chemin du fichier à utiliser
-                        temp_wav_to_use = temp_wav_path
-                        return True
-                    except Exception as pydub_error:
-                        log_message(f"Échec de la conversion avec pydub: {pydub_error}")
-                        return False
-            except Exception as e:
-                log_message(f"Erreur lors de la conversion WEBM: {e}")
-                return False
+        # Les formats compressés (MP3, WEBM, OGG, M4A...) sont décodés directement
+        # par FFmpeg dans decode_audio, sans essayer de réparer l'en-tête RIFF
+        if file_path.lower().endswith(COMPRESSED_EXTENSIONS):
+            log_message(f"Fichier compressé détecté ({os.path.splitext(file_path)[1]}), décodage avec FFmpeg")
+            return True
         
         # Vérifier l'en-tête RIFF pour les fichiers WAV
         try:
@@ -316,81 +965,11 @@ def check_audio_file(file_path: str) -> bool:
                     # Si c'est un fichier de taille raisonnable, on peut essayer de le réparer
                     file_size = os.path.getsize(file_path)
                     if file_size > 1000:  # Si le fichier a une taille raisonnable
-                        log_message(f"Tentative de réparation du fichier audio...")
-                        
-                        # Créer un nouveau fichier WAV avec un en-tête correct
-                        # Faire une copie du fichier original pour éviter les conflits d'accès
-                        file_copy_path = file_path + '.copy'
-                        repaired_path = file_path + '.repaired.wav'
-                        
-                        try:
-                            # Créer une copie du fichier pour éviter les problèmes d'accès
-                            with open(file_path, 'rb') as src:
-                                file_data = src.read()  # Lire tout le fichier
-                            
-                            # Écrire les données dans le fichier de copie
-                            with open(file_copy_path, 'wb') as dst:
-                                dst.write(file_data)
-                            
-                            log_message(f"Copie du fichier créée: {file_copy_path}")
-                            
-                            # Maintenant, réparer le fichier à partir de la copie
-                            with open(file_copy_path, 'rb') as src, open(repaired_path, 'wb') as dst:
-                                # Lire toutes les données audio brutes
-                                data = src.read()
-                                
-                                # Écrire un en-tête WAV valide
-                                # Format: PCM 16 bits, mono, 16000 Hz
-                                sample_rate = 16000
-                                channels = 1
-                                bits_per_sample = 16
-                                
-                                # Calculer les valeurs pour l'en-tête
-                                data_size = len(data)
-                                header_size = 36 + 8  # Taille standard + sous-bloc data
-                                file_size = header_size + data_size
-                                byte_rate = sample_rate * channels * bits_per_sample // 8
-                                block_align = channels * bits_per_sample // 8
-                                
-                                # Écrire l'en-tête RIFF
-                                dst.write(b'RIFF')
-                                dst.write((file_size - 8).to_bytes(4, byteorder='little'))
-                                dst.write(b'WAVE')
-                                
-                                # Écrire le sous-bloc fmt
-                                dst.write(b'fmt ')
-                                dst.write((16).to_bytes(4, byteorder='little'))  # Taille du sous-bloc fmt
-                                dst.write((1).to_bytes(2, byteorder='little'))  # Format PCM = 1
-                                dst.write((channels).to_bytes(2, byteorder='little'))
-                                dst.write((sample_rate).to_bytes(4, byteorder='little'))
-                                dst.write((byte_rate).to_bytes(4, byteorder='little'))
-                                dst.write((block_align).to_bytes(2, byteorder='little'))
-                                dst.write((bits_per_sample).to_bytes(2, byteorder='little'))
-                                
-                                # Écrire le sous-bloc data
-                                dst.write(b'data')
-                                dst.write((data_size).to_bytes(4, byteorder='little'))
-                                
-                                # Écrire les données audio
-                                dst.write(data)
-                            
-                            log_message(f"Fichier réparé créé: {repaired_path}")
-                            log_message(f"Utilisation du fichier réparé pour la transcription")
-                            
-                            # Utiliser le fichier réparé pour la transcription
-                            temp_wav_to_use = repaired_path
-                            
-                            # Nettoyer le fichier de copie
-                            try:
-                                os.remove(file_copy_path)
-                                log_message(f"Fichier de copie supprimé: {file_copy_path}")
-                            except Exception as cleanup_error:
-                                log_message(f"Erreur lors de la suppression du fichier de copie: {cleanup_error}")
-                            
-                            return True
-                        except Exception as repair_error:
-                            log_message(f"Échec de la réparation du fichier: {repair_error}")
-                            return False
+                        # Les données brutes sont interprétées comme du PCM 16 bits mono
+                        # 16 kHz, lues plus tard via un memmap (aucune copie sur disque)
+                        log_message(f"Fichier traité comme du PCM brut s16le 16 kHz mono")
+                        raw_pcm_to_use = file_path
+                        return True
                     else:
                         log_message(f"Fichier trop petit pour être réparé")
                         return False
@@ -398,202 +977,2956 @@ def check_audio_file(file_path: str) -> bool:
             log_message(f"Erreur lors de la vérification de l'en-tête: {header_error}")
             # Continuer avec les autres méthodes de vérification
         
-        # Pour les fichiers WAV
-        try:
-            # Tenter d'utiliser soundfile qui prend en charge plusieurs formats
-            log_message(f"Tentative de lecture du fichier avec soundfile...")
-            data, samplerate = sf.read(file_path)
-            log_message(f"Lecture réussie! Paramètres du fichier audio:")
-            log_message(f"- Taux d'échantillonnage: {samplerate} Hz")
-            log_message(f"- Forme du signal: {data.shape}")
-            
-            # Vérifier si le signal contient du son (non silencieux)
-            if len(data) > 0:
-                max_amplitude = np.max(np.abs(data))
+        # Pour les fichiers WAV: lecture des seules métadonnées du conteneur
+        info = probe_audio(file_path)
+        if info is None:
+            log_message(f"ERREUR: Impossible de lire les paramètres du fichier audio")
+            return False
+
+        log_message(f"Paramètres du fichier audio:")
+        log_message(f"- Taux d'échantillonnage: {info['samplerate']} Hz")
+        log_message(f"- Canaux: {info['channels']}")
+        log_message(f"- Nombre de frames: {info['frames']}")
+        log_message(f"- Durée: {info['duration']:.2f} s")
+
+        if info['frames'] <= 0:
+            log_message(f"ERREUR: Le fichier audio ne contient pas de données")
+            return False
+
+        # Vérifier si le signal contient du son (non silencieux)
+        if check_silence:
+            max_amplitude = scan_max_amplitude(file_path)
+            if max_amplitude is not None:
                 log_message(f"Signal audio valide - Amplitude max: {max_amplitude}")
-                if max_amplitude < 0.01:
+                if max_amplitude < SILENCE_THRESHOLD:
                     log_message(f"ATTENTION: Signal très faible, possible silence")
-                return True
-            else:
-                log_message(f"ERREUR: Le fichier audio ne contient pas de données")
-                return False
-                
-        except Exception as sf_error:
-            log_message(f"Erreur lors de la lecture avec soundfile: {sf_error}")
-            try:
-                # Fallback sur wave pour les fichiers WAV
-                log_message(f"Tentative de lecture avec le module wave...")
-                with wave.open(file_path, 'rb') as wav_file:
-                    params = wav_file.getparams()
-                    log_message(f"Paramètres du fichier WAV:")
-                    log_message(f"- Canaux: {params.nchannels}")
-                    log_message(f"- Largeur d'échantillon: {params.sampwidth}")
-                    log_message(f"- Taux d'échantillonnage: {params.framerate}")
-                    log_message(f"- Nombre de frames: {params.nframes}")
-                    
-                    # Vérifier si le fichier contient des données
-                    if params.nframes > 0:
-                        log_message(f"Fichier WAV valide - {params.nframes} frames")
-                        return True
-                    else:
-                        log_message(f"ERREUR: Le fichier WAV ne contient pas de frames")
-                        return False
-            except Exception as wave_error:
-                log_message(f"Erreur lors de la lecture avec wave: {wave_error}")
-                return False
+        return True
     except Exception as e:
         log_message(f"Erreur générale lors de la vérification du fichier audio: {e}")
         traceback.print_exc(file=sys.stderr)
         return False
 
-def main():
+def energy_vad(audio, frame_ms=30, min_speech_ms=250, min_silence_ms=300):
+    """Détection de parole par énergie et taux de passage par zéro, vectorisée.
+
+    Retourne une liste de (début, fin) en trames de `frame_ms` millisecondes.
+    """
+    frame = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames.astype(np.float32) ** 2, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+    # Seuil adaptatif: au-dessus du bruit de fond, mais sous le niveau des passages
+    # forts pour ne pas tout rejeter sur une parole continue
+    noise_floor = np.percentile(energy_db, 10)
+    loud_level = np.percentile(energy_db, 90)
+    threshold = max(min(noise_floor + 12.0, loud_level - 10.0), -60.0)
+    speech = energy_db > threshold
+    # Consonnes fricatives: énergie plus faible mais passages par zéro fréquents
+    speech |= (energy_db > max(noise_floor + 6.0, -60.0)) & (zcr > 0.3)
+
+    edges = np.diff(np.concatenate([[0], speech.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    # Fusionner les zones séparées par un silence trop court, puis écarter les zones trop brèves
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and (start - regions[-1][1]) * frame_ms < min_silence_ms:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    return [(start, end) for start, end in regions if (end - start) * frame_ms >= min_speech_ms]
+
+def silero_vad_regions(audio):
+    """Zones de parole (en échantillons) avec Silero VAD si le paquet est installé, sinon None"""
     try:
-        log_message("==== Démarrage du script de transcription Whisper ====")
-        log_message(f"Version Python: {sys.version}")
-        log_message(f"Arguments sys.argv: {sys.argv}")
-        
-    parser = argparse.ArgumentParser(description="Transcription audio avec Whisper")
-    parser.add_argument("audio_file", help="Chemin vers le fichier audio à transcrire")
-    parser.add_argument("--generate-srt", action="store_true", help="Générer des sous-titres SRT")
-        parser.add_argument("--model", choices=["tiny", "base", "small", "medium", "large"], default="medium", 
-                          help="Modèle Whisper à utiliser (défaut: medium)")
-    args = parser.parse_args()
+        import torch
+        from silero_vad import load_silero_vad, get_speech_timestamps
+    except ImportError:
+        return None
+    global _silero_model
+    # Modèle chargé une fois par processus, comme les modèles Whisper de ModelCache; ses
+    # états internes sont réinitialisés à chaque appel: un seul appel à la fois
+    with _silero_lock:
+        if _silero_model is None:
+            log_message("Chargement du modèle Silero VAD")
+            _silero_model = load_silero_vad()
+        timestamps = get_speech_timestamps(torch.from_numpy(np.ascontiguousarray(audio)), _silero_model,
+                                           sampling_rate=SAMPLE_RATE)
+    return [(ts["start"], ts["end"]) for ts in timestamps]
 
-        log_message(f"Arguments reçus: {args}")
-        
-        # Normaliser le chemin du fichier
-        audio_path = os.path.abspath(os.path.normpath(args.audio_file))
-        log_message(f"Chemin absolu normalisé reçu: {audio_path}")
-        
-        # Vérifier si le fichier existe
-        if not os.path.isfile(audio_path):
-            log_message(f"ERREUR: Fichier non trouvé: {audio_path}")
-            sys.exit(1)
+def detect_speech_regions(audio, pad_ms=200, frame_ms=30):
+    """Retourne les zones de parole (début, fin) en échantillons, élargies de `pad_ms`"""
+    regions = silero_vad_regions(audio)
+    if regions is None:
+        frame = SAMPLE_RATE * frame_ms // 1000
+        regions = [(int(start) * frame, int(end) * frame) for start, end in energy_vad(audio, frame_ms=frame_ms)]
+    else:
+        log_message("VAD: utilisation de Silero")
+
+    pad = SAMPLE_RATE * pad_ms // 1000
+    padded = []
+    for start, end in regions:
+        start, end = max(0, start - pad), min(len(audio), end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], max(end, padded[-1][1]))
         else:
-            log_message(f"SUCCES: Fichier trouvé à l'emplacement: {audio_path}")
-            log_message(f"Taille du fichier: {os.path.getsize(audio_path)} octets")
-        
-        # Réinitialiser la variable globale
-        global temp_wav_to_use
-        temp_wav_to_use = None
-        
-        # Vérifier le fichier audio
-        if not check_audio_file(audio_path):
-            log_message(f"ERREUR: Le fichier audio n'est pas valide ou ne contient pas de données")
-            sys.exit(1)
-        
-        # Utiliser le fichier converti si disponible
-        file_to_transcribe = audio_path
-        if temp_wav_to_use is not None:
-            log_message(f"Utilisation du fichier audio converti/réparé: {temp_wav_to_use}")
-            file_to_transcribe = temp_wav_to_use
-        # Sinon, convertir le fichier MP3 en WAV si nécessaire
-        elif audio_path.lower().endswith('.mp3'):
-            log_message(f"Conversion du fichier MP3 en WAV...")
-            file_to_transcribe = convert_mp3_to_wav(audio_path)
-            log_message(f"Conversion terminée. Fichier WAV: {file_to_transcribe}")
-            log_message(f"Taille du fichier WAV: {os.path.getsize(file_to_transcribe)} octets")
-        
-        log_message(f"Fichier à transcrire : {file_to_transcribe}")
-        
-        # Charger le modèle Whisper avec un observateur de progression
-        model_name = args.model
-        log_message(f"Chargement du modèle Whisper '{model_name}'...")
-        observer = ModelLoadingObserver(estimated_load_time=20)  # 20 secondes estimées pour le chargement
-        observer.start()
-        
-        # S'assurer que le chargement du modèle commence réellement
+            padded.append((start, end))
+    return padded
+
+def timeline_mapper(regions):
+    """Retourne une fonction convertissant un instant (s) du signal des zones concaténées
+    en instant du signal d'origine"""
+    lengths = np.array([end - start for start, end in regions])
+    compact_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    orig_starts = np.array([start for start, _ in regions])
+
+    def to_original(seconds):
+        position = seconds * SAMPLE_RATE
+        index = max(np.searchsorted(compact_starts, position, side='right') - 1, 0)
+        offset = min(position - compact_starts[index], lengths[index])
+        return float((orig_starts[index] + offset) / SAMPLE_RATE)
+    return to_original
+
+def remap_segment(segment, to_original):
+    """Applique `to_original` aux horodatages d'un segment et de ses mots (en place)"""
+    segment["start"] = to_original(segment["start"])
+    segment["end"] = max(to_original(segment["end"]), segment["start"])
+    for word in segment.get("words", []) or []:
+        word["start"] = to_original(word["start"])
+        word["end"] = max(to_original(word["end"]), word["start"])
+    return segment
+
+def remap_timestamps(result, regions):
+    """Replace les horodatages d'une transcription des zones concaténées sur la chronologie d'origine"""
+    to_original = timeline_mapper(regions)
+    for segment in result.get("segments", []):
+        remap_segment(segment, to_original)
+    return result
+
+class TranscriptionError(Exception):
+    """Erreur d'un job de transcription (fichier invalide, modèle introuvable, ...)"""
+
+class JobCancelled(Exception):
+    """Arrêt coopératif d'un job (annulation ou échéance dépassée), avec les segments déjà décodés"""
+    def __init__(self, reason, segments=None):
+        super().__init__(f"Job interrompu ({reason})")
+        self.reason = reason
+        self.segments = segments or []
+
+class CancelToken:
+    """Demande d'arrêt d'un job, vérifiée entre deux fenêtres de décodage.
+
+    `deadline` est la durée maximale du job en secondes (None: pas d'échéance).
+    `shared` (multiprocessing.Value, index dans SHARED_REASONS) porte les demandes
+    d'arrêt du planificateur vers un processus d'exécution du mode --serve.
+    """
+    SHARED_REASONS = (None, "cancelled", "terminated")
+
+    def __init__(self, deadline=None, shared=None):
+        self.reason = None
+        self.deadline = time.time() + deadline if deadline else None
+        self.shared = shared
+
+    def cancel(self, reason="cancelled"):
+        if self.reason is None:
+            self.reason = reason
+
+    def stop_reason(self):
+        if self.reason is None and self.shared is not None and self.shared.value:
+            self.reason = self.SHARED_REASONS[self.shared.value]
+        if self.reason is None and self.deadline is not None and time.time() >= self.deadline:
+            self.reason = "deadline"
+        return self.reason
+
+def check_cancelled(segments=None):
+    """Lève JobCancelled, avec une copie de `segments`, si le job en cours doit s'arrêter"""
+    token = current_cancel
+    if token is not None and token.stop_reason():
+        raise JobCancelled(token.reason, list(segments or []))
+
+# Paramètres de décodage par défaut passés à model.transcribe
+DEFAULT_TRANSCRIBE_OPTIONS = {
+    "language": "fr",
+    "task": "transcribe",
+    "no_speech_threshold": 0.6,
+    "logprob_threshold": -1.0,
+    "word_timestamps": False,
+    "initial_prompt": "Ceci est un enregistrement audio à transcrire fidèlement en français.",
+}
+
+# Profils de vitesse de décodage. Les températures suivant la première ne servent
+# qu'en cas d'échec (taux de compression ou log-probabilité hors seuils).
+DECODING_PROFILES = {
+    # Décodage glouton, peu de relances
+    "fast": {
+        "beam_size": None,
+        "best_of": None,
+        "temperature": (0.0, 0.4, 0.8),
+        "compression_ratio_threshold": 2.4,
+    },
+    "balanced": {
+        "beam_size": 2,
+        "best_of": 2,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "compression_ratio_threshold": 2.4,
+    },
+    # Recherche en faisceau large, comme historiquement
+    "accurate": {
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "compression_ratio_threshold": 2.4,
+    },
+}
+
+DEFAULT_DECODING_PROFILE = "accurate"
+
+# Options de décodage qu'une requête JSON (mode --serve) peut surcharger
+ALLOWED_DECODE_OPTIONS = (set(DEFAULT_TRANSCRIBE_OPTIONS) | set(DECODING_PROFILES["accurate"])
+                          | {"condition_on_previous_text"})
+
+MODEL_NAMES = ["tiny", "base", "small", "medium", "large"]
+
+# Dossier des modèles quantifiés int8 convertis une fois puis relus par memory-map
+DEFAULT_QUANTIZED_MODEL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-transcribe", "int8")
+
+def model_variant(model_name, quantize=False) -> str:
+    """Nom d'un modèle tel que chargé, ex. 'base-int8' pour sa version quantifiée"""
+    return f"{model_name}-int8" if quantize else model_name
+
+def _replace_whisper_linears(module):
+    """Remplace les whisper.model.Linear par des torch.nn.Linear partageant les mêmes poids.
+
+    quantize_dynamic ne convertit que les types exacts qu'il connaît; la sous-classe
+    de Whisper ne fait que convertir le dtype des poids, inutile en float32 sur CPU.
+    """
+    import torch
+    from whisper.model import Linear
+    for name, child in module.named_children():
+        if isinstance(child, Linear):
+            plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain.weight = child.weight
+            plain.bias = child.bias
+            setattr(module, name, plain)
+        else:
+            _replace_whisper_linears(child)
+
+def quantize_model(model):
+    """Quantification dynamique int8 des couches Linear (poids int8, activations float32)"""
+    import torch
+    _replace_whisper_linears(model)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def _quantized_linears_from_state(module, state_dict, prefix=""):
+    """Remplace les Linear de `module` par des Linear int8 dynamiques lus dans `state_dict`.
+
+    Chaque couche est chargée dès sa création: aucun poids float32 n'est alloué et la
+    mémoire ne dépasse les poids int8 que d'une couche à la fois. Retourne les clés lues.
+    """
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+    used = set()
+    for name, child in module.named_children():
+        path = f"{prefix}{name}."
+        if isinstance(child, torch.nn.Linear):
+            linear = DynamicLinear(child.in_features, child.out_features, bias_=child.bias is not None,
+                                   dtype=torch.qint8)
+            keys = [key for key in state_dict if key.startswith(path)]
+            linear.load_state_dict({key[len(path):]: state_dict[key] for key in keys})
+            setattr(module, name, linear)
+            used.update(keys)
+        else:
+            used |= _quantized_linears_from_state(child, state_dict, path)
+    return used
+
+def _rebuild_whisper_buffers(model):
+    """Recalcule les buffers non enregistrés dans le state_dict (masque causal, têtes d'alignement)"""
+    import torch
+    dims = model.dims
+    model.decoder.register_buffer(
+        "mask", torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-np.inf).triu_(1), persistent=False)
+    all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    all_heads[dims.n_text_layer // 2:] = True
+    model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+
+def load_quantized_state(dims, state_dict):
+    """Reconstruit un modèle int8 depuis son state_dict sans passer par le float32.
+
+    Le squelette est créé sur le device meta (aucun poids alloué), ses Linear sont
+    remplacés par des Linear int8 chargés couche par couche, puis les autres poids sont
+    repris tels quels du state_dict (assign=True): lus en memory-map, ils ne sont pas copiés.
+    """
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    with torch.device("meta"):
+        model = Whisper(ModelDimensions(**dims))
+    used = _quantized_linears_from_state(model, state_dict)
+    model.load_state_dict({key: value for key, value in state_dict.items() if key not in used},
+                          strict=False, assign=True)
+    _rebuild_whisper_buffers(model)
+    missing = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+               if tensor.is_meta]
+    if missing:
+        raise RuntimeError(f"Poids absents du modèle quantifié: {', '.join(missing[:5])}")
+    return model
+
+def _load_state_file(path):
+    """torch.load en memory-map quand la version de torch le permet (>= 2.1)"""
+    import torch
+    try:
+        return torch.load(path, map_location="cpu", mmap=True, weights_only=False)
+    except TypeError:
+        return torch.load(path, map_location="cpu")
+
+def load_quantized_model(model_name, model_dir=None):
+    """Charge la version int8 d'un modèle, en la convertissant et l'enregistrant au premier appel.
+
+    Le fichier enregistré contient les dimensions du modèle et le state_dict quantifié:
+    les appels suivants ne téléchargent ni ne convertissent plus rien.
+    """
+    import whisper
+    from dataclasses import asdict
+    from whisper.model import ModelDimensions, Whisper
+
+    model_dir = model_dir or DEFAULT_QUANTIZED_MODEL_DIR
+    path = os.path.join(model_dir, f"{model_variant(model_name, True)}.pt")
+    alignment_heads = whisper._ALIGNMENT_HEADS.get(model_name)
+
+    if os.path.exists(path):
+        try:
+            checkpoint = _load_state_file(path)
+            try:
+                model = load_quantized_state(checkpoint["dims"], checkpoint["state_dict"])
+            except (AttributeError, TypeError, NotImplementedError) as e:
+                # torch < 2.1: ni device meta en contexte ni load_state_dict(assign=True)
+                log_message(f"Chargement direct du modèle int8 impossible ({e}), reconstruction complète")
+                model = quantize_model(Whisper(ModelDimensions(**checkpoint["dims"])))
+                model.load_state_dict(checkpoint["state_dict"])
+            if alignment_heads is not None:
+                model.set_alignment_heads(alignment_heads)
+            log_message(f"Modèle quantifié lu depuis {path}")
+            return model.eval()
+        except Exception as e:
+            log_message(f"Modèle quantifié illisible ({e}), nouvelle conversion")
+
+    model = whisper.load_model(model_name, device="cpu")
+    dims = asdict(model.dims)
+    model = quantize_model(model).eval()
+    try:
+        import torch
+        os.makedirs(model_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save({"dims": dims, "state_dict": model.state_dict()}, tmp_path)
+        os.replace(tmp_path, path)
+        log_message(f"Modèle quantifié enregistré dans {path}")
+    except Exception as e:
+        log_message(f"Impossible d'enregistrer le modèle quantifié: {e}")
+    return model
+
+def load_model_weights(model_name, quantize=False, model_dir=None):
+    """Charge un modèle sur CPU, en float32 ou quantifié en int8"""
+    if quantize:
+        return load_quantized_model(model_name, model_dir)
+    import whisper
+    return whisper.load_model(model_name, device="cpu")
+
+def load_whisper_model(model_name, quantize=False, model_dir=None, backend=None, threads=None):
+    """Charge un modèle Whisper sur CPU, avec 'base' comme modèle de secours.
+
+    Retourne un tuple (nom du modèle effectivement chargé, modèle). Le modèle est
+    chargé par `backend` (openai-whisper par défaut), avec `threads` threads de
+    calcul si précisé.
+    """
+    backend = backend or BACKENDS[OpenAIWhisperBackend.name]
+    log_message(f"Chargement du modèle Whisper '{backend.variant(model_name, quantize)}'...")
+    with Stage("model_load", model=model_name, backend=backend.name, quantize=quantize), \
+            ModelLoadingObserver(track_downloads=isinstance(backend, OpenAIWhisperBackend)):
         log_message(f"Tentative de chargement du modèle '{model_name}'...")
         try:
-            model = whisper.load_model(model_name, device="cpu")
+            model = backend.load(model_name, quantize, model_dir, threads=threads)
             log_message("Modèle chargé avec succès")
+            return model_name, model
         except Exception as e:
             log_message(f"Erreur lors du chargement du modèle '{model_name}': {e}")
-            if model_name != "base":
-                # Si le modèle demandé n'est pas 'base', on essaie avec 'base' comme fallback
-                log_message(f"Tentative avec le modèle 'base' comme alternative...")
-                try:
-        model = whisper.load_model("base", device="cpu")
-                    log_message("Modèle 'base' chargé avec succès")
-                except Exception as e2:
-                    log_message(f"Erreur lors du chargement du modèle 'base': {e2}")
-                    traceback.print_exc(file=sys.stderr)
-                    observer.stop()
-                    sys.exit(1)
-            else:
+            if model_name == "base":
                 traceback.print_exc(file=sys.stderr)
-                observer.stop()
-                sys.exit(1)
-            
-        observer.stop()  # Arrêter l'observateur une fois le modèle chargé
-        log_message("Modèle chargé avec succès")
-        
-        # Transcrire l'audio
-        log_message("Début de la transcription...")
+                raise TranscriptionError(f"Impossible de charger le modèle '{model_name}': {e}")
+
+        # Si le modèle demandé n'est pas 'base', on essaie avec 'base' comme fallback
+        log_message(f"Tentative avec le modèle 'base' comme alternative...")
         try:
-            result = model.transcribe(
-                file_to_transcribe,
-                language="fr",
-                task="transcribe",
-                fp16=False,
-                verbose=True,
-                no_speech_threshold=0.6,
-                logprob_threshold=-1.0,
-                compression_ratio_threshold=1.2,
-                temperature=0.0,
-                best_of=5,
-                beam_size=5,
-                word_timestamps=True,
-                initial_prompt="Ceci est un enregistrement audio à transcrire fidèlement en français."
-            )
-            log_message("Transcription terminée avec succès")
-        except Exception as e:
-            log_message(f"Erreur pendant la transcription: {e}")
+            model = backend.load("base", quantize, model_dir, threads=threads)
+            log_message("Modèle 'base' chargé avec succès")
+            return "base", model
+        except Exception as e2:
+            log_message(f"Erreur lors du chargement du modèle 'base': {e2}")
             traceback.print_exc(file=sys.stderr)
-            
-            # Nettoyer les fichiers temporaires avant de quitter
-            if temp_wav_to_use is not None and temp_wav_to_use != audio_path:
+            raise TranscriptionError(f"Impossible de charger le modèle 'base': {e2}")
+
+def estimate_model_size(model) -> int:
+    """Estime l'empreinte mémoire d'un modèle (poids + buffers) en octets.
+
+    Passe par le state_dict: les poids int8 des couches quantifiées n'apparaissent
+    pas dans model.parameters().
+    """
+    size = 0
+    for value in model.state_dict().values():
+        tensors = value if isinstance(value, (tuple, list)) else (value,)
+        for tensor in tensors:
+            if hasattr(tensor, "element_size"):
+                size += tensor.numel() * tensor.element_size()
+    return size
+
+class InferenceBackend:
+    """Moteur d'inférence: chargement d'un modèle et transcription au schéma commun.
+
+    Le schéma commun est celui d'openai-whisper: {"text", "language", "segments"},
+    chaque segment ayant "id", "seek", "start", "end", "text", "tokens",
+    "temperature", "avg_logprob", "compression_ratio", "no_speech_prob" et,
+    avec word_timestamps, "words" = [{"word", "start", "end", "probability"}].
+    """
+    name = None
+
+    def available(self, model_name, model_dir=None) -> bool:
+        return True
+
+    def variant(self, model_name, quantize=False) -> str:
+        """Nom du modèle utilisé dans les clés de cache et les événements"""
+        return model_variant(model_name, quantize)
+
+    def load(self, model_name, quantize=False, model_dir=None, threads=None):
+        raise NotImplementedError
+
+    def model_size(self, model) -> int:
+        raise NotImplementedError
+
+    def transcribe(self, model, audio, options, verbose=None, progress=False, streamer=None, resume=None) -> dict:
+        """Transcrit `audio`; `resume` ({"seek", "prompt"}) fait repartir le décodage de la
+        trame mel `seek` avec les jetons `prompt` comme contexte, sur le signal entier"""
+        raise NotImplementedError
+
+    def detect_language(self, model, samples):
+        """(langue, probabilité) détectées sur les 30 premières secondes de `samples`"""
+        raise NotImplementedError
+
+class OpenAIWhisperBackend(InferenceBackend):
+    """openai-whisper (PyTorch), en float32 ou quantifié en int8"""
+    name = "openai-whisper"
+
+    def load(self, model_name, quantize=False, model_dir=None, threads=None):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return load_model_weights(model_name, quantize, model_dir)
+
+    def model_size(self, model) -> int:
+        return estimate_model_size(model)
+
+    def transcribe(self, model, audio, options, verbose=None, progress=False, streamer=None, resume=None) -> dict:
+        cached = getattr(_feature_scope, "state", None) is not None and isinstance(audio, np.ndarray)
+        if cached:
+            install_feature_cache_hooks(model)
+        start = int(resume["seek"]) if resume is not None else 0
+        if resume is not None:
+            options = dict(options, clip_timestamps=[start / MEL_FRAMES_PER_SECOND])
+        with contextlib.ExitStack() as stack:
+            if cached:
+                stack.enter_context(feature_signal(len(audio), start))
+            if resume is not None:
+                prompt = resume.get("prompt")
+                if prompt and resume_prompt_supported():
+                    stack.enter_context(resume_prompt_tokens(prompt))
+                    prompt = RESUME_PROMPT
+                elif prompt:
+                    log_message("Reprise: version de whisper non reconnue, prompt repris sous forme de texte")
+                    prompt = resume_prompt_text(model, prompt)
+                options = dict(options, initial_prompt=prompt or None)
+            if progress or streamer or cached:
+                stack.enter_context(transcription_progress(streamer, report=progress, start=start))
+            return model.transcribe(audio, fp16=False, verbose=verbose, **options)
+
+    def detect_language(self, model, samples):
+        import torch
+        import whisper
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(samples)), model.dims.n_mels)
+        _, probs = model.detect_language(mel.to(model.device))
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
+
+class FasterWhisperBackend(InferenceBackend):
+    """faster-whisper (CTranslate2), calcul int8 sur CPU.
+
+    Utilisé seulement si le paquet est installé et les fichiers du modèle déjà
+    présents: dans `model_dir/faster-whisper-<nom>` ou dans le cache Hugging Face.
+    """
+    name = "faster-whisper"
+    COMPUTE_TYPE = "int8"
+    # Noms faster-whisper des modèles dont le nom diffère d'openai-whisper
+    MODEL_ALIASES = {"large": "large-v3"}
+    # Options de décodage nommées différemment dans faster-whisper
+    OPTION_NAMES = {"logprob_threshold": "log_prob_threshold"}
+
+    def __init__(self):
+        self._paths = {}
+
+    def variant(self, model_name, quantize=False) -> str:
+        return f"{self.name}:{model_name}-{self.COMPUTE_TYPE}"
+
+    def local_path(self, model_name, model_dir=None):
+        """Dossier local du modèle converti, None s'il faudrait le télécharger"""
+        key = (model_name, model_dir)
+        if key not in self._paths:
+            self._paths[key] = None
+            size = self.MODEL_ALIASES.get(model_name, model_name)
+            candidate = os.path.join(model_dir, f"faster-whisper-{size}") if model_dir else None
+            if candidate and os.path.exists(os.path.join(candidate, "model.bin")):
+                self._paths[key] = candidate
+            elif importlib.util.find_spec("faster_whisper") is not None:
+                from faster_whisper.utils import download_model
                 try:
-                    os.remove(temp_wav_to_use)
-                    log_message(f"Fichier temporaire supprimé: {temp_wav_to_use}")
-                except Exception as cleanup_error:
-                    log_message(f"Erreur lors de la suppression du fichier temporaire: {cleanup_error}")
-            
-            sys.exit(1)
-        
-        # Vérifier si le texte transcrit est vide
-        if not result["text"].strip():
-            log_message("ATTENTION: Aucun texte détecté dans l'audio")
-            # Remplacer par un message explicite
-            result["text"] = "[Aucune parole détectée dans l'enregistrement]"
+                    self._paths[key] = download_model(size, local_files_only=True)
+                except Exception:
+                    pass
+        return self._paths[key]
+
+    def available(self, model_name, model_dir=None) -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None \
+            and self.local_path(model_name, model_dir) is not None
+
+    def load(self, model_name, quantize=False, model_dir=None, threads=None):
+        from faster_whisper import WhisperModel
+        path = self.local_path(model_name, model_dir)
+        if path is None:
+            raise TranscriptionError(f"Fichiers du modèle faster-whisper '{model_name}' introuvables en local")
+        model = WhisperModel(path, device="cpu", compute_type=self.COMPUTE_TYPE,
+                             cpu_threads=threads or 0, local_files_only=True)
+        model.model_path = path
+        return model
+
+    def model_size(self, model) -> int:
+        path = getattr(model, "model_path", None)
+        if not path:
+            return 0
+        return sum(os.path.getsize(os.path.join(path, entry)) for entry in os.listdir(path)
+                   if os.path.isfile(os.path.join(path, entry)))
+
+    def transcribe(self, model, audio, options, verbose=None, progress=False, streamer=None, resume=None) -> dict:
+        kwargs = {self.OPTION_NAMES.get(key, key): value for key, value in options.items()}
+        # None signifie décodage glouton / un seul tirage dans openai-whisper
+        kwargs["beam_size"] = kwargs.get("beam_size") or 1
+        kwargs["best_of"] = kwargs.get("best_of") or 1
+        if resume is not None:
+            # faster-whisper accepte directement des jetons comme prompt initial
+            kwargs["clip_timestamps"] = [int(resume["seek"]) / MEL_FRAMES_PER_SECOND]
+            kwargs["initial_prompt"] = list(resume["prompt"]) or None
+        pieces, info = model.transcribe(audio, vad_filter=False, **kwargs)
+
+        segments = []
+        for piece in pieces:
+            segment = {
+                "id": len(segments),
+                "seek": piece.seek,
+                "start": piece.start,
+                "end": piece.end,
+                "text": piece.text,
+                "tokens": list(piece.tokens),
+                "temperature": piece.temperature,
+                "avg_logprob": piece.avg_logprob,
+                "compression_ratio": piece.compression_ratio,
+                "no_speech_prob": piece.no_speech_prob,
+            }
+            if piece.words:
+                segment["words"] = [{"word": word.word, "start": word.start, "end": word.end,
+                                     "probability": word.probability} for word in piece.words]
+            segments.append(segment)
+            if verbose:
+                log_message(f"[{piece.start:.2f} --> {piece.end:.2f}] {piece.text}")
+            if progress and info.duration:
+                # Même unité que la progression d'openai-whisper: trames mel de 10 ms
+                total = int(info.duration * MEL_FRAMES_PER_SECOND)
+                emit_progress_event({"type": "transcriptionProgress",
+                                     "progress": round(min(piece.end / info.duration, 1.0), 4),
+                                     "frames": min(int(piece.end * MEL_FRAMES_PER_SECOND), total),
+                                     "total_frames": total})
+            if streamer is not None:
+                streamer.push(segments, piece.end)
+            check_cancelled(segments)
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+    def detect_language(self, model, samples):
+        # La langue est détectée dès l'appel; les segments, jamais parcourus, ne sont pas décodés
+        _, info = model.transcribe(samples, language=None, vad_filter=False, beam_size=1)
+        return info.language, float(info.language_probability)
+
+BACKENDS = {backend.name: backend for backend in (OpenAIWhisperBackend(), FasterWhisperBackend())}
+DEFAULT_BACKEND = OpenAIWhisperBackend.name
+
+# Choix déjà annoncés du moteur 'auto' (modèle, moteur)
+_announced_backends = set()
+
+def resolve_backend(backend_name=DEFAULT_BACKEND, model_name="base", model_dir=None, quantize=False) -> InferenceBackend:
+    """Retourne le moteur demandé.
+
+    'auto' préfère faster-whisper s'il est utilisable pour ce modèle, sauf avec
+    quantize=True (quantification int8 d'openai-whisper); le choix est journalisé.
+    quantize=True avec faster-whisper demandé explicitement lève TranscriptionError.
+    """
+    if backend_name in (None, "auto"):
+        faster = BACKENDS[FasterWhisperBackend.name]
+        backend = faster if not quantize and faster.available(model_name, model_dir) \
+            else BACKENDS[OpenAIWhisperBackend.name]
+        if (model_name, backend.name) not in _announced_backends:
+            _announced_backends.add((model_name, backend.name))
+            log_message(f"Moteur d'inférence 'auto' pour le modèle {model_name}: {backend.name}")
+        return backend
+    if backend_name not in BACKENDS:
+        raise TranscriptionError(f"Moteur d'inférence inconnu: {backend_name}")
+    if quantize and backend_name == FasterWhisperBackend.name:
+        raise TranscriptionError("--quantize ne s'applique qu'à openai-whisper "
+                                 "(faster-whisper calcule déjà en int8 sur CPU)")
+    return BACKENDS[backend_name]
+
+class LoadedModel:
+    """Modèle chargé associé à son moteur d'inférence"""
+    def __init__(self, backend, name, model):
+        self.backend = backend
+        self.name = name
+        self.model = model
+
+    def transcribe(self, audio, options, verbose=None, progress=False, streamer=None, resume=None) -> dict:
+        return self.backend.transcribe(self.model, audio, options, verbose=verbose,
+                                       progress=progress, streamer=streamer, resume=resume)
+
+    def detect_language(self, samples):
+        return self.backend.detect_language(self.model, samples)
+
+class ModelCache:
+    """Cache LRU des modèles Whisper chargés, borné par une limite mémoire.
+
+    Le modèle le plus récemment utilisé n'est jamais évincé, même s'il dépasse
+    à lui seul la limite. Avec quantize=True, les modèles openai-whisper sont
+    chargés en int8. `backend` est le moteur par défaut, surchargeable à chaque appel.
+    `threads` limite les threads de calcul des modèles chargés (None: tous les cœurs).
+    """
+    def __init__(self, max_memory_mb=4096, quantize=False, model_dir=None, backend=DEFAULT_BACKEND, threads=None):
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.quantize = quantize
+        self.model_dir = model_dir
+        self.backend = backend
+        self.threads = threads
+        self.models = OrderedDict()  # variante -> (LoadedModel, taille en octets)
+
+    def total_size(self) -> int:
+        return sum(size for _, size in self.models.values())
+
+    def backend_for(self, model_name, backend_name=None) -> InferenceBackend:
+        return resolve_backend(backend_name or self.backend, model_name, self.model_dir, self.quantize)
+
+    def variant(self, model_name, backend_name=None) -> str:
+        return self.backend_for(model_name, backend_name).variant(model_name, self.quantize)
+
+    def get(self, model_name, backend_name=None) -> LoadedModel:
+        """Retourne le modèle demandé, en le chargeant si nécessaire"""
+        backend = self.backend_for(model_name, backend_name)
+        key = backend.variant(model_name, self.quantize)
+        if key in self.models:
+            self.models.move_to_end(key)
+            log_message(f"Modèle '{key}' déjà chargé (cache)")
+            return self.models[key][0]
+
+        loaded_name, model = load_whisper_model(model_name, self.quantize, self.model_dir, backend, self.threads)
+        key = backend.variant(loaded_name, self.quantize)
+        if key in self.models:
+            # Le modèle de secours était déjà en cache: garder l'instance existante
+            self.models.move_to_end(key)
+            return self.models[key][0]
+
+        size = backend.model_size(model)
+        log_message(f"Modèle '{key}' ajouté au cache ({size / (1024 * 1024):.0f} Mo)")
+        loaded = LoadedModel(backend, loaded_name, model)
+        self.models[key] = (loaded, size)
+        self._evict()
+        return loaded
+
+    def _evict(self):
+        while len(self.models) > 1 and self.total_size() > self.max_memory:
+            evicted_name, (_, size) = self.models.popitem(last=False)
+            log_message(f"Éviction du modèle '{evicted_name}' du cache ({size / (1024 * 1024):.0f} Mo)")
+        gc.collect()
+
+def audio_fingerprint(audio) -> str:
+    """Empreinte SHA-256 du signal décodé (ou du fichier si le décodage en mémoire a échoué)"""
+    digest = hashlib.sha256()
+    if isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio, dtype=np.float32).data)
+    else:
+        with open(audio, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def _json_default(value):
+    """Sérialise les scalaires/tableaux NumPy présents dans les résultats Whisper"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+class ResultCache:
+    """Cache disque des résultats de transcription, adressé par le contenu.
+
+    La clé combine l'empreinte du signal décodé, le modèle et les paramètres de
+    décodage. Le résultat complet (segments, mots) est stocké en JSON, écrit de
+    façon atomique (fichier temporaire + os.replace) pour supporter plusieurs
+    processus. La date de modification sert d'horodatage LRU: les entrées les
+    plus anciennes sont supprimées quand la taille totale dépasse la limite.
+    """
+    SUFFIX = ".json"
+    LABEL = "Cache résultats"
+
+    def __init__(self, cache_dir, max_size_mb=1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint, model_name, params) -> str:
+        payload = json.dumps({"audio": fingerprint, "model": model_name, "params": params},
+                             sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            log_message(f"Cache résultats: miss {key[:12]} (hits={self.hits}, misses={self.misses})")
+            return None
+        try:
+            os.utime(path)  # Marquer l'entrée comme récemment utilisée
+        except OSError:
+            pass
+        self.hits += 1
+        log_message(f"Cache résultats: hit {key[:12]} (hits={self.hits}, misses={self.misses})")
+        return result
+
+    def put(self, key, result):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, default=_json_default)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        evict_oldest(self.cache_dir, self.SUFFIX, self.max_size, self.LABEL)
+
+def evict_oldest(directory, suffix, max_size, label, keep=None):
+    """Supprime les fichiers `suffix` les moins récemment modifiés de `directory`
+    tant que leur taille totale dépasse `max_size` octets (sauf le chemin `keep`)"""
+    entries = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(suffix) or entry.path == keep:
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue  # Supprimée entre-temps par un autre processus
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+            log_message(f"{label}: éviction de {os.path.basename(path)}")
+        except FileNotFoundError:
+            pass
+        total -= size
+
+class FeatureCache(ResultCache):
+    """Cache disque des sorties de l'encodeur, fenêtre par fenêtre.
+
+    Chaque fenêtre est un fichier .npy float16 relu en memory-map; la clé combine
+    l'empreinte audio, le modèle, le signal transcrit et le seek de la fenêtre dans
+    la boucle de whisper. Un second décodage du même fichier (autre profil, prompt
+    ou langue) ne réencode que les fenêtres dont le seek a changé. Éviction LRU
+    bornée en taille, comme ResultCache.
+    """
+    SUFFIX = ".npy"
+    LABEL = "Cache encodeur"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # Marquer l'entrée comme récemment utilisée
+        except OSError:
+            pass
+        self.hits += 1
+        return array
+
+    def put(self, key, array):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, array)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._evict()
+
+@contextlib.contextmanager
+def feature_cache_scope(cache, fingerprint, variant):
+    """Active `cache` pour les transcriptions openai-whisper du thread courant.
+
+    `fingerprint` identifie le fichier transcrit et `variant` le modèle; sans
+    cache, le bloc s'exécute normalement.
+    """
+    if cache is None:
+        yield
+        return
+    previous = getattr(_feature_scope, "state", None)
+    hits, misses = cache.hits, cache.misses
+    _feature_scope.state = {"cache": cache, "fingerprint": fingerprint, "variant": variant,
+                            "offset": 0, "signal": None, "seek": 0}
+    try:
+        yield
+    finally:
+        _feature_scope.state = previous
+        log_message(f"{cache.LABEL}: {cache.hits - hits} entrée(s) relue(s), "
+                    f"{cache.misses - misses} calculée(s)")
+
+@contextlib.contextmanager
+def feature_offset(offset):
+    """Les signaux transcrits dans ce bloc commencent à l'échantillon `offset` du fichier"""
+    state = getattr(_feature_scope, "state", None)
+    if state is None:
+        yield
+        return
+    previous, state["offset"] = state["offset"], offset
+    try:
+        yield
+    finally:
+        state["offset"] = previous
+
+@contextlib.contextmanager
+def feature_signal(samples, start=0):
+    """Le bloc transcrit un signal de `samples` échantillons, à partir de la trame `start`.
+
+    Le mel de whisper est normalisé sur le signal entier: les sorties de l'encodeur
+    sont identifiées par la position et la longueur du signal, puis par le seek de
+    chaque fenêtre (mis à jour par transcription_progress).
+    """
+    state = getattr(_feature_scope, "state", None)
+    if state is None:
+        yield
+        return
+    previous = state["signal"], state["seek"]
+    state["signal"], state["seek"] = {"offset": state["offset"], "samples": samples}, start
+    try:
+        yield
+    finally:
+        state["signal"], state["seek"] = previous
+
+def _window_checksum(mel):
+    """Empreinte légère d'une fenêtre mel: distingue au même seek la fenêtre de la
+    détection de langue (mel non tronqué) de celle du décodage"""
+    return float(mel[..., ::97].sum())
+
+def _cached_encoder_forward(forward):
+    """Enveloppe model.encoder.forward: sortie de l'encodeur relue pour une fenêtre déjà encodée.
+
+    Une fenêtre absente du cache est encodée et rendue en float32 telle quelle (le
+    décodage ne change pas); seule sa copie sur disque est en float16.
+    """
+    def cached_forward(mel):
+        state = getattr(_feature_scope, "state", None)
+        if state is None or state["signal"] is None or mel.shape[0] != 1:
+            return forward(mel)
+        import torch
+        key = ResultCache.make_key(state["fingerprint"], state["variant"],
+                                   {**state["signal"], "seek": state["seek"], "check": _window_checksum(mel)})
+        values = state["cache"].get(key)
+        if values is None:
+            output = forward(mel)
+            state["cache"].put(key, output.detach().cpu().numpy().astype(np.float16))
+            return output
+        return torch.from_numpy(values.astype(np.float32)).to(mel.device)
+    return cached_forward
+
+def install_feature_cache_hooks(model):
+    """Branche le cache de l'encodeur sur un modèle openai-whisper (sans effet hors feature_cache_scope)"""
+    if "forward" not in vars(model.encoder):
+        model.encoder.forward = _cached_encoder_forward(model.encoder.forward)
+
+def prepare_audio(audio_path: str, check_silence=False, decode=True):
+    """Vérifie et décode le fichier audio.
+
+    Retourne un tableau float32 16 kHz mono, ou le chemin d'un fichier WAV
+    temporaire si le décodage en mémoire avec FFmpeg a échoué. Avec decode=False,
+    le fichier est seulement vérifié et son chemin retourné (lecture en flux).
+    """
+    global temp_wav_to_use, raw_pcm_to_use
+    temp_wav_to_use = None
+    raw_pcm_to_use = None
+
+    # Vérifier si le fichier existe
+    if not os.path.isfile(audio_path):
+        log_message(f"ERREUR: Fichier non trouvé: {audio_path}")
+        raise TranscriptionError(f"Fichier non trouvé: {audio_path}")
+    file_size = os.path.getsize(audio_path)
+    log_message(f"SUCCES: Fichier trouvé à l'emplacement: {audio_path}")
+    log_message(f"Taille du fichier: {file_size} octets")
+
+    # Vérifier le fichier audio
+    with Stage("probe", bytes=file_size):
+        valid = check_audio_file(audio_path, check_silence=check_silence)
+    if not valid:
+        log_message(f"ERREUR: Le fichier audio n'est pas valide ou ne contient pas de données")
+        raise TranscriptionError("Le fichier audio n'est pas valide ou ne contient pas de données")
+    if not decode:
+        return audio_path
+
+    with Stage("decode", bytes=file_size) as stage:
+        audio = decode_prepared_audio(audio_path)
+        if isinstance(audio, np.ndarray):
+            stage.fields["audio_seconds"] = len(audio) / SAMPLE_RATE
+    return audio
+
+def decode_prepared_audio(audio_path: str):
+    """Décode le fichier vérifié par check_audio_file (voir prepare_audio)"""
+    global temp_wav_to_use
+
+    # Fichier sans en-tête: lecture directe du PCM brut
+    if raw_pcm_to_use is not None:
+        try:
+            audio = load_raw_pcm(raw_pcm_to_use)
+            log_message(f"PCM brut chargé via memmap: {audio.size} échantillons ({audio.size / SAMPLE_RATE:.1f} s)")
+            return audio
+        except Exception as e:
+            log_message(f"Lecture du PCM brut impossible ({e}), écriture d'un fichier réparé")
+            temp_wav_to_use = repair_wav_file(raw_pcm_to_use)
+
+    # Utiliser le fichier réparé si disponible
+    source_path = temp_wav_to_use if temp_wav_to_use is not None else audio_path
+
+    # Décodage unique en mémoire: le tableau est passé tel quel à model.transcribe
+    try:
+        return decode_audio(source_path)
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError) as e:
+        log_message(f"Décodage en mémoire impossible ({e}), repli sur un fichier WAV temporaire")
+
+    if source_path.lower().endswith('.mp3'):
+        log_message(f"Conversion du fichier MP3 en WAV...")
+        file_to_transcribe = convert_mp3_to_wav(source_path)
+    elif source_path.lower().endswith(COMPRESSED_EXTENSIONS):
+        try:
+            file_to_transcribe = convert_with_pydub(source_path)
+        except Exception as pydub_error:
+            log_message(f"Échec de la conversion avec pydub: {pydub_error}")
+            raise TranscriptionError(f"Impossible de décoder le fichier audio: {pydub_error}")
+    else:
+        # WAV (éventuellement réparé): lecture directe avec soundfile
+        try:
+            data, samplerate = sf.read(source_path, dtype='float32', always_2d=True)
+            if len(data) > 0:
+                log_message(f"Lecture directe avec soundfile: {len(data)} échantillons à {samplerate} Hz")
+                return resample_audio(data.mean(axis=1), samplerate)
+        except Exception as sf_error:
+            log_message(f"Erreur lors de la lecture avec soundfile: {sf_error}")
+        file_to_transcribe = source_path
+
+    if file_to_transcribe != source_path:
+        # Le fichier réparé éventuel n'est plus utile une fois converti
+        cleanup_temp_files(audio_path)
+        temp_wav_to_use = file_to_transcribe
+        log_message(f"Conversion terminée. Fichier WAV: {file_to_transcribe}")
+        log_message(f"Taille du fichier WAV: {os.path.getsize(file_to_transcribe)} octets")
+
+    log_message(f"Fichier à transcrire : {file_to_transcribe}")
+    return file_to_transcribe
+
+def read_converted_audio(file_path: str):
+    """Signal float32 16 kHz mono du fichier rendu par decode_prepared_audio quand le
+    décodage FFmpeg a échoué: lu avec soundfile, FFmpeg n'étant retenté qu'en dernier recours"""
+    try:
+        data, samplerate = sf.read(file_path, dtype='float32', always_2d=True)
+        if len(data) > 0:
+            return resample_audio(data.mean(axis=1), samplerate)
+    except Exception as sf_error:
+        log_message(f"Erreur lors de la lecture avec soundfile: {sf_error}")
+    try:
+        return decode_audio(file_path)
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError) as e:
+        raise TranscriptionError(f"Impossible de décoder le fichier audio: {e}")
+
+def cleanup_temp_files(audio_path: str):
+    """Supprime le fichier temporaire converti/réparé associé au job en cours"""
+    global temp_wav_to_use
+    if temp_wav_to_use is not None and temp_wav_to_use != audio_path:
+        try:
+            os.remove(temp_wav_to_use)
+            log_message(f"Fichier temporaire supprimé: {temp_wav_to_use}")
+        except Exception as cleanup_error:
+            log_message(f"Erreur lors de la suppression du fichier temporaire: {cleanup_error}")
+    temp_wav_to_use = None
+
+def apply_language(options, language) -> dict:
+    """Fixe la langue de décodage; le prompt français par défaut n'est gardé que pour le français"""
+    options = dict(options, language=language)
+    if language != "fr" and options.get("initial_prompt") == DEFAULT_TRANSCRIBE_OPTIONS["initial_prompt"]:
+        options["initial_prompt"] = None
+    return options
+
+def build_transcribe_options(overrides=None, profile=DEFAULT_DECODING_PROFILE, word_timestamps=False,
+                             language=None) -> dict:
+    """Fusionne les options par défaut, le profil de décodage et les options d'une requête.
+
+    Les horodatages par mot (coûteux: alignement DTW) ne sont calculés que si une
+    sortie au niveau du mot est demandée. `language` remplace la langue par défaut
+    ("auto": détectée une fois par fichier, voir resolve_language).
+    """
+    if profile not in DECODING_PROFILES:
+        raise TranscriptionError(f"Profil de décodage inconnu: {profile}")
+    options = dict(DEFAULT_TRANSCRIBE_OPTIONS)
+    options.update(DECODING_PROFILES[profile])
+    options["word_timestamps"] = word_timestamps
+    if language is not None:
+        options["language"] = language
+    for key, value in (overrides or {}).items():
+        if key not in ALLOWED_DECODE_OPTIONS:
+            log_message(f"Option de décodage ignorée: {key}")
+            continue
+        options[key] = value
+    if options.get("language") != "auto":
+        options = apply_language(options, options.get("language"))
+    return options
+
+def _first_speech_sample(samples):
+    """Début (en échantillons) de la première zone de parole audible de `samples`, ou None"""
+    for start, end in detect_speech_regions(samples):
+        if np.max(np.abs(samples[start:end])) >= SILENCE_THRESHOLD:
+            return start
+    return None
+
+def first_voiced_window(windows, scan_seconds=LANGUAGE_SCAN_SECONDS):
+    """Extrait de 30 s commençant à la première prise de parole des fenêtres successives `windows`.
+
+    Le silence initial (attente, générique) est sauté; deux fenêtres au plus sont
+    gardées en mémoire. None si aucune parole n'apparaît dans les `scan_seconds`
+    premières secondes.
+    """
+    size = WINDOW_SECONDS * SAMPLE_RATE
+    buffer, scanned, start = np.zeros(0, dtype=np.float32), 0, None
+    for window in windows:
+        buffer = np.concatenate([buffer, window])
+        if start is None and len(buffer) >= 2 * size:
+            start = _first_speech_sample(buffer)
+            if start is None:
+                scanned += len(buffer) - size
+                if scanned >= scan_seconds * SAMPLE_RATE:
+                    return None
+                # Garder la dernière fenêtre: une prise de parole peut commencer à sa fin
+                buffer = buffer[-size:]
+        if start is not None and len(buffer) - start >= size:
+            break
+    if start is None and len(buffer):
+        start = _first_speech_sample(buffer)
+    return None if start is None else buffer[start:start + size]
+
+def detect_audio_language(get_model, audio, variant, fingerprint=None, result_cache=None, raw_pcm=False) -> dict:
+    """Détecte la langue de `audio` (signal ou chemin) sur sa première fenêtre parlée.
+
+    `get_model` retourne le modèle de variante `variant` (voir model_variant); il
+    n'est appelé que si la détection n'est pas déjà connue. Retourne {"language",
+    "probability", "model"}. Avec une empreinte, le résultat est mémorisé pour le
+    processus et, si un cache de résultats est donné, sur disque, par fichier et
+    par modèle: un même fichier n'est analysé qu'une fois (morceaux, reprises, relances).
+    """
+    cache_key = ResultCache.make_key(fingerprint, "language", {"model": variant}) if fingerprint else None
+    if cache_key in _detected_languages:
+        _detected_languages.move_to_end(cache_key)
+        return _detected_languages[cache_key]
+    detection = result_cache.get(cache_key) if cache_key and result_cache is not None else None
+
+    if detection is None:
+        size = WINDOW_SECONDS * SAMPLE_RATE
+        if isinstance(audio, np.ndarray):
+            windows = (audio[i:i + size] for i in range(0, len(audio), size))
         else:
-            log_message(f"Texte transcrit (premiers 100 caractères): {result['text'][:100]}...")
-        
+            windows = iter_audio_windows(audio, WINDOW_SECONDS, raw_pcm=raw_pcm)
+        try:
+            clip = first_voiced_window(windows)
+        finally:
+            windows.close()
+        detection = {"language": None, "probability": 0.0, "model": variant}
+        if clip is None:
+            log_message("Détection de la langue: aucune parole trouvée")
+        else:
+            model = get_model()
+            with Stage("language", model=model.name, audio_seconds=len(clip) / SAMPLE_RATE):
+                language, probability = model.detect_language(clip)
+            detection.update(language=language, probability=round(probability, 4))
+        if cache_key and result_cache is not None:
+            result_cache.put(cache_key, detection)
+
+    if cache_key:
+        _detected_languages[cache_key] = detection
+        while len(_detected_languages) > LANGUAGE_MEMO_SIZE:
+            _detected_languages.popitem(last=False)
+    return detection
+
+def resolve_language(get_model, audio, options, variant, fingerprint=None, result_cache=None, checkpoint=None,
+                     resume=False, fallback=DEFAULT_FALLBACK_LANGUAGE,
+                     threshold=LANGUAGE_CONFIDENCE_THRESHOLD, raw_pcm=False) -> dict:
+    """Remplace language="auto" par la langue du fichier, détectée une seule fois.
+
+    Le modèle n'est chargé (`get_model()`) que si une détection est nécessaire.
+    Une reprise réutilise la langue enregistrée dans le point de reprise. Sous le
+    seuil de confiance `threshold`, la langue `fallback` est utilisée. Les options
+    retournées servent à tout le fichier (morceaux parallèles ou lus en flux compris).
+    """
+    if options.get("language") != "auto":
+        return options
+    state = checkpoint.load() if checkpoint is not None and resume else None
+    if state and state.get("language"):
+        log_message(f"Langue reprise du point de reprise: {state['language']}")
+        return apply_language(options, state["language"])
+
+    detection = detect_audio_language(get_model, audio, variant, fingerprint, result_cache, raw_pcm)
+    if detection["language"] and detection["probability"] >= threshold:
+        language = detection["language"]
+        log_message(f"Langue détectée: {language} (probabilité {detection['probability']:.2f})")
+    else:
+        language = fallback
+        log_message(f"Langue incertaine ({detection['language']}, probabilité {detection['probability']:.2f} "
+                    f"< {threshold}): utilisation de '{fallback}'")
+    return apply_language(options, language)
+
+def find_chunk_boundaries(audio, n_chunks, search_s=10.0, frame_ms=100):
+    """Découpe le signal en `n_chunks` morceaux en coupant dans les passages les plus calmes.
+
+    Chaque point de coupe idéal est déplacé vers la trame la moins énergétique
+    dans une fenêtre de ±`search_s` secondes. Si cette trame n'est pas un silence,
+    le morceau suivant recommence CHUNK_OVERLAP secondes plus tôt pour ne pas
+    couper un mot. Retourne une liste de (début, fin) en échantillons.
+    """
+    frame = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    search = int(search_s * 1000 / frame_ms)
+    overlap = int(CHUNK_OVERLAP * SAMPLE_RATE)
+
+    chunks = []
+    start = 0
+    for k in range(1, n_chunks):
+        ideal = k * n_frames // n_chunks
+        lo, hi = max(ideal - search, 1), min(ideal + search, n_frames - 1)
+        if hi <= lo:
+            continue
+        cut_frame = lo + int(np.argmin(energy[lo:hi]))
+        cut = cut_frame * frame + frame // 2
+        if cut <= start:
+            continue
+        chunks.append((start, cut))
+        start = cut if energy[cut_frame] < SILENCE_THRESHOLD else max(cut - overlap, 0)
+    chunks.append((start, len(audio)))
+    return chunks
+
+# Modèle chargé par chaque processus du pool de --parallel
+_chunk_worker_model = None
+
+def _init_chunk_worker(model_name, threads, quantize=False, model_dir=None, backend_name=OpenAIWhisperBackend.name):
+    """Initialisation d'un processus du pool: threads dédiés et modèle propre"""
+    global _chunk_worker_model
+    backend = BACKENDS[backend_name]
+    _chunk_worker_model = LoadedModel(backend, model_name,
+                                      backend.load(model_name, quantize, model_dir, threads=threads))
+
+def _transcribe_chunk(task):
+    index, chunk, options = task
+    # verbose=None: aucune sortie, stdout est partagé avec le processus principal
+    return index, _chunk_worker_model.transcribe(chunk, options, verbose=None)
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def stitch_chunk_results(results, chunks):
+    """Assemble les résultats des morceaux: décalage des horodatages et suppression des doublons
+    dans les zones de recouvrement"""
+    segments = []
+    for result, (start, _) in zip(results, chunks):
+        offset = start / SAMPLE_RATE
+        last_end = segments[-1]["end"] if segments else 0.0
+        for segment in result.get("segments", []):
+            segment["start"] += offset
+            segment["end"] += offset
+            for word in segment.get("words", []) or []:
+                word["start"] += offset
+                word["end"] += offset
+            # Segment déjà transcrit à la fin du morceau précédent
+            if (segment["start"] + segment["end"]) / 2 < last_end:
+                continue
+            if segments and segment["text"].strip() == segments[-1]["text"].strip():
+                continue
+            segment["id"] = len(segments)
+            segments.append(segment)
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": results[0].get("language") if results else None,
+    }
+
+def transcribe_parallel(model_name, audio, options, workers, quantize=False, model_dir=None,
+                        backend_name=OpenAIWhisperBackend.name):
+    """Transcrit un long signal découpé en morceaux dans `workers` processus"""
+    chunks = find_chunk_boundaries(audio, workers)
+    workers = min(workers, len(chunks))
+    threads = max(1, available_cpus() // workers)
+    log_message(f"Transcription parallèle: {len(chunks)} morceaux, {workers} processus, "
+                f"{threads} thread(s) chacun ({backend_name})")
+
+    results = [None] * len(chunks)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=workers, initializer=_init_chunk_worker,
+                      initargs=(model_name, threads, quantize, model_dir, backend_name)) as pool:
+        tasks = [(i, audio[start:end], options) for i, (start, end) in enumerate(chunks)]
+        for done, (index, result) in enumerate(pool.imap_unordered(_transcribe_chunk, tasks), 1):
+            results[index] = result
+            log_message(f"Morceau {index + 1}/{len(chunks)} transcrit ({done}/{len(chunks)})")
+            emit_progress_event({"type": "transcriptionProgress", "progress": round(done / len(chunks), 4),
+                                 "chunks": done, "total_chunks": len(chunks)})
+            if current_cancel is not None and current_cancel.stop_reason():
+                # Garder les morceaux terminés consécutifs depuis le début; la sortie du
+                # bloc with termine les processus encore occupés
+                finished = results.index(None) if None in results else len(results)
+                partial = stitch_chunk_results(results[:finished], chunks[:finished])
+                raise JobCancelled(current_cancel.reason, partial["segments"])
+    return stitch_chunk_results(results, chunks)
+
+class TranscriptionCheckpoint:
+    """Point de reprise d'une transcription: segments terminés, position atteinte (secondes)
+    et état du décodeur (trame mel `seek` et jetons du prompt) pour reprendre à l'identique.
+
+    Le fichier `<dossier>/<clé>.json` est réécrit au plus toutes les `interval`
+    secondes; la clé combine l'empreinte audio, le modèle et les paramètres. Les
+    points de reprise laissés par les jobs interrompus sont supprimés du plus
+    ancien au plus récent au-delà de `max_size_mb` pour le dossier, comme dans
+    ResultCache.
+    """
+    LABEL = "Points de reprise"
+
+    def __init__(self, checkpoint_dir, key, interval=CHECKPOINT_INTERVAL, max_size_mb=CHECKPOINT_MAX_MB):
+        self.path = os.path.join(checkpoint_dir, key + ".json")
+        self.interval = interval
+        self.max_size = max_size_mb * 1024 * 1024
+        self.last_write = time.time()
+        self._evicted = False
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state.get("segments"), list) else None
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def save(self, segments, position, language=None, decoder=None):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"position": position, "language": language, "decoder": decoder, "segments": segments,
+                       "updated": time.time()}, f, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, self.path)
+        self.last_write = time.time()
+        if not self._evicted:
+            # Une fois par job: les autres points de reprise ne changent pas pendant le décodage
+            self._evicted = True
+            evict_oldest(os.path.dirname(self.path), ".json", self.max_size, self.LABEL, keep=self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+            log_message(f"Point de reprise supprimé: {self.path}")
+        except FileNotFoundError:
+            pass
+
+class CheckpointRecorder:
+    """Reçoit les segments au fil du décodage (comme un SegmentStreamer), les replace
+    après les segments d'une exécution précédente et écrit périodiquement le point de reprise.
+
+    Les segments sont relayés vers `streamer` s'il est fourni; `checkpoint` peut
+    être None. Avec hold_last, le dernier segment reçu n'est validé qu'au push
+    final (final=True) ou quand un segment le suit. `position` est la position
+    déjà atteinte (par défaut `offset`).
+    """
+    def __init__(self, checkpoint, previous=(), offset=0.0, streamer=None, language=None, hold_last=False,
+                 position=None):
+        self.checkpoint = checkpoint
+        self.segments = list(previous)
+        self.resumed = len(self.segments)
+        self.offset = offset
+        self.position = offset if position is None else position
+        self.streamer = streamer
+        self.language = language
+        self.hold_last = hold_last
+        self.decoder_state = None
+
+    def record_decoder_state(self, seek, prompt):
+        """État du décodeur après une fenêtre: prochaine trame mel et jetons du prompt.
+
+        Non enregistré avec hold_last: le segment retenu n'est pas encore validé et
+        la reprise doit repartir de son début (voir resume_state).
+        """
+        if self.hold_last:
+            return
+        self.decoder_state = {"seek": seek + int(round(self.offset * MEL_FRAMES_PER_SECOND)),
+                              "prompt": [int(token) for token in prompt[-CHECKPOINT_PROMPT_TOKENS:]]}
+
+    def save(self):
+        self.checkpoint.save(self.segments, self.position, self.language, self.decoder_state)
+
+    def start_window(self, offset):
+        """Les segments reçus ensuite sont relatifs à un nouveau signal commençant à `offset` (s)"""
+        self.offset = offset
+        self.resumed = len(self.segments)
+
+    def push(self, segments, position=None, final=False):
+        if self.hold_last and not final and segments:
+            # Tout ce qui précède le segment retenu est terminé
+            position = segments[-1]["start"]
+            segments = segments[:-1]
+        shift = lambda t: t + self.offset
+        for segment in segments[len(self.segments) - self.resumed:]:
+            segment = dict(segment, words=[dict(word) for word in segment.get("words") or []])
+            if not segment["words"]:
+                del segment["words"]
+            remap_segment(segment, shift)
+            segment["id"] = len(self.segments)
+            segment["seek"] = segment.get("seek", 0) + int(self.offset * MEL_FRAMES_PER_SECOND)
+            self.segments.append(segment)
+        if position is not None:
+            self.position = max(self.position, position + self.offset)
+        elif self.segments:
+            self.position = max(self.position, self.segments[-1]["end"])
+        if self.streamer is not None:
+            self.streamer.push(self.segments)
+        if self.checkpoint is not None and time.time() - self.checkpoint.last_write >= self.checkpoint.interval:
+            self.save()
+
+def resume_state(state, options):
+    """État du décodeur d'un point de reprise ({"seek", "prompt"}).
+
+    Les points de reprise sans état du décodeur (faster-whisper, anciens fichiers)
+    repartent de leur position, avec les derniers jetons des segments comme prompt.
+    """
+    decoder = state.get("decoder")
+    if decoder and "seek" in decoder:
+        return {"seek": int(decoder["seek"]), "prompt": list(decoder.get("prompt") or [])}
+    prompt = []
+    if options.get("condition_on_previous_text", True):
+        prompt = [token for segment in state["segments"] for token in segment.get("tokens") or []]
+    return {"seek": int(round(float(state.get("position", 0.0)) * MEL_FRAMES_PER_SECOND)),
+            "prompt": prompt[-CHECKPOINT_PROMPT_TOKENS:]}
+
+def transcribe_with_checkpoint(model, samples, options, checkpoint, resume=False, verbose=None, streamer=None) -> dict:
+    """Transcrit `samples` en enregistrant des points de reprise.
+
+    Avec resume=True et un point de reprise existant, le décodage repart de la
+    fenêtre enregistrée, sur le signal entier (même spectrogramme mel) et avec
+    les jetons de prompt qu'avait le décodeur: les segments suivants sont ceux
+    d'une transcription sans interruption.
+    """
+    state = checkpoint.load() if resume else None
+    previous, language, decoder = [], options.get("language"), None
+    run_options = options
+    if state:
+        previous, decoder = state["segments"], resume_state(state, options)
+        language = state.get("language") or language
+        log_message(f"Reprise à {decoder['seek'] / MEL_FRAMES_PER_SECOND:.1f} s: "
+                    f"{len(previous)} segment(s) déjà transcrits")
+        if language:
+            # La langue a été fixée au premier passage: ne pas la redétecter
+            run_options = dict(options, language=language)
+
+    start = decoder["seek"] / MEL_FRAMES_PER_SECOND if decoder else 0.0
+    recorder = CheckpointRecorder(checkpoint, previous, 0.0, streamer, language, position=start)
+    recorder.decoder_state = decoder
+    if len(samples) - start * SAMPLE_RATE >= SAMPLE_RATE // 10:
+        try:
+            result = model.transcribe(samples, run_options, verbose=verbose, progress=True, streamer=recorder,
+                                      resume=decoder)
+        except JobCancelled as e:
+            # Enregistrer l'état atteint: --resume repartira de là
+            recorder.push(e.segments)
+            recorder.save()
+            raise JobCancelled(e.reason, recorder.segments)
+        recorder.push(result["segments"])
+        language = result.get("language") or language
+    return {
+        "text": "".join(segment["text"] for segment in recorder.segments),
+        "segments": recorder.segments,
+        "language": language,
+    }
+
+def iter_audio_windows(file_path, window_seconds, start_seconds=0.0, raw_pcm=False):
+    """Lit le signal par fenêtres de `window_seconds` (float32 16 kHz mono) sans charger le fichier.
+
+    Le PCM brut est lu fenêtre par fenêtre (un memmap du fichier entier garderait
+    en mémoire résidente chaque page déjà lue); les autres formats passent par un
+    pipe FFmpeg lu au fil de l'eau, ou à défaut par blocs soundfile rééchantillonnés.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    start = int(start_seconds * SAMPLE_RATE)
+
+    if raw_pcm:
+        n_samples = os.path.getsize(file_path) // 2
+        with open(file_path, 'rb') as f:
+            for position in range(start, n_samples, window):
+                f.seek(position * 2)
+                pcm = np.fromfile(f, dtype='<i2', count=min(window, n_samples - position))
+                yield pcm.astype(np.float32) / 32768.0
+        return
+
+    ffmpeg_cmd = [
+        'ffmpeg', '-nostdin', '-v', 'error', '-ss', str(start_seconds), '-i', file_path,
+        '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-acodec', 'pcm_s16le', '-'
+    ]
+    try:
+        process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        log_message("FFmpeg introuvable, lecture par blocs avec soundfile")
+        yield from _iter_soundfile_windows(file_path, window, start_seconds)
+        return
+
+    produced = 0
+    try:
+        while True:
+            data = process.stdout.read(window * 2)
+            if len(data) < 2:
+                break
+            produced += 1
+            yield np.frombuffer(data[:len(data) - len(data) % 2], np.int16).astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+    if produced == 0 and process.returncode not in (0, -signal.SIGKILL):
+        raise TranscriptionError(f"FFmpeg a échoué avec le code {process.returncode}")
+
+def _iter_soundfile_windows(file_path, window, start_seconds=0.0, blocksize=65536):
+    """Repli de iter_audio_windows sans FFmpeg: blocs soundfile, mixage mono et rééchantillonnage en flux"""
+    info = sf.info(file_path)
+    resampler = PolyphaseResampler(info.samplerate) if info.samplerate != SAMPLE_RATE else None
+    pending, pending_size = [], 0
+    blocks = sf.blocks(file_path, blocksize=blocksize, dtype='float32', always_2d=True,
+                       start=int(start_seconds * info.samplerate))
+    for block in blocks:
+        samples = block.mean(axis=1)
+        if resampler is not None:
+            samples = resampler.process(samples)
+        pending.append(samples.astype(np.float32))
+        pending_size += len(samples)
+        if pending_size >= window:
+            joined = np.concatenate(pending)
+            while len(joined) >= window:
+                yield joined[:window]
+                joined = joined[window:]
+            pending, pending_size = [joined], len(joined)
+    if resampler is not None:
+        pending.append(resampler.flush().astype(np.float32))
+    if pending and sum(len(samples) for samples in pending):
+        yield np.concatenate(pending)
+
+def transcribe_windowed(model, audio_path, options, verbose=None, streamer=None, checkpoint=None, resume=False,
+                        raw_pcm=False, window_seconds=WINDOWED_CHUNK_SECONDS) -> dict:
+    """Transcrit un long enregistrement par morceaux de `window_seconds` lus en flux.
+
+    Seuls le morceau courant et son spectrogramme mel sont en mémoire. Le dernier
+    segment de chaque morceau, peut-être coupé, n'est pas validé: le morceau
+    suivant reprend à son début, avec la fin du texte validé comme prompt.
+    """
+    state = checkpoint.load() if checkpoint is not None and resume else None
+    previous, start, language = [], 0.0, options.get("language")
+    if state:
+        previous, start = state["segments"], float(state.get("position", 0.0))
+        language = state.get("language") or language
+        log_message(f"Reprise à {start:.1f} s: {len(previous)} segment(s) déjà transcrits")
+
+    info = None if raw_pcm else probe_audio(audio_path)
+    total_seconds = (os.path.getsize(audio_path) / 2 / SAMPLE_RATE) if raw_pcm else (info or {}).get("duration")
+    log_message(f"Transcription par morceaux de {window_seconds:.0f} s"
+                + (f" ({total_seconds:.0f} s d'audio)" if total_seconds else ""))
+
+    recorder = CheckpointRecorder(checkpoint, previous, start, streamer, language, hold_last=True)
+    windows = iter_audio_windows(audio_path, window_seconds, start, raw_pcm)
+    try:
+        return _transcribe_windows(model, windows, options, recorder, window_seconds, start,
+                                   total_seconds, verbose, checkpoint)
+    finally:
+        # Arrête FFmpeg si la lecture n'est pas allée au bout (annulation, erreur)
+        windows.close()
+
+def _transcribe_windows(model, windows, options, recorder, window_seconds, start, total_seconds,
+                        verbose=None, checkpoint=None):
+    """Boucle de transcribe_windowed: décode chaque morceau précédé du signal non validé du précédent"""
+    language = recorder.language
+    carry, carry_start = np.zeros(0, dtype=np.float32), start
+    window = next(windows, None)
+    while window is not None:
+        check_cancelled(recorder.segments)
+        following = next(windows, None)
+        final = following is None
+        buffer, buffer_start = np.concatenate([carry, window]), carry_start
+        del carry, window
+
+        run_options = options
+        if options.get("condition_on_previous_text", True) and recorder.segments:
+            prompt = (options.get("initial_prompt") or "") + "".join(s["text"] for s in recorder.segments)
+            run_options = dict(options, initial_prompt=prompt[-CHECKPOINT_PROMPT_CHARS:])
+        if language:
+            run_options = dict(run_options, language=language)
+
+        recorder.start_window(buffer_start)
+        try:
+            with feature_offset(int(round(buffer_start * SAMPLE_RATE))):
+                result = model.transcribe(buffer, run_options, verbose=verbose, streamer=recorder)
+        except JobCancelled as e:
+            recorder.push(e.segments, final=True)
+            if checkpoint is not None:
+                recorder.save()
+            raise JobCancelled(e.reason, recorder.segments)
+        language = recorder.language = result.get("language") or language
+
+        buffer_end = buffer_start + len(buffer) / SAMPLE_RATE
+        recorder.push(result["segments"], final=final)
+        if not final and buffer_end - recorder.position > window_seconds / 2:
+            # Trop de signal non validé (segment très long, fin sans parole): tout valider
+            # et ne reporter qu'une demi-fenêtre au plus, pour borner la mémoire
+            recorder.push(result["segments"], final=True)
+            recorder.position = max(recorder.position, buffer_end - window_seconds / 2)
+
+        carry_start = min(max(recorder.position, buffer_start), buffer_end)
+        carry = buffer[int((carry_start - buffer_start) * SAMPLE_RATE):].copy()
+        del buffer
+        window = following
+        if total_seconds:
+            emit_progress_event({"type": "transcriptionProgress",
+                                 "progress": round(min(carry_start / total_seconds, 1.0), 4),
+                                 "seconds": round(carry_start, 2), "total_seconds": round(total_seconds, 2)})
+
+    return {
+        "text": "".join(segment["text"] for segment in recorder.segments),
+        "segments": recorder.segments,
+        "language": language,
+    }
+
+def transcribe_audio(model_cache, model_name, audio, options, verbose=True, vad=False, parallel=1,
+                     streamer=None, backend_name=None, checkpoint=None, resume=False, windowed=False) -> dict:
+    """Transcrit avec le moteur choisi, avec une pré-détection de la parole si vad=True.
+
+    Avec la VAD, seules les zones parlées (mises bout à bout) sont décodées, puis
+    les horodatages sont replacés sur la chronologie d'origine. Avec parallel > 1,
+    les signaux longs sont découpés et transcrits dans plusieurs processus.
+    Avec un SegmentStreamer, les segments sont émis au fil du décodage. Avec un
+    TranscriptionCheckpoint, le décodage séquentiel enregistre des points de reprise.
+    Avec windowed=True, `audio` est un chemin lu en flux par morceaux (mémoire bornée).
+    """
+    if windowed:
+        if vad or parallel > 1:
+            log_message("Transcription par morceaux: --vad et --parallel ignorés")
+        model = model_cache.get(model_name, backend_name)
+        return transcribe_windowed(model, audio, options, verbose=verbose, streamer=streamer,
+                                   checkpoint=checkpoint, resume=resume, raw_pcm=raw_pcm_to_use is not None)
+
+    if (vad or parallel > 1 or checkpoint is not None) and not isinstance(audio, np.ndarray):
+        audio = read_converted_audio(audio)
+
+    def decode(samples):
+        if parallel > 1 and len(samples) >= PARALLEL_MIN_DURATION * SAMPLE_RATE:
+            result = transcribe_parallel(model_name, samples, options, parallel,
+                                         quantize=model_cache.quantize, model_dir=model_cache.model_dir,
+                                         backend_name=model_cache.backend_for(model_name, backend_name).name)
+        elif checkpoint is not None:
+            model = model_cache.get(model_name, backend_name)
+            result = transcribe_with_checkpoint(model, samples, options, checkpoint, resume=resume,
+                                                verbose=verbose, streamer=streamer)
+        else:
+            model = model_cache.get(model_name, backend_name)
+            result = model.transcribe(samples, options, verbose=verbose, progress=True, streamer=streamer)
+        if streamer is not None:
+            streamer.push(result["segments"])
+        return result
+
+    if vad:
+        regions = detect_speech_regions(audio)
+        speech_samples = sum(end - start for start, end in regions)
+        log_message(f"VAD: {len(regions)} zone(s) de parole, "
+                    f"{speech_samples / SAMPLE_RATE:.1f} s sur {len(audio) / SAMPLE_RATE:.1f} s")
+        if not regions:
+            return {"text": "", "segments": [], "language": options.get("language")}
+        if speech_samples < VAD_MIN_GAIN * len(audio):
+            speech = np.concatenate([audio[start:end] for start, end in regions])
+            if streamer is not None:
+                streamer.to_original = timeline_mapper(regions)
+            try:
+                return remap_timestamps(decode(speech), regions)
+            except JobCancelled as e:
+                e.segments = remap_timestamps({"segments": e.segments}, regions)["segments"]
+                raise
+        log_message("VAD: peu de silence détecté, transcription du fichier complet")
+
+    return decode(audio)
+
+def count_fallbacks(result, options) -> dict:
+    """Compte les fenêtres redécodées à une température plus élevée que la première"""
+    temperatures = options.get("temperature", 0.0)
+    if not isinstance(temperatures, (list, tuple)):
+        temperatures = [temperatures]
+    windows = {}
+    for segment in result.get("segments", []):
+        windows[segment.get("seek", segment.get("id"))] = segment.get("temperature", temperatures[0])
+    extra_decodes = 0
+    for temperature in windows.values():
+        steps = [i for i, t in enumerate(temperatures) if abs(t - temperature) < 1e-6]
+        extra_decodes += steps[0] if steps else 0
+    return {
+        "windows": len(windows),
+        "fallback_windows": sum(1 for t in windows.values() if t > temperatures[0] + 1e-6),
+        "extra_decodes": extra_decodes,
+    }
+
+def run_job(audio_file, model_cache, model_name="medium", with_srt=False,
+            decode_options=None, verbose=True, check_silence=False, vad=False, parallel=1,
+            result_cache=None, decoding_profile=DEFAULT_DECODING_PROFILE, stream=False,
+            backend=None, checkpoint_dir=None, resume=False, windowed=None, language=None,
+            fallback_language=DEFAULT_FALLBACK_LANGUAGE,
+            language_threshold=LANGUAGE_CONFIDENCE_THRESHOLD, output_formats=None, output_dir=None,
+            feature_cache=None) -> dict:
+    """Exécute un job de transcription complet et retourne {"text", "language", "srt"?, "files"?}.
+
+    `backend` choisit le moteur d'inférence (défaut: celui du cache de modèles).
+    Avec `checkpoint_dir`, des points de reprise sont écrits pendant le décodage
+    et `resume` reprend depuis le dernier; ils sont supprimés en cas de succès.
+    Si le job est annulé ou dépasse son échéance (current_cancel), le résultat
+    contient les segments déjà décodés et "partial": True. windowed=True lit et
+    transcrit le fichier par morceaux à mémoire constante; None le choisit pour
+    les enregistrements de plus de WINDOWED_MIN_DURATION secondes. language="auto"
+    détecte la langue une fois sur la première fenêtre parlée (`fallback_language`
+    sous le seuil de confiance `language_threshold`). Chaque format de
+    `output_formats` (voir OUTPUT_WRITERS) est écrit dans `output_dir` pendant
+    l'unique passe de décodage. Avec `feature_cache` (FeatureCache), les
+    sorties de l'encodeur d'un fichier déjà décodé sont relues au lieu d'être recalculées.
+    """
+    # Normaliser le chemin du fichier
+    audio_path = os.path.abspath(os.path.normpath(audio_file))
+    log_message(f"Chemin absolu normalisé reçu: {audio_path}")
+
+    outputs = None
+    try:
+        if windowed is None:
+            info = probe_audio(audio_path) if os.path.isfile(audio_path) else None
+            windowed = (info is not None and info["duration"] >= WINDOWED_MIN_DURATION
+                        and not vad and parallel <= 1)
+            if windowed:
+                log_message(f"Enregistrement de {info['duration']:.0f} s: transcription par morceaux lus en flux")
+        # En mode par morceaux, le fichier n'est jamais décodé en entier (l'empreinte porte sur ses octets)
+        audio = prepare_audio(audio_path, check_silence=check_silence, decode=not windowed)
+        if isinstance(output_formats, str):
+            output_formats = [output_formats]
+        output_formats = list(OUTPUT_WRITERS) if "all" in (output_formats or []) else list(output_formats or [])
+        options = build_transcribe_options(decode_options, profile=decoding_profile, language=language,
+                                           word_timestamps="words" in output_formats)
+
+        if output_formats:
+            outputs = OutputFiles(output_formats, output_dir or ".",
+                                  os.path.splitext(os.path.basename(audio_path))[0])
+        streamer = SegmentStreamer(emit=stream, writers=outputs.writers if outputs else ()) \
+            if stream or outputs else None
+        result = None
+        fingerprint = None
+        if feature_cache is not None:
+            fingerprint = audio_fingerprint(audio)
+        if result_cache is not None or checkpoint_dir:
+            # --parallel ne change pas le résultat attendu, seul vad modifie le signal décodé.
+            # Avec language="auto", la clé précède la détection: une reprise retrouve son point de reprise
+            fingerprint = fingerprint or audio_fingerprint(audio)
+            cache_key = ResultCache.make_key(fingerprint, model_cache.variant(model_name, backend),
+                                             {**options, "vad": vad, "windowed": bool(windowed),
+                                              "feature_cache": feature_cache is not None})
+        if result_cache is not None:
+            result = result_cache.get(cache_key)
+        checkpoint = None
+        if resume and not checkpoint_dir:
+            log_message("--resume ignoré: points de reprise désactivés (--checkpoint-dir)")
+        if checkpoint_dir:
+            if parallel > 1 and not windowed:
+                log_message("Points de reprise désactivés avec --parallel")
+            else:
+                checkpoint = TranscriptionCheckpoint(checkpoint_dir, cache_key)
+
+        # Transcrire l'audio
+        stop_reason = None
+        try:
+            if result is None:
+                check_cancelled()
+                options = resolve_language(lambda: model_cache.get(model_name, backend), audio, options,
+                                           model_cache.variant(model_name, backend), fingerprint=fingerprint, result_cache=result_cache,
+                                           checkpoint=checkpoint, resume=resume, fallback=fallback_language,
+                                           threshold=language_threshold, raw_pcm=raw_pcm_to_use is not None)
+                log_message("Début de la transcription...")
+                with Stage("transcribe", model=model_cache.variant(model_name, backend),
+                           profile=decoding_profile) as stage:
+                    if isinstance(audio, np.ndarray):
+                        stage.fields["audio_seconds"] = len(audio) / SAMPLE_RATE
+                    with feature_cache_scope(feature_cache, fingerprint, model_cache.variant(model_name, backend)):
+                        result = transcribe_audio(model_cache, model_name, audio, options,
+                                                  verbose=verbose, vad=vad, parallel=parallel, streamer=streamer,
+                                                  backend_name=backend, checkpoint=checkpoint, resume=resume,
+                                                  windowed=windowed)
+                log_message("Transcription terminée avec succès")
+                if result_cache is not None:
+                    result_cache.put(cache_key, result)
+            elif streamer is not None:
+                streamer.push(result["segments"])
+        except JobCancelled as e:
+            # Arrêt demandé: rendre ce qui a déjà été décodé (jamais mis en cache)
+            stop_reason = e.reason
+            log_message(f"Transcription interrompue ({e.reason}): {len(e.segments)} segment(s) déjà décodés")
+            result = {"text": "".join(segment["text"] for segment in e.segments), "segments": e.segments,
+                      "language": options["language"] if options.get("language") != "auto" else None}
+            if streamer is not None:
+                # Segments déjà replacés sur la chronologie d'origine: ne transmettre que les derniers
+                streamer.to_original = None
+                streamer.push(e.segments)
+        except TranscriptionError:
+            raise
+        except Exception as e:
+            log_message(f"Erreur pendant la transcription: {e}")
+            traceback.print_exc(file=sys.stderr)
+            raise TranscriptionError(f"Erreur pendant la transcription: {e}")
+        if checkpoint is not None and stop_reason is None:
+            # Job abouti (ou relu du cache): son point de reprise ne servira plus
+            checkpoint.remove()
+        if outputs is not None:
+            outputs.finish(result)
+    finally:
+        # Nettoyer les fichiers temporaires (et les sorties d'un job en échec)
+        if outputs is not None:
+            outputs.close()
+        cleanup_temp_files(audio_path)
+
+    # Vérifier si le texte transcrit est vide
+    if not result["text"].strip():
+        log_message("ATTENTION: Aucun texte détecté dans l'audio")
+        # Remplacer par un message explicite
+        result["text"] = "[Aucune parole détectée dans l'enregistrement]"
+    else:
+        log_message(f"Texte transcrit (premiers 100 caractères): {result['text'][:100]}...")
+
+    output = {"text": result["text"], "language": result.get("language")}
+    if stop_reason is not None:
+        output["partial"] = True
+        output["stop_reason"] = stop_reason
+    if outputs is not None and outputs.paths:
+        output["files"] = outputs.paths
+    decoding = {"profile": decoding_profile, **count_fallbacks(result, options)}
+    log_message(f"Décodage '{decoding_profile}': {decoding['fallback_windows']}/{decoding['windows']} "
+                f"fenêtre(s) relancée(s), {decoding['extra_decodes']} décodage(s) supplémentaire(s)")
+    output["decoding"] = decoding
+
+    # Générer les sous-titres SRT si demandé
+    if with_srt and "segments" in result:
+        log_message("Génération des sous-titres SRT...")
+        with Stage("srt", segments=len(result["segments"])):
+            output["srt"] = generate_srt(result["segments"])
+        log_message("Sous-titres SRT générés")
+    return output
+
+def load_audio_array(file_path):
+    """Décode un fichier en float32 16 kHz mono sans passer par l'état global de prepare_audio.
+
+    Utilisable depuis plusieurs threads (préchargement du mode --batch). Lève
+    TranscriptionError si le fichier est absent, vide ou indécodable.
+    """
+    if not os.path.isfile(file_path):
+        raise TranscriptionError(f"Fichier non trouvé: {file_path}")
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        raise TranscriptionError("Le fichier audio est vide")
+
+    if not file_path.lower().endswith(COMPRESSED_EXTENSIONS):
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+        if (header[:4] != b'RIFF' or header[8:12] != b'WAVE') and file_size > 1000:
+            return load_raw_pcm(file_path)
+
+    try:
+        return decode_audio(file_path)
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError) as e:
+        try:
+            data, samplerate = sf.read(file_path, dtype='float32', always_2d=True)
+        except Exception:
+            raise TranscriptionError(f"Impossible de décoder le fichier audio: {e}")
+        if len(data) == 0:
+            raise TranscriptionError("Le fichier audio ne contient pas de données")
+        return resample_audio(data.mean(axis=1), samplerate)
+
+def read_batch_items(source):
+    """Liste des fichiers d'un lot: [{"id", "audio_file", ...}].
+
+    `source` est un dossier (parcouru récursivement, fichiers audio triés) ou un
+    manifeste JSONL dont chaque ligne contient au moins "audio_file"; les chemins
+    relatifs sont résolus depuis le dossier du manifeste.
+    """
+    if os.path.isdir(source):
+        items = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(BATCH_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    items.append({"id": os.path.relpath(path, source), "audio_file": path})
+        return items
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    items = []
+    with open(source, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                item = {"error": f"Ligne {number} du manifeste invalide: {e}"}
+            if not isinstance(item, dict) or not (item.get("audio_file") or item.get("error")):
+                item = {"error": f"Ligne {number} du manifeste sans champ 'audio_file'"}
+            if "audio_file" in item:
+                item["audio_file"] = os.path.join(base_dir, item["audio_file"])
+            item.setdefault("id", item.get("audio_file", f"ligne-{number}"))
+            items.append(item)
+    return items
+
+def _timestamped_segments(tokenizer, tokens, duration):
+    """Découpe les jetons d'une fenêtre décodée avec horodatages en (début, fin, jetons de texte)"""
+    pieces, text_tokens, start = [], [], 0.0
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            time_s = (token - tokenizer.timestamp_begin) * 0.02
+            if text_tokens:
+                pieces.append((start, min(time_s, duration), text_tokens))
+                text_tokens = []
+            start = time_s
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        pieces.append((min(start, duration), duration, text_tokens))
+    return pieces
+
+def decode_window_batch(model, clips, options, language_threshold=LANGUAGE_CONFIDENCE_THRESHOLD):
+    """Décode des extraits de 30 s au plus en un seul lot: une passe de l'encodeur pour tous.
+
+    Retourne une liste alignée sur `clips` de résultats au schéma commun, ou None
+    pour les extraits à repasser par model.transcribe (relance à une température
+    plus élevée demandée par les seuils de compression ou de log-probabilité).
+    Avec language="auto", la langue de chaque extrait est détectée sur la même
+    passe de l'encodeur; une détection sous `language_threshold` donne aussi None.
+    """
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    temperatures = options.get("temperature", 0.0)
+    if isinstance(temperatures, (list, tuple)):
+        temperatures = temperatures[0]
+    auto_language = options.get("language") == "auto"
+    if auto_language:
+        options = apply_language(options, None)
+    decode_options = {
+        "task": options.get("task", "transcribe"),
+        "language": options.get("language"),
+        "temperature": temperatures,
+        "prompt": options.get("initial_prompt"),
+        "without_timestamps": False,
+        "fp16": False,
+    }
+    if temperatures > 0:
+        decode_options["best_of"] = options.get("best_of")
+    else:
+        decode_options["beam_size"] = options.get("beam_size")
+
+    mel = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(clip)), model.dims.n_mels)
+        for clip in clips
+    ])
+    results = whisper.decode(model, mel, whisper.DecodingOptions(**decode_options))
+
+    # Seuils et comparaisons de whisper.transcribe (mêmes valeurs par défaut), pour
+    # qu'un extrait soit relancé ou sauté exactement comme en mode fichier par fichier
+    compression_threshold = options.get("compression_ratio_threshold", 2.4)
+    logprob_threshold = options.get("logprob_threshold", -1.0)
+    no_speech_threshold = options.get("no_speech_threshold", 0.6)
+    outputs = []
+    for clip, decoded in zip(clips, results):
+        if auto_language and (decoded.language_probs or {}).get(decoded.language, 0.0) < language_threshold:
+            outputs.append(None)
+            continue
+        # decode_with_fallback: relance, sauf si la fenêtre est du silence
+        needs_fallback = ((compression_threshold is not None and decoded.compression_ratio > compression_threshold)
+                          or (logprob_threshold is not None and decoded.avg_logprob < logprob_threshold))
+        if (no_speech_threshold is not None and decoded.no_speech_prob > no_speech_threshold
+                and logprob_threshold is not None and decoded.avg_logprob < logprob_threshold):
+            needs_fallback = False
+        if needs_fallback:
+            outputs.append(None)
+            continue
+        # Fenêtre sautée: seule une log-probabilité strictement au-dessus du seuil la garde
+        silent = (no_speech_threshold is not None and decoded.no_speech_prob > no_speech_threshold
+                  and not (logprob_threshold is not None and decoded.avg_logprob > logprob_threshold))
+
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                  language=decoded.language, task=decode_options["task"])
+        segments = []
+        if not silent:
+            for start, end, text_tokens in _timestamped_segments(tokenizer, decoded.tokens,
+                                                                 len(clip) / SAMPLE_RATE):
+                segments.append({
+                    "id": len(segments), "seek": 0, "start": start, "end": end,
+                    "text": tokenizer.decode(text_tokens), "tokens": text_tokens,
+                    "temperature": decoded.temperature, "avg_logprob": decoded.avg_logprob,
+                    "compression_ratio": decoded.compression_ratio, "no_speech_prob": decoded.no_speech_prob,
+                })
+        outputs.append({
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": decoded.language,
+        })
+    return outputs
+
+def run_batch(source, output_path, model_cache, model_name="medium", with_srt=False,
+              decoding_profile=DEFAULT_DECODING_PROFILE, backend=None,
+              batch_size=BATCH_SIZE, prefetch=BATCH_PREFETCH, language=None,
+              fallback_language=DEFAULT_FALLBACK_LANGUAGE, language_threshold=LANGUAGE_CONFIDENCE_THRESHOLD) -> dict:
+    """Mode --batch: transcrit tous les fichiers d'un dossier ou d'un manifeste avec un seul modèle.
+
+    Les fichiers sont décodés à l'avance dans `prefetch` threads; les extraits de
+    30 s au plus sont regroupés par `batch_size` pour passer ensemble dans
+    l'encodeur (openai-whisper). Chaque résultat est ajouté au fichier JSONL
+    `output_path` dès qu'il est prêt; l'échec d'un fichier n'interrompt pas le lot.
+    Une annulation ou une échéance (current_cancel) arrête le lot entre deux fichiers.
+    Avec language="auto", chaque fichier a sa propre langue.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    items = read_batch_items(source)
+    options = build_transcribe_options(profile=decoding_profile, language=language)
+    model = model_cache.get(model_name, backend)
+    # Le décodage groupé contourne model.transcribe: réservé à openai-whisper sans horodatage par mot
+    pack = (model.backend.name == OpenAIWhisperBackend.name and batch_size > 1
+            and not options.get("word_timestamps"))
+    variant = model_cache.variant(model_name, backend)
+    log_message(f"Lot de {len(items)} fichier(s), modèle '{variant}', "
+                f"{prefetch} thread(s) de décodage, lots de {batch_size if pack else 1} fenêtre(s)")
+
+    stats = {"files": len(items), "ok": 0, "errors": 0}
+    started = time.time()
+
+    with open(output_path, "w", encoding="utf-8") as output, \
+            ThreadPoolExecutor(max_workers=prefetch) as pool:
+
+        def write(item, result=None, error=None, audio_seconds=None, stop_reason=None):
+            record = {"id": item["id"], "audio_file": item.get("audio_file")}
+            if error is not None:
+                stats["errors"] += 1
+                record["error"] = str(error)
+                log_message(f"Échec de {item['id']}: {error}")
+            else:
+                stats["ok"] += 1
+                record.update(text=result["text"], language=result.get("language"),
+                              audio_seconds=audio_seconds,
+                              decoding={"profile": decoding_profile, **count_fallbacks(result, options)})
+                if with_srt or item.get("generate_srt"):
+                    record["srt"] = generate_srt(result["segments"])
+                if stop_reason is not None:
+                    record.update(partial=True, stop_reason=stop_reason)
+            output.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+            output.flush()
+            done = stats["ok"] + stats["errors"]
+            emit_progress_event({"type": "transcriptionProgress", "progress": round(done / max(len(items), 1), 4),
+                                 "files": done, "total_files": len(items), "errors": stats["errors"]})
+
+        def transcribe_one(item, audio):
+            try:
+                file_options = resolve_language(lambda: model, audio, options, variant, fallback=fallback_language,
+                                                threshold=language_threshold)
+                write(item, model.transcribe(audio, file_options), audio_seconds=len(audio) / SAMPLE_RATE)
+            except JobCancelled as e:
+                write(item, {"text": "".join(segment["text"] for segment in e.segments), "segments": e.segments},
+                      audio_seconds=len(audio) / SAMPLE_RATE, stop_reason=e.reason)
+            except Exception as e:
+                write(item, error=e)
+
+        def flush(pending):
+            if not pending:
+                return
+            try:
+                results = decode_window_batch(model.model, [audio for _, audio in pending], options,
+                                              language_threshold)
+            except Exception as e:
+                log_message(f"Décodage groupé impossible ({e}), décodage fichier par fichier")
+                results = [None] * len(pending)
+            for (item, audio), result in zip(pending, results):
+                if result is None:
+                    transcribe_one(item, audio)
+                else:
+                    write(item, result, audio_seconds=len(audio) / SAMPLE_RATE)
+            pending.clear()
+
+        # File bornée de décodages en cours: la mémoire ne dépend pas de la taille du lot
+        futures = deque()
+        queue = iter(items)
+        pending = []
+
+        def submit_next():
+            for item in queue:
+                if "error" in item:
+                    write(item, error=item["error"])
+                    continue
+                futures.append((item, pool.submit(load_audio_array, item["audio_file"])))
+                return
+
+        for _ in range(max(prefetch, batch_size) * 2):
+            submit_next()
+        while futures:
+            if current_cancel is not None and current_cancel.stop_reason():
+                # Arrêt entre deux fichiers: les fichiers non traités sont absents de la sortie
+                stats["stop_reason"] = current_cancel.reason
+                for _, future in futures:
+                    future.cancel()
+                futures.clear()
+                pending.clear()
+                break
+            item, future = futures.popleft()
+            submit_next()
+            try:
+                audio = future.result()
+            except Exception as e:
+                write(item, error=e)
+                continue
+            if pack and len(audio) <= WINDOW_SECONDS * SAMPLE_RATE:
+                pending.append((item, audio))
+                if len(pending) >= batch_size:
+                    flush(pending)
+            else:
+                transcribe_one(item, audio)
+        flush(pending)
+
+    stats["duration"] = round(time.time() - started, 3)
+    stats["output"] = output_path
+    if "stop_reason" in stats:
+        stats["partial"] = True
+        stats["skipped"] = stats["files"] - stats["ok"] - stats["errors"]
+        log_message(f"Lot interrompu ({stats['stop_reason']}): {stats['skipped']} fichier(s) non traité(s)")
+    log_message(f"Lot terminé: {stats['ok']} réussi(s), {stats['errors']} échec(s) en {stats['duration']} s")
+    return stats
+
+class RingBuffer:
+    """Tampon circulaire borné d'échantillons float32, indexé en temps absolu"""
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.total = 0  # nombre d'échantillons reçus depuis le début
+        self.lock = threading.Lock()
+
+    def write(self, samples):
+        with self.lock:
+            samples = samples[-self.capacity:]
+            start = self.total % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self.data[start:start + first] = samples[:first]
+            self.data[:len(samples) - first] = samples[first:]
+            self.total += len(samples)
+
+    def read_from(self, position):
+        """Retourne (début effectif, échantillons) depuis l'échantillon absolu `position`"""
+        with self.lock:
+            position = max(position, self.total - self.capacity, 0)
+            count = self.total - position
+            start = position % self.capacity
+            indices = (start + np.arange(count)) % self.capacity
+            return position, self.data[indices]
+
+def _normalize_word(word):
+    return "".join(c for c in word.lower() if c.isalnum())
+
+class LiveTranscriber:
+    """Transcription en direct avec politique d'accord local (local agreement).
+
+    À chaque pas, seule la fenêtre audio suivant le dernier mot validé est
+    redécodée. Les mots communs au début de deux hypothèses consécutives sont
+    validés (événement "final"), le reste est émis comme "partial".
+    """
+    def __init__(self, model, options, buffer_seconds=LIVE_BUFFER_SECONDS, max_window=LIVE_MAX_WINDOW):
+        self.model = model
+        self.options = dict(options, word_timestamps=True, condition_on_previous_text=False)
+        self.base_prompt = options.get("initial_prompt") or ""
+        self.buffer = RingBuffer(int(buffer_seconds * SAMPLE_RATE))
+        self.max_window = max_window
+        self.committed_until = 0  # échantillon absolu du dernier mot validé
+        self.committed_text = ""
+        self.previous = []  # hypothèse précédente: [(mot, début, fin)]
+        self.decoded_until = 0
+
+    def feed(self, samples):
+        self.buffer.write(samples)
+
+    def _hypothesis(self):
+        start, window = self.buffer.read_from(self.committed_until)
+        self.decoded_until = start + len(window)
+        if len(window) == 0 or np.max(np.abs(window)) < SILENCE_THRESHOLD:
+            return start, []
+        prompt = (self.base_prompt + self.committed_text)[-LIVE_PROMPT_CHARS:]
+        result = self.model.transcribe(window, dict(self.options, initial_prompt=prompt or None))
+        offset = start / SAMPLE_RATE
+        words = []
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []) or []:
+                words.append((word["word"], offset + word["start"], offset + word["end"]))
+        return start, words
+
+    def _commit(self, words, snapshot_time):
+        if not words:
+            return
+        text = "".join(word for word, _, _ in words)
+        self.committed_text += text
+        self.committed_until = max(self.committed_until, int(words[-1][2] * SAMPLE_RATE))
+        emit_event({"type": "final", "text": text.strip(), "start": words[0][1], "end": words[-1][2],
+                    "latency": round(time.time() - snapshot_time, 3)})
+
+    def step(self):
+        """Redécode la fenêtre courante et émet les événements partial/final"""
+        snapshot_time = time.time()
+        start, current = self._hypothesis()
+
+        agreed = 0
+        while (agreed < min(len(current), len(self.previous))
+               and _normalize_word(current[agreed][0]) == _normalize_word(self.previous[agreed][0])):
+            agreed += 1
+        self._commit(current[:agreed], snapshot_time)
+        pending = current[agreed:]
+
+        # Fenêtre trop longue sans accord: valider tout sauf le dernier mot
+        if pending and (self.decoded_until - start) / SAMPLE_RATE > self.max_window:
+            self._commit(pending[:-1], snapshot_time)
+            pending = pending[-1:]
+        self.previous = pending
+
+        if pending:
+            emit_event({"type": "partial", "text": "".join(word for word, _, _ in pending).strip(),
+                        "start": pending[0][1], "end": pending[-1][2],
+                        "latency": round(time.time() - snapshot_time, 3)})
+
+    def finish(self):
+        """Fin du flux: valide la dernière hypothèse complète"""
+        snapshot_time = time.time()
+        _, current = self._hypothesis()
+        self._commit(current, snapshot_time)
+        self.previous = []
+
+def run_live(model, options, step_seconds=LIVE_STEP):
+    """Mode --live: lit du PCM s16le 16 kHz mono sur stdin et émet des événements JSON"""
+    transcriber = LiveTranscriber(model, options)
+    finished = threading.Event()
+
+    def reader():
+        pending = b""
+        while True:
+            chunk = sys.stdin.buffer.read1(SAMPLE_RATE // 5) if hasattr(sys.stdin.buffer, "read1") \
+                else sys.stdin.buffer.read(SAMPLE_RATE // 5)
+            if not chunk:
+                break
+            pending += chunk
+            usable = len(pending) - len(pending) % 2
+            transcriber.feed(np.frombuffer(pending[:usable], dtype='<i2').astype(np.float32) / 32768.0)
+            pending = pending[usable:]
+        finished.set()
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    emit_event({"type": "ready"})
+    log_message("Mode live démarré, en attente de PCM 16 kHz mono sur stdin...")
+
+    while not finished.wait(step_seconds) and not _shutdown_requested.is_set():
+        if transcriber.buffer.total > transcriber.decoded_until:
+            transcriber.step()
+    transcriber.finish()
+    emit_event({"type": "end", "text": transcriber.committed_text.strip()})
+
+@contextlib.contextmanager
+def job_profiler(profile_dir, job_name, torch_trace=False):
+    """Profile un job avec cProfile (et le profileur torch si demandé).
+
+    Écrit <job_name>-<horodatage>.prof (et .trace.json, format Chrome) dans profile_dir.
+    Sans profile_dir, ne fait rien.
+    """
+    if not profile_dir:
+        yield
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+    base_path = os.path.join(profile_dir, f"{job_name}-{int(time.time() * 1000)}")
+    with contextlib.ExitStack() as stack:
+        torch_profiler = None
+        if torch_trace:
+            import torch
+            torch_profiler = stack.enter_context(
+                torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU]))
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(base_path + ".prof")
+            log_message(f"Profil cProfile écrit: {base_path}.prof")
+    if torch_profiler is not None:
+        torch_profiler.export_chrome_trace(base_path + ".trace.json")
+        log_message(f"Trace torch écrite: {base_path}.trace.json")
+
+def _job_audio_seconds(job):
+    """Durée de l'audio d'un job lue dans l'en-tête du fichier, None si inconnue"""
+    path = job.get("audio_file")
+    if not isinstance(path, str) or not os.path.isfile(path):
+        return None
+    try:
+        info = probe_audio(path)
+    except Exception:
+        return None
+    return info["duration"] if info else None
+
+def _duration_summary(values):
+    """Moyenne, médiane, 95e centile et maximum d'une liste de durées (secondes)"""
+    if not values:
+        return None
+    return {"avg": round(float(np.mean(values)), 3), "p50": round(float(np.percentile(values, 50)), 3),
+            "p95": round(float(np.percentile(values, 95)), 3), "max": round(float(max(values)), 3)}
+
+class JobScheduler:
+    """File d'attente à priorités du mode worker, bornée, et métriques des jobs.
+
+    Les jobs partent dans l'ordre (priorité, durée d'audio, arrivée): un court
+    extrait du direct ("live": true ou "priority" plus petit) passe devant un long
+    fichier. Au-delà de `max_queue` jobs en attente, un job est refusé avec une
+    estimation de l'attente, tirée du facteur temps réel des jobs terminés. La
+    durée de l'audio (`probe`, ffprobe) est lue par un thread à part: la lecture
+    des requêtes et des annulations n'attend jamais ffprobe. Chaque job lancé
+    reçoit son CancelToken ("cancel") dès sa sortie de la file.
+    """
+    def __init__(self, concurrency=1, max_queue=SERVE_MAX_QUEUE, probe=None):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.condition = threading.Condition()
+        self.pending = []  # tas de (priorité, secondes d'audio, numéro d'arrivée, entrée)
+        self.running = {}  # numéro d'arrivée -> entrée
+        self.cancelled = {}  # id annulé avant réception -> expiration (time.monotonic), par ordre d'arrivée
+        self.closed = False
+        self.rtf = DEFAULT_RTF_ESTIMATE
+        self.counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "cancelled": 0}
+        self.history = deque(maxlen=JOB_METRICS_HISTORY)
+        self._sequence = 0
+        self._probe = probe or _job_audio_seconds
+        self._unprobed = deque()  # entrées dont la durée d'audio reste à lire
+        threading.Thread(target=self._probe_jobs, name="job-probe", daemon=True).start()
+        # Fonction (id, raison) qui transmet l'arrêt d'un job en cours à son exécuteur
+        self.cancel_running = None
+
+    def _probe_jobs(self):
+        """Thread de lecture des durées d'audio: replace chaque job lu dans la file à priorités"""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self._unprobed or self.closed)
+                if not self._unprobed:
+                    return
+                entry = self._unprobed.popleft()
+            seconds = self._probe(entry["job"])
+            with self.condition:
+                entry["audio_seconds"] = seconds
+                for index, (priority, _, sequence, item) in enumerate(self.pending):
+                    if item is entry:
+                        self.pending[index] = (priority, seconds if seconds is not None else UNKNOWN_AUDIO_SECONDS,
+                                               sequence, entry)
+                        heapq.heapify(self.pending)
+                        break
+                self.condition.notify_all()
+
+    def _expire_cancelled(self):
+        """Oublie les annulations anticipées expirées, et les plus anciennes au-delà de EARLY_CANCEL_MAX"""
+        now = time.monotonic()
+        while self.cancelled:
+            job_id, expiry = next(iter(self.cancelled.items()))
+            if expiry > now and len(self.cancelled) <= EARLY_CANCEL_MAX:
+                break
+            del self.cancelled[job_id]
+
+    def _estimate(self, entry) -> float:
+        """Durée d'exécution estimée d'un job (secondes)"""
+        return (entry["audio_seconds"] or UNKNOWN_AUDIO_SECONDS) * self.rtf
+
+    def estimated_wait(self) -> float:
+        """Attente estimée d'un nouveau job: travail en file et reste des jobs en cours, par emplacement"""
+        with self.condition:
+            now = time.time()
+            work = sum(self._estimate(entry) for *_, entry in self.pending)
+            work += sum(max(self._estimate(entry) - (now - entry["started"]), 0.0)
+                        for entry in self.running.values())
+            return work / self.concurrency
+
+    def submit(self, job) -> dict:
+        """Met un job en file et retourne l'événement à émettre: queued, ou error si refusé"""
+        job_id = job.get("id")
+        try:
+            priority = float(job.get("priority", JOB_PRIORITY_LIVE if job.get("live") else JOB_PRIORITY_DEFAULT))
+        except (TypeError, ValueError):
+            return {"type": "error", "id": job_id, "error": f"Priorité invalide: {job.get('priority')}"}
+        with self.condition:
+            self._expire_cancelled()
+            if self.cancelled.pop(job_id, None) is not None:
+                self.counts["cancelled"] += 1
+                return {"type": "error", "id": job_id, "error": "Job annulé avant son démarrage", "cancelled": True}
+            wait = self.estimated_wait()
+            if len(self.pending) >= self.max_queue:
+                self.counts["rejected"] += 1
+                log_message(f"Job {job_id} refusé: {len(self.pending)} job(s) en attente, attente estimée {wait:.0f} s")
+                return {"type": "error", "id": job_id, "error": f"File d'attente pleine ({len(self.pending)} jobs)",
+                        "rejected": True, "estimated_wait_s": round(wait, 1)}
+            self._sequence += 1
+            entry = {"job": job, "id": job_id, "seq": self._sequence, "audio_seconds": None,
+                     "queued": time.time(), "started": None, "cancel": None}
+            heapq.heappush(self.pending, (priority, UNKNOWN_AUDIO_SECONDS, self._sequence, entry))
+            self._unprobed.append(entry)
+            self.counts["submitted"] += 1
+            self.condition.notify_all()
+            return {"type": "queued", "id": job_id, "queue_depth": len(self.pending),
+                    "estimated_wait_s": round(wait, 1)}
+
+    def cancel(self, job_id, reason="cancelled"):
+        """Retire un job en attente (retourne son événement d'erreur) ou arrête un job en cours"""
+        with self.condition:
+            self._unprobed = deque(entry for entry in self._unprobed if entry["id"] != job_id)
+            for index, (*_, entry) in enumerate(self.pending):
+                if entry["id"] == job_id:
+                    self.pending.pop(index)
+                    heapq.heapify(self.pending)
+                    self.counts["cancelled"] += 1
+                    log_message(f"Annulation du job {job_id} avant son démarrage")
+                    return {"type": "error", "id": job_id, "error": "Job annulé avant son démarrage",
+                            "cancelled": True}
+            running = [entry for entry in self.running.values() if entry["id"] == job_id]
+            for entry in running:
+                # Vu par l'exécuteur même s'il n'a pas encore démarré le job
+                entry["cancel"].cancel(reason)
+            finished = any(record["id"] == job_id for record in self.history)
+            if not running and not finished and job_id is not None:
+                # Job pas encore reçu: il sera refusé s'il arrive dans les EARLY_CANCEL_SECONDS
+                self.cancelled.pop(job_id, None)
+                self.cancelled[job_id] = time.monotonic() + EARLY_CANCEL_SECONDS
+                self._expire_cancelled()
+        if running:
+            log_message(f"Annulation du job en cours {job_id}")
+            if self.cancel_running is not None:
+                self.cancel_running(job_id, reason)
+        return None
+
+    def cancel_all(self, reason):
+        """Arrête tous les jobs en cours (arrêt du worker)"""
+        with self.condition:
+            for entry in self.running.values():
+                entry["cancel"].cancel(reason)
+            job_ids = [entry["id"] for entry in self.running.values()]
+        if self.cancel_running is not None:
+            for job_id in job_ids:
+                self.cancel_running(job_id, reason)
+
+    def next_job(self, timeout=0.5):
+        """Prochain job à lancer dès qu'un emplacement est libre, None après `timeout` secondes"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.pending and len(self.running) < self.concurrency,
+                                           timeout):
+                return None
+            *_, entry = heapq.heappop(self.pending)
+            entry["started"] = time.time()
+            entry["cancel"] = CancelToken()
+            self.running[entry["seq"]] = entry
+            return entry
+
+    def finish(self, entry, event) -> dict:
+        """Enregistre la fin d'un job; retourne son événement final complété de wait_s et run_s"""
+        wait_s, run_s = entry["started"] - entry["queued"], time.time() - entry["started"]
+        with self.condition:
+            self.running.pop(entry["seq"], None)
+            ok = event.get("type") == "result"
+            self.counts["completed" if ok else "failed"] += 1
+            if ok and entry["audio_seconds"] and not event.get("partial"):
+                # Moyenne glissante du facteur temps réel, pour estimer les attentes
+                self.rtf = 0.8 * self.rtf + 0.2 * run_s / entry["audio_seconds"]
+            self.history.append({"id": entry["id"], "status": event.get("type"), "wait_s": round(wait_s, 3),
+                                 "run_s": round(run_s, 3), "audio_seconds": entry["audio_seconds"]})
+            self.condition.notify_all()
+        return {**event, "wait_s": round(wait_s, 3), "run_s": round(run_s, 3)}
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def drained(self) -> bool:
+        """Entrée fermée et plus aucun job en attente ni en cours"""
+        with self.condition:
+            return self.closed and not self.pending and not self.running
+
+    def metrics(self) -> dict:
+        with self.condition:
+            return {
+                "type": "metrics",
+                "queue_depth": len(self.pending),
+                "running": len(self.running),
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                **self.counts,
+                "rtf_estimate": round(self.rtf, 3),
+                "estimated_wait_s": round(self.estimated_wait(), 1),
+                "wait_s": _duration_summary([record["wait_s"] for record in self.history]),
+                "run_s": _duration_summary([record["run_s"] for record in self.history]),
+                "recent": list(self.history)[-10:],
+            }
+
+def _read_serve_requests(scheduler):
+    """Thread de lecture du mode worker: met les jobs en file et répond aussitôt aux
+    annulations et aux demandes de métriques.
+
+    Une annulation {"type": "cancel", "id"} arrête le job en cours à la fin de sa
+    fenêtre de décodage, ou retire un job encore en file.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            log_message(f"Requête JSON invalide: {e}")
+            emit_event({"type": "error", "id": None, "error": f"Requête JSON invalide: {e}"})
+            continue
+        if not isinstance(request, dict):
+            emit_event({"type": "error", "id": None, "error": "La requête doit être un objet JSON"})
+            continue
+
+        if request.get("type") == "cancel":
+            event = scheduler.cancel(request.get("id"))
+            if event is not None:
+                emit_event(event)
+        elif request.get("type") == "metrics":
+            emit_event(scheduler.metrics())
+        else:
+            emit_event(scheduler.submit(request))
+    scheduler.close()
+
+def _execute_job(job, model_cache, defaults, result_cache=None, feature_cache=None, stop_flag=None,
+                 cancel=None) -> dict:
+    """Exécute un job du mode worker et retourne son événement final (result ou error).
+
+    Les événements intermédiaires (progression, segments) sont émis pendant le
+    job. `cancel` est le CancelToken donné au job par le planificateur; `stop_flag`
+    transmet ses demandes d'arrêt à un processus d'exécution (voir CancelToken).
+    """
+    global current_job_id, current_cancel
+    job_id = job.get("id")
+    try:
+        deadline = job.get("deadline", defaults["deadline"])
+        deadline = float(deadline) if deadline is not None else None
+    except (TypeError, ValueError):
+        return {"type": "error", "id": job_id, "error": f"Échéance invalide: {job.get('deadline')}"}
+    token = CancelToken(deadline=deadline, shared=stop_flag)
+    if cancel is not None:
+        # Même objet que celui du planificateur: une annulation arrivée avant ce point n'est pas perdue
+        cancel.deadline, cancel.shared = token.deadline, stop_flag
+        token = cancel
+    with _job_lock:
+        current_job_id = job_id
+        current_cancel = token
+    started = time.time()
+    log_message(f"==== Job {job_id} reçu: {job} ====")
+    try:
+        model_name = job.get("model", defaults["model"])
+        if model_name not in MODEL_NAMES:
+            raise TranscriptionError(f"Modèle inconnu: {model_name}")
+        backend = job.get("backend")
+        if backend is not None and backend != "auto" and backend not in BACKENDS:
+            raise TranscriptionError(f"Moteur d'inférence inconnu: {backend}")
+        if not job.get("audio_file"):
+            raise TranscriptionError("Champ 'audio_file' manquant")
+        output_dir = job.get("output_dir", defaults["output_dir"])
+        if output_dir == "-":
+            raise TranscriptionError("stdout est réservé aux réponses du worker: 'output_dir' doit être un dossier")
+        with job_profiler(defaults["profile_dir"], f"job-{job_id}", defaults["profile_torch"]):
+            output = run_job(
+                job["audio_file"],
+                model_cache,
+                model_name=model_name,
+                with_srt=bool(job.get("generate_srt", False)),
+                decode_options=job.get("options"),
+                verbose=False,  # verbose=True écrirait du texte libre sur stdout
+                check_silence=bool(job.get("check_silence", defaults["check_silence"])),
+                vad=bool(job.get("vad", defaults["vad"])),
+                parallel=int(job.get("parallel", defaults["parallel"])),
+                result_cache=result_cache,
+                decoding_profile=job.get("decoding_profile", defaults["decoding_profile"]),
+                stream=bool(job.get("stream", defaults["stream"])),
+                backend=backend,
+                checkpoint_dir=defaults["checkpoint_dir"],
+                resume=bool(job.get("resume", defaults["resume"])),
+                windowed=job.get("windowed", defaults["windowed"]),
+                language=job.get("language", defaults["language"]),
+                fallback_language=defaults["fallback_language"],
+                language_threshold=defaults["language_threshold"],
+                output_formats=job.get("output_formats", defaults["output_formats"]),
+                output_dir=output_dir,
+                feature_cache=feature_cache,
+            )
+        return {"type": "result", "id": job_id, "duration": time.time() - started, **output}
+    except Exception as e:
+        log_message(f"Échec du job {job_id}: {e}")
+        if not isinstance(e, TranscriptionError):
+            traceback.print_exc(file=sys.stderr)
+        return {"type": "error", "id": job_id, "error": str(e)}
+    finally:
+        with _job_lock:
+            current_job_id = None
+            current_cancel = None
+
+def split_cores(concurrency):
+    """Répartit les cœurs utilisables en `concurrency` ensembles disjoints de cœurs voisins"""
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = list(range(os.cpu_count() or 1))
+    groups = np.array_split(np.array(cores), max(1, min(concurrency, len(cores))))
+    return [[int(core) for core in group] for group in groups]
+
+def _slot_main(index, cores, config, tasks, events, stop_flag):
+    """Processus d'un emplacement du planificateur: épinglé sur `cores`, torch limité à
+    len(cores) threads, modèles et caches propres. Les événements passent par `events`."""
+    global _event_sink
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    try:
+        os.sched_setaffinity(0, cores)
+    except (AttributeError, OSError) as e:
+        log_message(f"Emplacement {index}: épinglage impossible ({e})")
+    _event_sink = (events, index)
+    log_message(f"Emplacement {index}: cœurs {cores}")
+    model_cache = ModelCache(threads=len(cores), **config["model_cache"])
+    result_cache = ResultCache(**config["result_cache"]) if config["result_cache"] else None
+    feature_cache = FeatureCache(**config["feature_cache"]) if config["feature_cache"] else None
+    for job in iter(tasks.get, None):
+        event = _execute_job(job, model_cache, config["defaults"], result_cache, feature_cache, stop_flag)
+        events.put(("done", index, event))
+
+class WorkerSlot:
+    """Emplacement d'exécution du planificateur: un processus sur un ensemble de cœurs"""
+    def __init__(self, index, cores, context, config, events):
+        self.index = index
+        self.cores = cores
+        self.entry = None  # Job en cours
+        self.tasks = context.Queue()
+        self.stop_flag = context.Value('i', 0)
+        self.process = context.Process(target=_slot_main, name=f"whisper-slot-{index}",
+                                       args=(index, cores, config, self.tasks, events, self.stop_flag))
+        self.process.start()
+
+    def run(self, entry):
+        # Annulation reçue entre la sortie de file et l'affectation à cet emplacement
+        self.stop_flag.value = CancelToken.SHARED_REASONS.index(entry["cancel"].reason)
+        self.entry = entry
+        self.tasks.put(entry["job"])
+
+    def stop(self, timeout=10):
+        self.tasks.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+def _serve_inline(scheduler, model_cache, defaults, result_cache, feature_cache):
+    """Boucle du planificateur à un seul emplacement: les jobs s'exécutent dans ce processus,
+    arrêtés par le CancelToken que leur donne le planificateur"""
+    while not _shutdown_requested.is_set() and not scheduler.drained():
+        entry = scheduler.next_job()
+        if entry is not None:
+            event = _execute_job(entry["job"], model_cache, defaults, result_cache, feature_cache,
+                                 cancel=entry["cancel"])
+            emit_event(scheduler.finish(entry, event))
+
+def _serve_slots(scheduler, model_cache, defaults, result_cache, feature_cache):
+    """Boucle du planificateur à plusieurs emplacements, chacun dans son processus épinglé"""
+    context = multiprocessing.get_context("spawn")
+    core_sets = split_cores(scheduler.concurrency)
+    if len(core_sets) < scheduler.concurrency:
+        log_message(f"{scheduler.concurrency} emplacements demandés pour {len(core_sets)} cœur(s): "
+                    f"{len(core_sets)} emplacement(s)")
+        scheduler.concurrency = len(core_sets)
+    config = {
+        "defaults": defaults,
+        # Le budget mémoire des modèles est partagé entre les emplacements
+        "model_cache": {"max_memory_mb": model_cache.max_memory // (1024 * 1024) // len(core_sets),
+                        "quantize": model_cache.quantize, "model_dir": model_cache.model_dir,
+                        "backend": model_cache.backend},
+        "result_cache": result_cache and {"cache_dir": result_cache.cache_dir,
+                                          "max_size_mb": result_cache.max_size // (1024 * 1024)},
+        "feature_cache": feature_cache and {"cache_dir": feature_cache.cache_dir,
+                                            "max_size_mb": feature_cache.max_size // (1024 * 1024)},
+    }
+    events = context.Queue()
+    slots_lock = threading.Lock()
+    slots = [WorkerSlot(index, cores, context, config, events) for index, cores in enumerate(core_sets)]
+
+    def cancel_running(job_id, reason):
+        with slots_lock:
+            for slot in slots:
+                if slot.entry is not None and slot.entry["id"] == job_id:
+                    slot.stop_flag.value = CancelToken.SHARED_REASONS.index(reason)
+
+    def finish(slot, event):
+        with slots_lock:
+            entry, slot.entry = slot.entry, None
+        if entry is not None:
+            emit_event(scheduler.finish(entry, event))
+
+    def pump_events():
+        for kind, index, event in iter(events.get, None):
+            if kind == "done":
+                finish(slots[index], event)
+            else:
+                emit_event(event)
+
+    scheduler.cancel_running = cancel_running
+    pump = threading.Thread(target=pump_events, daemon=True)
+    pump.start()
+    try:
+        while not scheduler.drained():
+            if _shutdown_requested.is_set():
+                # SIGTERM: résultats partiels des jobs en cours, les jobs en attente ne démarrent pas
+                scheduler.cancel_all("terminated")
+                if not any(slot.entry is not None for slot in slots):
+                    break
+                time.sleep(0.1)
+                continue
+            for index, slot in enumerate(slots):
+                if not slot.process.is_alive():
+                    log_message(f"Emplacement {index} arrêté (code {slot.process.exitcode}), redémarrage")
+                    finish(slot, {"type": "error", "id": slot.entry and slot.entry["id"],
+                                  "error": f"Processus d'exécution arrêté (code {slot.process.exitcode})"})
+                    slots[index] = WorkerSlot(index, slot.cores, context, config, events)
+            entry = scheduler.next_job()
+            if entry is None:
+                continue
+            with slots_lock:
+                slot = next(slot for slot in slots if slot.entry is None)
+                slot.run(entry)
+    finally:
+        for slot in slots:
+            slot.stop()
+        events.put(None)
+        pump.join(5)
+
+def serve(model_cache, defaults, result_cache=None, feature_cache=None, concurrency=1, max_queue=SERVE_MAX_QUEUE):
+    """Mode worker: lit des jobs JSON sur stdin (un par ligne) et écrit les
+    résultats/progressions en JSON sur stdout.
+
+    Requête: {"id", "audio_file", "model"?, "backend"?, "generate_srt"?, "check_silence"?, "vad"?,
+              "parallel"?, "decoding_profile"?, "stream"?, "resume"?, "deadline"?, "windowed"?,
+              "language"?, "output_formats"?, "output_dir"?, "priority"?, "live"?, "options"?}
+    Les champs absents prennent la valeur de `defaults` (options de la ligne de commande).
+    {"type": "cancel", "id"} annule un job en cours ou en attente; "deadline" est la
+    durée maximale du job en secondes; "language" accepte "auto". Les fichiers de
+    "output_formats" sont écrits dans "output_dir" (stdout, réservé au protocole, est refusé).
+    Jusqu'à `concurrency` jobs s'exécutent en même temps, chacun dans un processus
+    épinglé sur ses propres cœurs; les suivants attendent dans la file de JobScheduler.
+    {"type": "metrics"} renvoie l'état de la file et les temps d'attente/exécution.
+    Réponses: {"type": "queued", "id", "queue_depth", "estimated_wait_s"} à la mise en file, puis
+    {"type": "result", "id", "text", "language", "srt"?, "files"?, "partial"?, "wait_s", "run_s"}
+    ou {"type": "error", "id", "error", "rejected"?, "estimated_wait_s"?},
+    précédées de {"type": "segment", "id", ...} pour chaque segment si "stream" est demandé.
+    """
+    log_message(f"Mode worker démarré ({concurrency} job(s) simultané(s)), en attente de jobs sur stdin...")
+    scheduler = JobScheduler(concurrency=max(1, concurrency), max_queue=max(1, max_queue))
+    threading.Thread(target=_read_serve_requests, args=(scheduler,), daemon=True).start()
+    emit_event({"type": "ready"})
+
+    if scheduler.concurrency > 1:
+        _serve_slots(scheduler, model_cache, defaults, result_cache, feature_cache)
+    else:
+        _serve_inline(scheduler, model_cache, defaults, result_cache, feature_cache)
+
+    if _shutdown_requested.is_set():
+        log_message("Signal d'arrêt reçu, arrêt du worker")
+    else:
+        log_message("Fin de l'entrée standard, arrêt du worker")
+
+def _handle_sigterm(signum, frame):
+    """SIGTERM: arrêt coopératif du job en cours (résultat partiel); un second signal quitte aussitôt"""
+    if _shutdown_requested.is_set():
+        raise SystemExit(128 + signum)
+    _shutdown_requested.set()
+    log_message("SIGTERM reçu: arrêt à la fin de la fenêtre de décodage en cours")
+    if current_cancel is not None:
+        current_cancel.cancel("terminated")
+
+def main():
+    global current_cancel
+    try:
+        log_message("==== Démarrage du script de transcription Whisper ====")
+        log_message(f"Version Python: {sys.version}")
+        log_message(f"Arguments sys.argv: {sys.argv}")
+
+        parser = argparse.ArgumentParser(description="Transcription audio avec Whisper")
+        parser.add_argument("audio_file", nargs="?", help="Chemin vers le fichier audio à transcrire")
+        parser.add_argument("--generate-srt", action="store_true", help="Générer des sous-titres SRT")
+        parser.add_argument("--model", choices=MODEL_NAMES, default="medium",
+                            help="Modèle Whisper à utiliser (défaut: medium)")
+        parser.add_argument("--serve", action="store_true",
+                            help="Mode worker: lire des jobs JSON sur stdin en gardant les modèles chargés")
+        parser.add_argument("--model-cache-mb", type=int, default=4096,
+                            help="Mémoire maximale des modèles gardés en cache en mode --serve (défaut: 4096)")
+        parser.add_argument("--concurrency", type=int, default=1,
+                            help="Jobs exécutés simultanément en mode --serve, chacun sur ses propres cœurs "
+                                 "(défaut: 1)")
+        parser.add_argument("--max-queue", type=int, default=SERVE_MAX_QUEUE,
+                            help=f"Jobs en attente au-delà desquels une requête est refusée en mode --serve "
+                                 f"(défaut: {SERVE_MAX_QUEUE})")
+        parser.add_argument("--backend", choices=["auto"] + list(BACKENDS), default=DEFAULT_BACKEND,
+                            help=f"Moteur d'inférence (défaut: {DEFAULT_BACKEND}; auto: faster-whisper s'il est "
+                                 "installé et le modèle présent en local, sinon openai-whisper)")
+        parser.add_argument("--quantize", action="store_true",
+                            help="Quantifier les couches linéaires du modèle en int8 (CPU)")
+        parser.add_argument("--model-dir", default=os.environ.get("WHISPER_QUANTIZED_DIR"),
+                            help="Dossier des modèles quantifiés et des modèles faster-whisper-<nom> "
+                                 "(défaut: $WHISPER_QUANTIZED_DIR ou ~/.cache/whisper-transcribe/int8)")
+        parser.add_argument("--language", metavar="CODE",
+                            help="Langue de l'audio (fr, en, de...) ou 'auto' pour la détecter une fois "
+                                 "sur la première fenêtre parlée (défaut: fr)")
+        parser.add_argument("--fallback-language", default=DEFAULT_FALLBACK_LANGUAGE, metavar="CODE",
+                            help=f"Langue utilisée si la détection est incertaine (défaut: {DEFAULT_FALLBACK_LANGUAGE})")
+        parser.add_argument("--language-threshold", type=float, default=LANGUAGE_CONFIDENCE_THRESHOLD,
+                            help="Probabilité minimale de la langue détectée "
+                                 f"(défaut: {LANGUAGE_CONFIDENCE_THRESHOLD})")
+        parser.add_argument("--check-silence", action="store_true",
+                            help="Analyser le signal par blocs pour signaler un enregistrement silencieux")
+        parser.add_argument("--vad", action="store_true",
+                            help="Détecter la parole avant décodage et ne transcrire que les zones parlées")
+        parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                            help="Découper les longs fichiers et les transcrire dans N processus (défaut: 1)")
+        parser.add_argument("--cache-dir", default=os.environ.get("WHISPER_CACHE_DIR"),
+                            help="Dossier du cache des résultats (défaut: $WHISPER_CACHE_DIR, désactivé si absent)")
+        parser.add_argument("--cache-max-mb", type=int, default=1024,
+                            help="Taille maximale du cache des résultats en Mo (défaut: 1024)")
+        parser.add_argument("--feature-cache-dir", default=os.environ.get("WHISPER_FEATURE_CACHE_DIR"),
+                            help="Dossier du cache des sorties de l'encodeur par fenêtre "
+                                 "(défaut: $WHISPER_FEATURE_CACHE_DIR, désactivé si absent)")
+        parser.add_argument("--feature-cache-mb", type=int, default=2048,
+                            help="Taille maximale du cache encodeur en Mo (défaut: 2048)")
+        parser.add_argument("--decoding-profile", choices=list(DECODING_PROFILES),
+                            help=f"Profil de vitesse de décodage (défaut: {DEFAULT_DECODING_PROFILE}, 'fast' en --live)")
+        parser.add_argument("--live", action="store_true",
+                            help="Transcription en direct de PCM s16le 16 kHz mono lu sur stdin")
+        parser.add_argument("--checkpoint-dir", default=os.environ.get("WHISPER_CHECKPOINT_DIR"),
+                            help="Dossier des points de reprise écrits pendant le décodage "
+                                 f"(défaut: $WHISPER_CHECKPOINT_DIR, désactivé si absent; {CHECKPOINT_MAX_MB} Mo au plus)")
+        parser.add_argument("--resume", action="store_true",
+                            help="Reprendre une transcription interrompue depuis son dernier point de reprise")
+        parser.add_argument("--windowed", action="store_const", const=True, default=None,
+                            help="Lire et transcrire le fichier par morceaux de 5 minutes à mémoire constante "
+                                 f"(automatique au-delà de {WINDOWED_MIN_DURATION // 60} minutes)")
+        parser.add_argument("--deadline", type=float, metavar="SECONDES",
+                            help="Durée maximale d'un job: au-delà, le texte déjà décodé est rendu comme résultat partiel")
+        parser.add_argument("--batch", metavar="DOSSIER|MANIFESTE",
+                            help="Transcrire tous les fichiers d'un dossier ou d'un manifeste JSONL avec un seul modèle")
+        parser.add_argument("--batch-output", metavar="FICHIER",
+                            help="Fichier JSONL des résultats du lot (défaut: transcriptions.jsonl dans le dossier, "
+                                 "ou <manifeste>.results.jsonl)")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                            help=f"Fenêtres de 30 s encodées ensemble en mode --batch (défaut: {BATCH_SIZE})")
+        parser.add_argument("--prefetch", type=int, default=BATCH_PREFETCH,
+                            help=f"Threads de décodage audio en mode --batch (défaut: {BATCH_PREFETCH})")
+        parser.add_argument("--output-format", nargs="+", choices=list(OUTPUT_WRITERS) + ["all"],
+                            metavar="FORMAT",
+                            help="Fichiers écrits au fil du décodage: " + ", ".join(OUTPUT_WRITERS)
+                                 + " ou all (tous à partir de la même transcription)")
+        parser.add_argument("--output-dir", default=".",
+                            help="Dossier des fichiers de --output-format, nommés d'après le fichier audio "
+                                 "(défaut: dossier courant, '-' pour un seul format sur stdout)")
+        parser.add_argument("--profile", metavar="DIR",
+                            help="Écrire un profil cProfile de chaque job dans ce dossier")
+        parser.add_argument("--profile-torch", action="store_true",
+                            help="Avec --profile, écrire aussi une trace du profileur torch")
+        parser.add_argument("--stream", action="store_true",
+                            help="Émettre chaque segment en JSON sur stdout dès qu'il est décodé, puis un récapitulatif")
+        args = parser.parse_args()
+
+        log_message(f"Arguments reçus: {args}")
+        output_formats = args.output_format
+        to_stdout = bool(output_formats) and args.output_dir == "-"
+        if to_stdout and args.stream:
+            parser.error("--stream et --output-dir - écrivent tous deux sur stdout")
+        if args.quantize and args.backend == FasterWhisperBackend.name:
+            parser.error("--quantize ne s'applique qu'à openai-whisper (faster-whisper calcule déjà en int8)")
+        # Le signal envoyé par process.kill côté Node arrête proprement le job en cours
+        signal.signal(signal.SIGTERM, _handle_sigterm)
+
+        model_cache = ModelCache(max_memory_mb=args.model_cache_mb, quantize=args.quantize,
+                                 model_dir=args.model_dir, backend=args.backend)
+        result_cache = None
+        if args.cache_dir:
+            result_cache = ResultCache(args.cache_dir, max_size_mb=args.cache_max_mb)
+        feature_cache = None
+        if args.feature_cache_dir:
+            feature_cache = FeatureCache(args.feature_cache_dir, max_size_mb=args.feature_cache_mb)
+
+        if args.live:
+            model = model_cache.get(args.model)
+            language = args.language
+            if language == "auto":
+                # Un flux direct n'a pas de fichier à analyser d'avance
+                log_message(f"--language auto non disponible en direct, langue '{args.fallback_language}'")
+                language = args.fallback_language
+            run_live(model, build_transcribe_options(profile=args.decoding_profile or "fast", language=language))
+            return 0
+
+        if args.decoding_profile is None:
+            args.decoding_profile = DEFAULT_DECODING_PROFILE
+
+        if args.serve:
+            serve(model_cache, {
+                "model": args.model,
+                "check_silence": args.check_silence,
+                "vad": args.vad,
+                "parallel": args.parallel,
+                "decoding_profile": args.decoding_profile,
+                "profile_dir": args.profile,
+                "profile_torch": args.profile_torch,
+                "stream": args.stream,
+                "checkpoint_dir": args.checkpoint_dir,
+                "resume": args.resume,
+                "deadline": args.deadline,
+                "windowed": args.windowed,
+                "language": args.language,
+                "fallback_language": args.fallback_language,
+                "language_threshold": args.language_threshold,
+                "output_formats": output_formats,
+                "output_dir": args.output_dir,
+            }, result_cache=result_cache, feature_cache=feature_cache,
+                concurrency=args.concurrency, max_queue=args.max_queue)
+            return 0
+
+        if args.batch:
+            output_path = args.batch_output
+            if output_path is None:
+                output_path = (os.path.join(args.batch, "transcriptions.jsonl") if os.path.isdir(args.batch)
+                               else os.path.splitext(args.batch)[0] + ".results.jsonl")
+            current_cancel = CancelToken(deadline=args.deadline)
+            with job_profiler(args.profile, "batch", args.profile_torch):
+                stats = run_batch(args.batch, output_path, model_cache, model_name=args.model,
+                                  with_srt=args.generate_srt, decoding_profile=args.decoding_profile,
+                                  batch_size=max(1, args.batch_size), prefetch=max(1, args.prefetch),
+                                  language=args.language, fallback_language=args.fallback_language,
+                                  language_threshold=args.language_threshold)
+            emit_event({"type": "summary", **stats})
+            # Échec seulement si aucun fichier du lot n'a pu être transcrit
+            return 0 if stats["ok"] or not stats["files"] else 1
+
+        if not args.audio_file:
+            parser.error("audio_file est requis hors des modes --serve et --batch")
+
+        current_cancel = CancelToken(deadline=args.deadline)
+        try:
+            with job_profiler(args.profile, "job", args.profile_torch):
+                output = run_job(args.audio_file, model_cache, model_name=args.model,
+                                 with_srt=args.generate_srt, check_silence=args.check_silence,
+                                 vad=args.vad, parallel=args.parallel, result_cache=result_cache,
+                                 decoding_profile=args.decoding_profile, stream=args.stream,
+                                 verbose=not (args.stream or to_stdout), checkpoint_dir=args.checkpoint_dir,
+                                 resume=args.resume, windowed=args.windowed, language=args.language,
+                                 fallback_language=args.fallback_language,
+                                 language_threshold=args.language_threshold,
+                                 output_formats=output_formats, output_dir=args.output_dir,
+                                 feature_cache=feature_cache)
+        except TranscriptionError as e:
+            log_message(f"ERREUR: {e}")
+            return 1
+
+        if args.stream:
+            # Les segments ont déjà été émis, terminer par un enregistrement récapitulatif
+            emit_event({"type": "summary", **output})
+            log_message("Script terminé avec succès")
+            return 0
+
+        if output.get("partial"):
+            log_message(f"ATTENTION: résultat partiel ({output['stop_reason']})")
+
+        if to_stdout:
+            # La sortie demandée a déjà été écrite sur stdout au fil du décodage
+            log_message("Script terminé avec succès")
+            return 0
+
         # Format de sortie spécial pour faciliter la lecture
         log_message("Préparation du résultat...")
+        if output.get("partial"):
+            # Texte tronqué (échéance, annulation): l'appelant ne doit pas le prendre pour complet
+            print(f"RÉSULTAT_PARTIEL: {output['stop_reason']}")
         print("DÉBUT_TEXTE_TRANSCRIPTION")
-        print(result["text"])
+        print(output["text"])
         print("FIN_TEXTE_TRANSCRIPTION")
-        
-        # Générer les sous-titres SRT si demandé
-        if args.generate_srt and "segments" in result:
-            log_message("Génération des sous-titres SRT...")
-            srt_content = generate_srt(result["segments"])
+
+        if "srt" in output:
             print("DÉBUT_SRT")
-            print(srt_content)
+            print(output["srt"])
             print("FIN_SRT")
-            log_message("Sous-titres SRT générés")
-        
+
         log_message("Script terminé avec succès")
-        
-        # Nettoyer les fichiers temporaires avant de quitter
-        if temp_wav_to_use is not None and temp_wav_to_use != audio_path:
-            try:
-                os.remove(temp_wav_to_use)
-                log_message(f"Fichier temporaire supprimé: {temp_wav_to_use}")
-            except Exception as cleanup_error:
-                log_message(f"Erreur lors de la suppression du fichier temporaire: {cleanup_error}")
-        
         return 0
     except Exception as e:
         log_message(f"Exception non gérée: {e}")
@@ -601,4 +3934,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())